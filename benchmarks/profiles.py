@@ -0,0 +1,190 @@
+"""
+Accuracy/latency comparison of inference profiles against the fp32 baseline
+
+Usage:
+    python -m benchmarks.profiles --models embeddings,m2m100 --profiles fp32,int8,onnx
+    python -m benchmarks.profiles --models whisper --audio recordings/ --output profiles.json
+
+Each model is loaded once per profile with the real weights. Latency is
+measured per call on the same inputs; accuracy is relative to the fp32
+outputs: mean cosine similarity for embeddings, chrF for M2M100
+translations and word error rate for Whisper transcripts. Memory is the
+growth of resident set size while loading the model.
+"""
+
+import argparse
+import gc
+import json
+import os
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from src.core import inference_profile
+from .run import _PHRASES, _TOPICS, summarize
+
+MODELS = ("embeddings", "m2m100", "whisper")
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process (Linux; 0 elsewhere)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def chrf(hypothesis: str, reference: str, max_order: int = 6, beta: float = 2.0) -> float:
+    """Character n-gram F-score (chrF, 0-100) of one sentence"""
+    hyp, ref = hypothesis.replace(" ", ""), reference.replace(" ", "")
+    precisions, recalls = [], []
+    for n in range(1, max_order + 1):
+        hyp_grams = _ngrams(hyp, n)
+        ref_grams = _ngrams(ref, n)
+        if not hyp_grams or not ref_grams:
+            continue
+        overlap = sum(min(count, ref_grams.get(gram, 0)) for gram, count in hyp_grams.items())
+        precisions.append(overlap / sum(hyp_grams.values()))
+        recalls.append(overlap / sum(ref_grams.values()))
+    if not precisions:
+        return 100.0 if hyp == ref else 0.0
+    precision, recall = np.mean(precisions), np.mean(recalls)
+    if precision + recall == 0:
+        return 0.0
+    return float(100 * (1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall))
+
+
+def _ngrams(text: str, n: int) -> Dict[str, int]:
+    grams: Dict[str, int] = {}
+    for i in range(len(text) - n + 1):
+        grams[text[i:i + n]] = grams.get(text[i:i + n], 0) + 1
+    return grams
+
+
+def word_error_rate(hypothesis: str, reference: str) -> float:
+    """Word-level edit distance divided by the reference length"""
+    hyp, ref = hypothesis.lower().split(), reference.lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def mean_cosine(vectors: List[List[float]], references: List[List[float]]) -> float:
+    a, b = np.asarray(vectors, dtype=np.float32), np.asarray(references, dtype=np.float32)
+    a /= np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b /= np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return float((a * b).sum(axis=1).mean())
+
+
+def sample_sentences(count: int) -> List[str]:
+    return [
+        f"{_TOPICS[i % len(_TOPICS)].capitalize()} {_PHRASES[i % len(_PHRASES)]}."
+        for i in range(count)
+    ]
+
+
+def _measure(load: Callable[[], object], run: Callable[[object, object], object], inputs: List) -> Tuple[Dict, List]:
+    """Load a model, then time ``run(model, input)`` for every input"""
+    gc.collect()
+    before = rss_mb()
+    started = time.perf_counter()
+    model = load()
+    load_seconds = time.perf_counter() - started
+    memory = rss_mb() - before
+
+    run(model, inputs[0])  # warm-up (lazy initialisation, allocator)
+    outputs, latencies = [], []
+    started = time.perf_counter()
+    for item in inputs:
+        call_started = time.perf_counter()
+        outputs.append(run(model, item))
+        latencies.append(time.perf_counter() - call_started)
+    stats = summarize(latencies, time.perf_counter() - started)
+    if hasattr(model, "close"):
+        model.close()
+    del model
+    gc.collect()
+    return {"load_seconds": load_seconds, "rss_growth_mb": memory, **stats}, outputs
+
+
+def compare_profiles(model: str, profiles: List[str], args) -> List[Dict]:
+    """One result row per profile; the first profile is the accuracy baseline"""
+    if model == "embeddings":
+        inputs = sample_sentences(args.samples)
+        load = inference_profile.load_embeddings
+        run = lambda m, text: m.embed_query(text)
+        score = ("cosine_to_baseline", mean_cosine)
+    elif model == "m2m100":
+        from transformers import M2M100Tokenizer
+        from src.core.m2m_engine import M2M100Engine
+        tokenizer = M2M100Tokenizer.from_pretrained(settings.TRANSLATION_MODEL)
+        inputs = sample_sentences(args.samples)
+        load = lambda profile: M2M100Engine(inference_profile.load_m2m100_model(profile), tokenizer, max_wait_ms=0)
+        run = lambda engine, text: engine.translate_batch([text], args.source, args.target)[0]
+        score = ("chrf_to_baseline", lambda outs, refs: float(np.mean([chrf(o, r) for o, r in zip(outs, refs)])))
+    else:
+        from src.core.audio import decode_audio
+        if not args.audio:
+            raise SystemExit("--audio DIR is required for the whisper comparison")
+        inputs = []
+        for name in sorted(os.listdir(args.audio))[:args.samples]:
+            with open(os.path.join(args.audio, name), "rb") as f:
+                inputs.append(decode_audio(f.read()))
+        load = inference_profile.load_whisper
+        run = lambda m, audio: m.transcribe(audio, fp16=False)["text"].strip()
+        score = ("wer_to_baseline", lambda outs, refs: float(np.mean([word_error_rate(o, r) for o, r in zip(outs, refs)])))
+
+    rows, baseline = [], None
+    for profile in profiles:
+        stats, outputs = _measure(lambda: load(profile), run, inputs)
+        if baseline is None:
+            baseline = (stats, outputs)
+        metric, compute = score
+        rows.append({
+            "model": model,
+            "profile": profile,
+            **stats,
+            "speedup_p50": baseline[0]["latency_ms"]["p50"] / stats["latency_ms"]["p50"],
+            metric: compute(outputs, baseline[1])
+        })
+    return rows
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compare inference profiles against the fp32 baseline")
+    parser.add_argument("--models", default="embeddings,m2m100", help=f"Comma-separated subset of {', '.join(MODELS)}")
+    parser.add_argument("--profiles", default="fp32,int8", help="Profiles to compare; the first is the baseline")
+    parser.add_argument("--samples", type=int, default=50, help="Inputs per model")
+    parser.add_argument("--source", default="en", help="M2M100 source language")
+    parser.add_argument("--target", default="ja", help="M2M100 target language")
+    parser.add_argument("--audio", help="Directory of recordings for the Whisper comparison")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    models = [m.strip() for m in args.models.split(",") if m.strip()]
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    unknown = (set(models) - set(MODELS)) | (set(profiles) - set(inference_profile.PROFILES))
+    if unknown:
+        parser.error(f"Unknown models or profiles: {', '.join(sorted(unknown))}")
+
+    report = {
+        "settings": inference_profile.describe(),
+        "results": [row for model in models for row in compare_profiles(model, profiles, args)]
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Offline benchmark suite for the CultiTrans pipeline
+
+Usage:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --scenarios translate,retrieval --concurrency 1,16 \\
+        --requests 500 --corpus-size 5000 --output after.json --compare before.json
+
+OpenAI and Google Translate are always replaced by local stand-ins with
+configurable latency (benchmarks/standins.py). Whisper and the embedding
+model are stand-ins too unless --real-models is given, in which case the
+local Whisper, M2M100 (with TRANSLATION_BACKEND=m2m100) and embedding
+models are loaded as in production.
+
+Each run writes one JSON document with throughput and p50/p95/p99 latency
+per scenario and concurrency level; --compare exits non-zero when p95 or
+throughput regress by more than --tolerance against a previous run.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from config.settings import settings
+from .standins import FakeGoogleTranslator, FakeOpenAIClient, FakeWhisper, HashEmbeddings
+
+SCENARIOS = ("ingest", "retrieval", "translate", "transcribe")
+
+_TOPICS = [
+    "bowing", "greetings", "gift giving", "business cards", "punctuality", "dining",
+    "honorifics", "face-saving", "small talk", "eye contact", "tipping", "seniority",
+    "negotiation", "apologies", "compliments", "personal space", "dress code", "toasts"
+]
+_PHRASES = [
+    "is expected when meeting someone for the first time",
+    "should be handled with care in formal settings",
+    "signals respect for hierarchy and age",
+    "differs between business and family occasions",
+    "is considered rude if done carelessly",
+    "helps build trust before discussing details"
+]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict:
+    """Throughput and latency percentiles (milliseconds) of one load run"""
+    completed = len(latencies)
+    if completed:
+        values = np.asarray(latencies) * 1000
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        latency = {
+            "p50": float(p50), "p95": float(p95), "p99": float(p99),
+            "mean": float(values.mean()), "max": float(values.max())
+        }
+    else:
+        latency = {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    return {
+        "requests": completed + errors,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput_rps": completed / elapsed if elapsed else 0.0,
+        "latency_ms": latency
+    }
+
+
+async def run_async_load(send: Callable[[int], Awaitable[bool]], requests: int, concurrency: int) -> Dict:
+    """Closed-loop load: ``concurrency`` workers issue ``requests`` calls in total"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                ok = await send(i)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def run_thread_load(call: Callable[[int], object], requests: int, concurrency: int) -> Dict:
+    """Closed-loop load for blocking calls, one thread per concurrent caller"""
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            call(i)
+        except Exception:
+            return None
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(requests)))
+    latencies = [r for r in results if r is not None]
+    return summarize(latencies, time.perf_counter() - started, len(results) - len(latencies))
+
+
+def generate_corpus(directory: str, size: int, seed: int = 0) -> str:
+    """Write a synthetic JSONL etiquette corpus of ``size`` documents"""
+    rng = random.Random(seed)
+    cultures = list(settings.SUPPORTED_CULTURES)
+    path = os.path.join(directory, "benchmark_corpus.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(size):
+            topic = rng.choice(_TOPICS)
+            sentences = " ".join(
+                f"In this culture, {rng.choice(_TOPICS)} {rng.choice(_PHRASES)}."
+                for _ in range(rng.randint(2, 8))
+            )
+            f.write(json.dumps({
+                "id": f"bench-{i}",
+                "culture": cultures[i % len(cultures)],
+                "category": topic,
+                "content": f"{topic.capitalize()} {rng.choice(_PHRASES)}. {sentences}"
+            }) + "\n")
+    return path
+
+
+def synthetic_wav(seconds: float, sample_rate: int = 16000, seed: int = 0) -> bytes:
+    """16-bit mono WAV with speech-like bursts separated by pauses"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = (np.sin(2 * np.pi * 0.4 * t) > -0.3).astype(np.float32)
+    audio = 0.3 * envelope * np.sin(2 * np.pi * 220 * t) + 0.01 * rng.standard_normal(len(t))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def install_standins(args, workdir: str):
+    """Point the pipeline at local stand-ins and a scratch knowledge base"""
+    from src.core.embeddings import CachedEmbeddings
+    from src.core.model_registry import registry
+
+    settings.CULTURAL_DB_PATH = workdir
+    settings.CACHE_ENABLED = args.cache
+    settings.CACHE_PERSIST = False
+    settings.SEMANTIC_CACHE_ENABLED = args.cache
+    # Measure the pipeline, not a phrasebook left in the working tree
+    settings.PHRASEBOOK_ENABLED = False
+    settings.WARMUP_MODELS = []
+    # Cold loads stay in the measured request path rather than answering 503
+    settings.STARTUP_MODE = "lazy"
+    # The stand-ins have no rate limits: keep the priority queues, drop the budgets
+    settings.LLM_REQUESTS_PER_MINUTE = 0
+    settings.LLM_TOKENS_PER_MINUTE = 0
+    settings.TRANSLATE_REQUESTS_PER_MINUTE = 0
+
+    registry.register("openai_client", lambda: FakeOpenAIClient(args.llm_latency, args.token_latency))
+
+    if not args.real_models:
+        settings.TRANSLATION_BACKEND = "google"
+        registry.register(
+            "embeddings",
+            lambda: CachedEmbeddings(HashEmbeddings(), max_entries=settings.EMBEDDING_CACHE_SIZE)
+        )
+        registry.register("whisper", lambda: FakeWhisper(args.asr_rtf))
+
+
+def bench_ingest(args, workdir: str) -> List[Dict]:
+    from src.core.cultural_rag import CulturalRAG
+    from src.core.model_registry import registry
+
+    generate_corpus(workdir, args.corpus_size, args.seed)
+    results = []
+    for phase in ("cold", "warm"):
+        # cold embeds the whole corpus; warm restarts on an unchanged one
+        started = time.perf_counter()
+        rag = CulturalRAG()
+        elapsed = time.perf_counter() - started
+        stats = rag.ingest_stats or {}
+        results.append({
+            "scenario": f"ingest_{phase}",
+            "corpus_size": args.corpus_size,
+            "seconds": elapsed,
+            "documents_embedded": stats.get("documents_changed", 0),
+            "chunks_written": stats.get("chunks_written", 0),
+            "chunks_per_second": stats.get("chunks_per_second", 0.0),
+            "documents_per_second": args.corpus_size / elapsed if elapsed else 0.0
+        })
+    registry.set("cultural_rag", rag)
+    return results
+
+
+def bench_retrieval(args) -> List[Dict]:
+    from src.core.model_registry import registry
+
+    rag = registry.get("cultural_rag")
+    cultures = list(settings.SUPPORTED_CULTURES)
+    rng = random.Random(args.seed)
+    queries = [
+        f"How should I handle {rng.choice(_TOPICS)} with {rng.choice(_TOPICS)} here?"
+        for _ in range(max(1, args.requests // 2))
+    ]
+
+    results = []
+    for concurrency in args.concurrency:
+        summary = run_thread_load(
+            lambda i: rag.retrieve_cultural_context(queries[i % len(queries)], cultures[i % len(cultures)]),
+            args.requests, concurrency
+        )
+        results.append({"scenario": "retrieval", "concurrency": concurrency,
+                        "corpus_size": args.corpus_size, **summary})
+    return results
+
+
+def bench_http(args, scenario: str) -> List[Dict]:
+    import httpx
+    from src.backend import api
+
+    if not args.real_models or settings.TRANSLATION_BACKEND != "m2m100":
+        api.translator.google_translator = FakeGoogleTranslator(args.translate_latency)
+    cultures = list(settings.SUPPORTED_CULTURES)
+    audio = synthetic_wav(args.audio_seconds, seed=args.seed)
+
+    async def run(concurrency: int) -> Dict:
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            async def send(i: int) -> bool:
+                if scenario == "translate":
+                    response = await client.post("/translate", json={
+                        # Unique text per request, so the cache does not hide the pipeline
+                        "text": f"Could we move our meeting to tomorrow morning? ({i})",
+                        "source_language": "en",
+                        "target_culture": cultures[i % len(cultures)]
+                    })
+                else:
+                    response = await client.post(
+                        "/transcribe", files={"audio": ("bench.wav", audio, "audio/wav")}
+                    )
+                return response.status_code == 200
+
+            return await run_async_load(send, args.requests, concurrency)
+
+    return [
+        {"scenario": scenario, "concurrency": concurrency, **asyncio.run(run(concurrency))}
+        for concurrency in args.concurrency
+    ]
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline``
+
+    Rows are matched by scenario and concurrency; a row regresses when its
+    p95 latency grows, or its throughput drops, by more than ``tolerance``.
+    """
+    def rows(run):
+        return {
+            (row["scenario"], row.get("concurrency")): row
+            for row in run.get("results", [])
+        }
+
+    regressions = []
+    before_rows = rows(baseline)
+    for key, after in rows(current).items():
+        before = before_rows.get(key)
+        if before is None:
+            continue
+        label = f"{key[0]} (concurrency {key[1]})" if key[1] is not None else key[0]
+        p95_before = (before.get("latency_ms") or {}).get("p95")
+        p95_after = (after.get("latency_ms") or {}).get("p95")
+        if p95_before and p95_after and p95_after > p95_before * (1 + tolerance):
+            regressions.append(f"{label}: p95 {p95_before:.1f} ms -> {p95_after:.1f} ms")
+        rps_before = before.get("throughput_rps")
+        rps_after = after.get("throughput_rps")
+        if rps_before and rps_after is not None and rps_after < rps_before * (1 - tolerance):
+            regressions.append(f"{label}: throughput {rps_before:.1f}/s -> {rps_after:.1f}/s")
+        if "seconds" in before and "latency_ms" not in before and before["seconds"]:
+            if after["seconds"] > before["seconds"] * (1 + tolerance):
+                regressions.append(f"{label}: {before['seconds']:.2f}s -> {after['seconds']:.2f}s")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="cultitrans-bench-") as workdir:
+        install_standins(args, workdir)
+
+        results = []
+        # Retrieval and the HTTP scenarios reuse the knowledge base built here
+        results.extend(bench_ingest(args, workdir))
+        if "retrieval" in args.scenarios:
+            results.extend(bench_retrieval(args))
+        for scenario in ("translate", "transcribe"):
+            if scenario in args.scenarios:
+                results.extend(bench_http(args, scenario))
+
+    if "ingest" not in args.scenarios:
+        results = [row for row in results if not row["scenario"].startswith("ingest")]
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+        },
+        "results": results
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the CultiTrans pipeline offline")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32],
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and level")
+    parser.add_argument("--corpus-size", type=int, default=1000, help="Synthetic knowledge documents")
+    parser.add_argument("--audio-seconds", type=float, default=10.0, help="Length of /transcribe uploads (stand-in Whisper handles up to ASR_CHUNK_SECONDS)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Stand-in LLM base latency (s)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Stand-in LLM per-token latency (s)")
+    parser.add_argument("--translate-latency", type=float, default=0.15, help="Stand-in Google Translate latency (s)")
+    parser.add_argument("--asr-rtf", type=float, default=0.05, help="Stand-in Whisper real-time factor")
+    parser.add_argument("--real-models", action="store_true", help="Use the local Whisper/M2M100/embedding models")
+    parser.add_argument("--cache", action="store_true", help="Keep the translation cache enabled")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="Previous results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = run_benchmarks(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Local stand-ins for the remote services and heavy models used by the pipeline
+
+They reproduce the response shapes the pipeline parses and a configurable
+latency, so benchmarks run offline and give repeatable numbers.
+"""
+
+import hashlib
+import re
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+import numpy as np
+
+_PACKED_COUNT = re.compile(r"Reply with exactly (\d+) lines")
+_WORD = re.compile(r"\w+")
+
+
+class FakeChatCompletion:
+    """
+    Offline replacement for the OpenAI chat completions resource
+
+    Latency is ``base_latency`` plus ``token_latency`` per generated token;
+    streamed replies spread the per-token part over the chunks.
+    """
+
+    def __init__(self, base_latency: float = 0.3, token_latency: float = 0.01):
+        self.base_latency = base_latency
+        self.token_latency = token_latency
+        self.calls = 0
+
+    def create(self, model: str = None, messages: List[Dict] = None, max_tokens: int = 150,
+               stream: bool = False, **kwargs):
+        self.calls += 1
+        prompt = messages[-1]["content"] if messages else ""
+        content = self._reply(prompt)
+        tokens = content.split(" ")
+        usage = SimpleNamespace(
+            prompt_tokens=len(prompt.split()), completion_tokens=len(tokens),
+            total_tokens=len(prompt.split()) + len(tokens)
+        )
+
+        time.sleep(self.base_latency)
+        if stream:
+            return self._stream(tokens)
+        time.sleep(self.token_latency * len(tokens))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=usage
+        )
+
+    def _stream(self, tokens: List[str]):
+        for i, token in enumerate(tokens):
+            time.sleep(self.token_latency)
+            text = token if i == 0 else " " + token
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    @staticmethod
+    def _reply(prompt: str) -> str:
+        packed = _PACKED_COUNT.search(prompt)
+        if packed:
+            return "\n".join(
+                f"{i}. Would you kindly consider this adapted text number {i}?"
+                for i in range(1, int(packed.group(1)) + 1)
+            )
+        if "Response X:" in prompt:
+            return "\n".join(
+                f"Response {i}: Thank you very much, that sounds wonderful.\n"
+                f"Explanation: Polite and warm, suitable for the listener."
+                for i in range(1, 4)
+            )
+        return "Would you kindly consider the following, if it is convenient?"
+
+
+class FakeOpenAIClient:
+    """Offline replacement for ``openai.OpenAI`` (``chat.completions.create`` only)"""
+
+    def __init__(self, base_latency: float = 0.3, token_latency: float = 0.01):
+        self.chat = SimpleNamespace(completions=FakeChatCompletion(base_latency, token_latency))
+
+
+class FakeGoogleTranslator:
+    """Offline replacement for googletrans.Translator"""
+
+    def __init__(self, latency: float = 0.15):
+        self.latency = latency
+        self.calls = 0
+
+    def translate(self, text: str, src: str = "auto", dest: str = "en"):
+        self.calls += 1
+        time.sleep(self.latency)
+        return SimpleNamespace(text=f"[{dest}] {text}", src=src, dest=dest)
+
+
+class HashEmbeddings:
+    """
+    Deterministic bag-of-words embeddings
+
+    Cheap enough to benchmark retrieval and ingestion mechanics without a
+    transformer, while still ranking documents that share words together.
+    """
+
+    model_name = "hash-embeddings"
+
+    def __init__(self, dimensions: int = 384, latency_per_text: float = 0.0):
+        self.dimensions = dimensions
+        self.latency_per_text = latency_per_text
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in _WORD.findall(text.lower()):
+            digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest, "little") % self.dimensions] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency_per_text:
+            time.sleep(self.latency_per_text * len(texts))
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class FakeWhisper:
+    """Offline replacement for a loaded Whisper model (``transcribe`` only)"""
+
+    def __init__(self, real_time_factor: float = 0.05, sample_rate: int = 16000):
+        self.real_time_factor = real_time_factor
+        self.sample_rate = sample_rate
+
+    def transcribe(self, audio, **kwargs) -> Dict:
+        seconds = len(audio) / self.sample_rate
+        time.sleep(seconds * self.real_time_factor)
+        text = "hello, could we schedule the meeting for tomorrow"
+        return {
+            "text": text,
+            "segments": [{"start": 0.0, "end": seconds, "text": text}]
+        }
@@ -18,11 +18,172 @@ class Settings:
     
     # Model Settings
     WHISPER_MODEL = "base"
+    ASR_CHUNK_SECONDS = float(os.getenv("ASR_CHUNK_SECONDS", "30"))
+    ASR_MIN_SILENCE_MS = int(os.getenv("ASR_MIN_SILENCE_MS", "300"))
+    ASR_BATCH_SIZE = int(os.getenv("ASR_BATCH_SIZE", "8"))
+    STREAM_PARTIAL_INTERVAL = float(os.getenv("STREAM_PARTIAL_INTERVAL", "1.0"))
+    STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "10"))
+    STREAM_MIN_SILENCE_MS = int(os.getenv("STREAM_MIN_SILENCE_MS", "600"))
     TRANSLATION_MODEL = "facebook/m2m100_418M"
     LLM_MODEL = "gpt-3.5-turbo"
     
+    # Translation backend: "google" (googletrans web client) or "m2m100" (local)
+    TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "google")
+    M2M_MAX_BATCH_SIZE = int(os.getenv("M2M_MAX_BATCH_SIZE", "16"))
+    M2M_MAX_WAIT_MS = float(os.getenv("M2M_MAX_WAIT_MS", "10"))
+    M2M_MAX_NEW_TOKENS = int(os.getenv("M2M_MAX_NEW_TOKENS", "256"))
+    
+    # CPU inference profile: "fp32", "int8" (dynamic quantisation) or "onnx"
+    # (ONNX Runtime for M2M100 and embeddings); see src/core/inference_profile.py
+    INFERENCE_PROFILE = os.getenv("INFERENCE_PROFILE", "fp32")
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-mpnet-base-v2")
+    WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", "0"))  # 0: torch default
+    M2M_THREADS = int(os.getenv("M2M_THREADS", "0"))
+    EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+    ONNX_EXPORT_DIR = os.getenv("ONNX_EXPORT_DIR", "./models/onnx")
+    ONNX_QUANTIZE = os.getenv("ONNX_QUANTIZE", "true").lower() == "true"
+    
+    # Concurrency
+    MAX_WORKERS = int(os.getenv("MAX_WORKERS", "8"))
+    
+    # Shared inference pool (src/core/inference_server.py). When an address is
+    # set, API processes send Whisper, M2M100 and embedding work to it instead
+    # of loading their own copies of the models. Without an authkey the
+    # server writes a random one to <address>.key for same-user clients.
+    INFERENCE_SERVER_ADDRESS = os.getenv("INFERENCE_SERVER_ADDRESS", "")
+    INFERENCE_AUTHKEY = os.getenv("INFERENCE_AUTHKEY", "")
+    INFERENCE_MODELS = [
+        name.strip() for name in os.getenv("INFERENCE_MODELS", "whisper,embeddings").split(",") if name.strip()
+    ]
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))  # 0: one per THREADS_PER_WORKER cores
+    INFERENCE_THREADS_PER_WORKER = int(os.getenv("INFERENCE_THREADS_PER_WORKER", "1"))
+    INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "0"))  # 0: twice the workers
+    INFERENCE_QUEUE_TIMEOUT = float(os.getenv("INFERENCE_QUEUE_TIMEOUT", "2.0"))
+    INFERENCE_CLIENT_CONNECTIONS = int(os.getenv("INFERENCE_CLIENT_CONNECTIONS", "8"))
+    
+    # Batch translation (/translate/batch and the JSONL job runner)
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+    BATCH_GROUP_SIZE = int(os.getenv("BATCH_GROUP_SIZE", "32"))
+    BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "256"))
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    
+    # Outbound calls (OpenAI, Google Translate): pooled keep-alive connections,
+    # per-call deadlines (retries included), jittered retries, optional hedging
+    # (a duplicate request after *_HEDGE_AFTER_MS, 0 disables) and a circuit
+    # breaker that fails fast to the local fallback while an upstream is down
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+    TRANSLATE_TIMEOUT_SECONDS = float(os.getenv("TRANSLATE_TIMEOUT_SECONDS", "5"))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "2"))
+    UPSTREAM_RETRY_BASE_DELAY = float(os.getenv("UPSTREAM_RETRY_BASE_DELAY", "0.2"))
+    UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "64"))
+    LLM_HEDGE_AFTER_MS = float(os.getenv("LLM_HEDGE_AFTER_MS", "0"))
+    TRANSLATE_HEDGE_AFTER_MS = float(os.getenv("TRANSLATE_HEDGE_AFTER_MS", "0"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    
+    # Admission control in front of the upstreams: request/token budgets per
+    # minute (0 disables a limit) and calls in flight; waiting calls are
+    # ordered interactive before batch, translation/adaptation before response
+    # suggestions. Suggestions waiting longer than SCHEDULER_SHED_AFTER_SECONDS
+    # are shed to their fallback; batch work waits up to
+    # SCHEDULER_BATCH_MAX_WAIT_SECONDS
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "3500"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "90000"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+    TRANSLATE_REQUESTS_PER_MINUTE = float(os.getenv("TRANSLATE_REQUESTS_PER_MINUTE", "0"))
+    TRANSLATE_MAX_CONCURRENCY = int(os.getenv("TRANSLATE_MAX_CONCURRENCY", "16"))
+    SCHEDULER_MAX_QUEUE = int(os.getenv("SCHEDULER_MAX_QUEUE", "200"))
+    SCHEDULER_BURST_SECONDS = float(os.getenv("SCHEDULER_BURST_SECONDS", "5"))
+    SCHEDULER_SHED_AFTER_SECONDS = float(os.getenv("SCHEDULER_SHED_AFTER_SECONDS", "1.0"))
+    SCHEDULER_BATCH_MAX_WAIT_SECONDS = float(os.getenv("SCHEDULER_BATCH_MAX_WAIT_SECONDS", "300"))
+    SCHEDULER_THROTTLE_SECONDS = float(os.getenv("SCHEDULER_THROTTLE_SECONDS", "2"))
+    
+    # Streamlit frontend: "local" runs the pipeline (and loads the models) in
+    # the Streamlit process; "api" is a thin client of the FastAPI backend at
+    # API_BASE_URL over one pooled HTTP client per process
+    FRONTEND_MODE = os.getenv("FRONTEND_MODE", "local")
+    API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+    API_TIMEOUT_SECONDS = float(os.getenv("API_TIMEOUT_SECONDS", "60"))
+    API_MAX_CONNECTIONS = int(os.getenv("API_MAX_CONNECTIONS", "20"))
+    
+    # Models loaded in the background at startup (comma-separated registry names)
+    WARMUP_MODELS = [name.strip() for name in os.getenv("WARMUP_MODELS", "").split(",") if name.strip()]
+    # "background": bind at once, load endpoint models in the background and
+    # answer 503 until they are ready; "blocking": load them before serving;
+    # "lazy": load on first use (requests wait for the load)
+    STARTUP_MODE = os.getenv("STARTUP_MODE", "background")
+    READY_RETRY_AFTER_SECONDS = int(os.getenv("READY_RETRY_AFTER_SECONDS", "5"))
+    
+    # Translation / adaptation cache (in-process LRU, optional SQLite tier at DATABASE_URL)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "86400"))
+    CACHE_PERSIST = os.getenv("CACHE_PERSIST", "false").lower() == "true"
+    
+    # Semantic cache: reuse adaptations/suggestions of near-duplicate inputs
+    # (cosine similarity of their embeddings at least the threshold)
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+    SEMANTIC_CACHE_AUDIT_RATE = float(os.getenv("SEMANTIC_CACHE_AUDIT_RATE", "0.01"))
+    # Source languages adaptations are matched in; the default embedding
+    # model is English-only, list more with a multilingual EMBEDDING_MODEL
+    SEMANTIC_CACHE_LANGUAGES = [
+        lang.strip() for lang in os.getenv("SEMANTIC_CACHE_LANGUAGES", "en").split(",") if lang.strip()
+    ]
+    
+    # Conversation sessions: recent turns kept verbatim within a token budget,
+    # older turns folded into a rolling summary (persisted at DATABASE_URL)
+    SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "6"))
+    SESSION_HISTORY_TOKENS = int(os.getenv("SESSION_HISTORY_TOKENS", "600"))
+    SESSION_SUMMARY_TOKENS = int(os.getenv("SESSION_SUMMARY_TOKENS", "200"))
+    SESSION_MAX_ACTIVE = int(os.getenv("SESSION_MAX_ACTIVE", "10000"))
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "86400"))
+    SESSION_PERSIST = os.getenv("SESSION_PERSIST", "true").lower() == "true"
+    
+    # Cultural adaptation: "single" (one LLM call per text) or "batched"
+    # (concurrent and batch texts for one culture packed into one prompt)
+    ADAPTATION_MODE = os.getenv("ADAPTATION_MODE", "single")
+    ADAPTATION_BATCH_SIZE = int(os.getenv("ADAPTATION_BATCH_SIZE", "16"))
+    ADAPTATION_BATCH_WAIT_MS = float(os.getenv("ADAPTATION_BATCH_WAIT_MS", "20"))
+    ADAPTATION_BATCH_CONCURRENCY = int(os.getenv("ADAPTATION_BATCH_CONCURRENCY", "4"))
+    
+    # Local adaptation tier: the basic translation is used as the adaptation
+    # when its local confidence (length, politeness/directness rules and
+    # M2M100/Google agreement) reaches the threshold; the rest goes to the
+    # LLM. CROSS_CHECK translates with the second backend (Google, or M2M100
+    # when already loaded) only for texts that would otherwise stay local
+    LOCAL_ADAPTATION_ENABLED = os.getenv("LOCAL_ADAPTATION_ENABLED", "true").lower() == "true"
+    LOCAL_ADAPTATION_THRESHOLD = float(os.getenv("LOCAL_ADAPTATION_THRESHOLD", "0.85"))
+    LOCAL_ADAPTATION_CROSS_CHECK = os.getenv("LOCAL_ADAPTATION_CROSS_CHECK", "true").lower() == "true"
+    # Confidence lost when neither side is English and the tone rules cannot run
+    LOCAL_ADAPTATION_UNCHECKED_PENALTY = float(os.getenv("LOCAL_ADAPTATION_UNCHECKED_PENALTY", "0.2"))
+    
+    # Precomputed phrasebook of stock phrases per culture, consulted first by
+    # /translate (built with "python -m src.core.phrasebook build")
+    PHRASEBOOK_ENABLED = os.getenv("PHRASEBOOK_ENABLED", "true").lower() == "true"
+    PHRASEBOOK_PATH = os.getenv("PHRASEBOOK_PATH", "data/phrasebook/phrasebook.bin")
+    PHRASEBOOK_PHRASES = os.getenv("PHRASEBOOK_PHRASES", "data/phrasebook/phrases.txt")
+    
     # Cultural Knowledge Base
     CULTURAL_DB_PATH = "data/cultural_knowledge/"
+    CULTURAL_COLLECTION = os.getenv("CULTURAL_COLLECTION", "cultural_knowledge")
+    # Corpus files (JSONL/CSV/Markdown) under CULTURAL_DB_PATH are ingested
+    # on startup in batches of INGEST_BATCH_SIZE chunks
+    CULTURAL_INCLUDE_SAMPLES = os.getenv("CULTURAL_INCLUDE_SAMPLES", "true").lower() == "true"
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    # Answer retrieval from an in-memory NumPy index instead of querying Chroma
+    RAG_IN_MEMORY_INDEX = os.getenv("RAG_IN_MEMORY_INDEX", "true").lower() == "true"
+    # "hybrid" fuses BM25 keyword hits with dense results; "dense" is vector-only.
+    # Queries whose best keyword match scores at least RAG_LEXICAL_CONFIDENCE
+    # (normalised BM25, 0-1) skip the embedding pass entirely.
+    RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+    RAG_LEXICAL_CONFIDENCE = float(os.getenv("RAG_LEXICAL_CONFIDENCE", "0.6"))
+    RAG_FUSION_CANDIDATES = int(os.getenv("RAG_FUSION_CANDIDATES", "10"))
     
     # Supported Languages and Cultures
     SUPPORTED_CULTURES = {
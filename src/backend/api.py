@@ -2,17 +2,63 @@
 FastAPI backend for CultiTrans
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import Depends, FastAPI, UploadFile, File, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+from contextlib import asynccontextmanager
+import asyncio
 import io
+import itertools
+import json
+import time
 
 from src.core.asr import ASRProcessor
+from src.core.audio import AudioDecodeError, pcm16_to_float32
+from src.core.batch_runner import BatchProcessor
+from src.core.inference_server import InferenceBusyError
+from src.core.concurrency import iterate_blocking, run_blocking, shutdown_executor
+from src.core.metrics import (
+    REQUEST_SECONDS, end_request_timings, metrics, server_timing_header, start_request_timings
+)
+from src.core.model_registry import registry
+from src.core.phrasebook import get_phrasebook
+from src.core.upstream import upstream_queue_depths, upstream_states
 from src.core.translator import CulturalTranslator
 from src.core.response_generator import ResponseGenerator
+from src.core.streaming_asr import StreamingTranscriber
+from config.settings import settings
+
+# Models each endpoint needs before it can answer without a cold load
+TRANSLATE_MODELS = ["cultural_rag"] + (["m2m100_engine"] if settings.TRANSLATION_BACKEND == "m2m100" else [])
+ASR_MODELS = ["whisper"]
+
+def _startup_models() -> List[str]:
+    names = list(settings.WARMUP_MODELS)
+    if settings.STARTUP_MODE != "lazy":
+        names += [name for name in TRANSLATE_MODELS + ASR_MODELS if name not in names]
+    return names
 
-app = FastAPI(title="CultiTrans API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load models according to STARTUP_MODE
+    
+    Heavy libraries (torch, transformers, whisper, langchain, chromadb) are
+    only imported by the registry loaders, so in the default background
+    mode the port is bound right away and /readyz reports progress.
+    """
+    names = _startup_models()
+    if settings.STARTUP_MODE == "blocking":
+        await run_blocking(registry.warmup, names, background=False)
+    else:
+        for name in names:
+            registry.load_async(name)
+    yield
+    shutdown_executor(wait=False)
+
+app = FastAPI(title="CultiTrans API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -28,58 +74,441 @@ asr_processor = ASRProcessor()
 translator = CulturalTranslator()
 response_generator = ResponseGenerator()
 
+def _loaded_stats(name, read):
+    """Gauge collector reading a shared component only once it is loaded"""
+    def collect():
+        return read(registry.get(name)) if registry.is_loaded(name) else {}
+    return collect
+
+metrics.gauge_callback(
+    "cultitrans_cache", "Translation/adaptation/response cache counters",
+    _loaded_stats("cache", lambda cache: cache.stats()), label="stat"
+)
+metrics.gauge_callback(
+    "cultitrans_embedding_cache", "Query-embedding cache counters",
+    _loaded_stats("embeddings", lambda e: {"hits": getattr(e, "hits", 0), "misses": getattr(e, "misses", 0)}),
+    label="stat"
+)
+metrics.gauge_callback(
+    "cultitrans_retrieval_queries", "Cultural context queries by retrieval path",
+    _loaded_stats("cultural_rag", lambda rag: rag.retrieval_stats), label="path"
+)
+metrics.gauge_callback(
+    "cultitrans_sessions", "Conversation sessions held in memory",
+    _loaded_stats("sessions", lambda sessions: sessions.stats()), label="stat"
+)
+metrics.gauge_callback(
+    "cultitrans_semantic_cache", "Semantic near-duplicate cache counters",
+    _loaded_stats("semantic_cache", lambda cache: cache.stats()), label="stat"
+)
+
+metrics.gauge_callback(
+    "cultitrans_upstream_circuit_open", "1 while an upstream's circuit breaker is open",
+    lambda: {name: float(state != "closed") for name, state in upstream_states().items()},
+    label="upstream"
+)
+metrics.gauge_callback(
+    "cultitrans_upstream_queue_depth", "Upstream calls waiting for admission (and in flight) by priority",
+    upstream_queue_depths, label="queue"
+)
+
+@app.middleware("http")
+async def record_request_timings(request: Request, call_next):
+    """Time every request and report its pipeline stages in a Server-Timing header"""
+    timings, token = start_request_timings()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        end_request_timings(token)
+    elapsed = time.perf_counter() - started
+    
+    # Label by route template, not raw URL, to bound cardinality
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(
+        elapsed,
+        method=request.method,
+        path=getattr(route, "path", "unmatched"),
+        status=response.status_code
+    )
+    response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
+
 class TranslationRequest(BaseModel):
     text: str
     source_language: str
     target_culture: str
+    # Server-side conversation session; its bounded history is added to prompts
+    session_id: Optional[str] = None
 
 class TranslationResponse(BaseModel):
     basic_translation: str
     cultural_adaptation: str
     culture_notes: str
     response_suggestions: list
+    confidence: Optional[float] = None
+
+class BatchTranslationRequest(BaseModel):
+    items: List[TranslationRequest]
+    include_suggestions: bool = False
+
+class BatchTranslationItem(BaseModel):
+    basic_translation: Optional[str] = None
+    cultural_adaptation: Optional[str] = None
+    culture_notes: Optional[str] = None
+    response_suggestions: Optional[list] = None
+    confidence: Optional[float] = None
+    error: Optional[str] = None
+
+class BatchTranslationResponse(BaseModel):
+    results: List[BatchTranslationItem]
+
+def _missing_models(names: List[str]) -> List[str]:
+    """Models that are not loaded yet (none in lazy mode, where requests wait)"""
+    if settings.STARTUP_MODE == "lazy":
+        return []
+    return [name for name in names if not registry.is_loaded(name)]
+
+def ensure_models(names: List[str]):
+    """Answer 503 while a model the request needs is still loading"""
+    missing = _missing_models(names)
+    if missing:
+        # Retry failed loads; a load already in progress is left alone
+        for name in missing:
+            registry.load_async(name)
+        status = registry.status()
+        raise HTTPException(
+            status_code=503,
+            detail={"not_ready": {name: status[name]["status"] for name in missing}},
+            headers={"Retry-After": str(settings.READY_RETRY_AFTER_SECONDS)}
+        )
+
+def requires_models(*names: str):
+    """Dependency answering 503 while a model the endpoint needs is still loading"""
+    async def check():
+        ensure_models(list(names))
+    return Depends(check)
+
+def _conversation_context(request: TranslationRequest) -> str:
+    """Prompt context for a request: session history (if any) plus the new message"""
+    if not request.session_id:
+        return f"User said: {request.text}"
+    return registry.get("sessions").conversation_context(request.session_id, request.text)
+
+def _record_turn(request: TranslationRequest, adaptation: str):
+    if request.session_id:
+        registry.get("sessions").add_turn(request.session_id, request.text, adaptation)
+
+async def _phrasebook_response(request: TranslationRequest, entry: dict) -> TranslationResponse:
+    """Answer from a phrasebook entry; suggestions are regenerated when the session has history"""
+    responses = entry.get("response_suggestions") or []
+    if request.session_id:
+        context = await run_blocking(_conversation_context, request)
+        if context != f"User said: {request.text}" and not _missing_models(["cultural_rag"]):
+            # Stored suggestions were generated without conversation history;
+            # they still stand in while the knowledge base loads
+            responses = await run_blocking(
+                response_generator.generate_responses,
+                context, request.target_culture, query=request.text
+            )
+        await run_blocking(_record_turn, request, entry["cultural_adaptation"])
+    
+    return TranslationResponse(
+        basic_translation=entry["basic_translation"],
+        cultural_adaptation=entry["cultural_adaptation"],
+        culture_notes=entry["culture_notes"],
+        response_suggestions=responses,
+        confidence=entry.get("confidence")
+    )
 
 @app.post("/translate", response_model=TranslationResponse)
 async def translate_text(request: TranslationRequest):
     """Translate text with cultural awareness"""
     try:
-        # Translation
-        translation_result = translator.translate_with_culture(
-            request.text, request.source_language, request.target_culture
-        )
+        # Stock phrases are answered from the memory-mapped phrasebook, even
+        # while the models load; the lookup takes microseconds, so it runs
+        # on the event loop
+        phrasebook = get_phrasebook()
+        if phrasebook is not None:
+            entry = phrasebook.lookup(request.text, request.source_language, request.target_culture)
+            if entry is not None:
+                return await _phrasebook_response(request, entry)
+        
+        ensure_models(TRANSLATE_MODELS)
+        context = await run_blocking(_conversation_context, request)
         
-        # Response suggestions
-        responses = response_generator.generate_responses(
-            f"User said: {request.text}", request.target_culture
+        # Translation (googletrans + LLM adaptation) and RAG-backed response
+        # suggestions are independent, so run them side by side on the worker pool
+        translation_result, responses = await asyncio.gather(
+            run_blocking(
+                translator.translate_with_culture,
+                request.text, request.source_language, request.target_culture
+            ),
+            run_blocking(
+                response_generator.generate_responses,
+                context, request.target_culture, query=request.text
+            )
         )
+        await run_blocking(_record_turn, request, translation_result["cultural_adaptation"])
         
         return TranslationResponse(
             basic_translation=translation_result["basic_translation"],
             cultural_adaptation=translation_result["cultural_adaptation"],
             culture_notes=translation_result["culture_notes"],
-            response_suggestions=responses
+            response_suggestions=responses,
+            confidence=translation_result["confidence"]
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/transcribe")
+@app.post("/translate/batch", response_model=BatchTranslationResponse,
+          dependencies=[requires_models(*TRANSLATE_MODELS)])
+async def translate_batch(request: BatchTranslationRequest):
+    """Translate many texts in one call, grouped per source language and culture"""
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BATCH_MAX_ITEMS} items per batch"
+        )
+    
+    processor = BatchProcessor(
+        translator,
+        response_generator,
+        include_suggestions=request.include_suggestions
+    )
+    results = await run_blocking(processor.process, [item.dict() for item in request.items])
+    return BatchTranslationResponse(results=[BatchTranslationItem(**result) for result in results])
+
+@app.post("/translate/stream", dependencies=[requires_models(*TRANSLATE_MODELS)])
+async def translate_text_stream(request: TranslationRequest):
+    """
+    Stream a cultural translation as newline-delimited JSON events
+    
+    Event types, in the order they first appear: "translation" (basic
+    translation and culture notes), "adaptation_delta" (LLM tokens),
+    "adaptation" (complete adaptation), "suggestion" (one parsed response
+    suggestion each), "error" and finally "done".
+    """
+    async def event_stream():
+        queue: asyncio.Queue = asyncio.Queue()
+        context = await run_blocking(_conversation_context, request)
+        
+        async def pump(source, wrap=None):
+            try:
+                async for item in source:
+                    await queue.put(wrap(item) if wrap else item)
+            except Exception as e:
+                await queue.put({"type": "error", "detail": str(e)})
+            finally:
+                await queue.put(None)
+        
+        suggestion_index = itertools.count(1)
+        producers = [
+            asyncio.create_task(pump(iterate_blocking(
+                translator.stream_with_culture,
+                request.text, request.source_language, request.target_culture
+            ))),
+            asyncio.create_task(pump(
+                iterate_blocking(
+                    response_generator.stream_responses,
+                    context, request.target_culture, query=request.text
+                ),
+                lambda suggestion: {
+                    "type": "suggestion",
+                    "index": next(suggestion_index),
+                    "suggestion": suggestion
+                }
+            ))
+        ]
+        
+        # Suggestions run concurrently but are held back until the basic
+        # translation has been sent, so clients always see it first
+        held_back = []
+        translation_sent = False
+        remaining = len(producers)
+        try:
+            while remaining:
+                event = await queue.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                if event["type"] == "suggestion" and not translation_sent:
+                    held_back.append(event)
+                    continue
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+                if event["type"] == "adaptation":
+                    await run_blocking(_record_turn, request, event["cultural_adaptation"])
+                if event["type"] == "translation":
+                    translation_sent = True
+                    for pending in held_back:
+                        yield json.dumps(pending, ensure_ascii=False) + "\n"
+                    held_back = []
+            for pending in held_back:
+                yield json.dumps(pending, ensure_ascii=False) + "\n"
+            yield json.dumps({"type": "done"}) + "\n"
+        finally:
+            for task in producers:
+                task.cancel()
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@app.post("/transcribe", dependencies=[requires_models(*ASR_MODELS)])
 async def transcribe_audio(audio: UploadFile = File(...)):
     """Transcribe audio to text"""
     try:
         audio_data = await audio.read()
-        transcription = asr_processor.transcribe_audio(audio_data)
+        segments = await run_blocking(asr_processor.transcribe_segments, audio_data)
+        transcription = " ".join(segment["text"] for segment in segments).strip()
         
         if transcription:
-            return {"transcription": transcription}
+            return {"transcription": transcription, "segments": segments}
         else:
             raise HTTPException(status_code=400, detail="Transcription failed")
+    except HTTPException:
+        raise
+    except AudioDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Could not decode audio: {e}")
+    except InferenceBusyError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e),
+            headers={"Retry-After": str(settings.READY_RETRY_AFTER_SECONDS)}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.websocket("/ws/translate")
+async def live_translate(websocket: WebSocket, source_language: str = "auto", target_culture: str = "american"):
+    """
+    Live speech-to-translation
+    
+    The client streams binary frames of 16 kHz mono 16-bit little-endian
+    PCM while the user speaks. Text frames carry JSON control messages:
+    {"type": "config", "source_language": ..., "target_culture": ...} and
+    {"type": "end"}. The server sends JSON events: "partial" and "final"
+    transcripts, a "translation" for every final utterance, and "error".
+    """
+    await websocket.accept()
+    missing = _missing_models(ASR_MODELS + TRANSLATE_MODELS)
+    if missing:
+        for name in missing:
+            registry.load_async(name)
+        await websocket.send_json({"type": "error", "detail": f"Models still loading: {', '.join(missing)}"})
+        await websocket.close(code=1013)  # Try Again Later
+        return
+    config = {"source_language": source_language, "target_culture": target_culture}
+    send_lock = asyncio.Lock()
+    pending_translations = set()
+    
+    async def send(event):
+        async with send_lock:
+            await websocket.send_json(event)
+    
+    async def translate_utterance(final):
+        try:
+            result = await run_blocking(
+                translator.translate_with_culture,
+                final["text"], config["source_language"], config["target_culture"]
+            )
+            await send({"type": "translation", "utterance": final["utterance"], **result})
+        except Exception as e:
+            await send({"type": "error", "utterance": final["utterance"], "detail": str(e)})
+    
+    async def emit(events):
+        for event in events:
+            await send(event)
+            if event["type"] == "final":
+                # Translate right away while transcription keeps going
+                task = asyncio.create_task(translate_utterance(event))
+                pending_translations.add(task)
+                task.add_done_callback(pending_translations.discard)
+    
+    transcriber = StreamingTranscriber(
+        asr_processor.transcribe_array,
+        partial_interval=settings.STREAM_PARTIAL_INTERVAL,
+        window_seconds=settings.STREAM_WINDOW_SECONDS,
+        min_silence_ms=settings.STREAM_MIN_SILENCE_MS
+    )
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                samples = pcm16_to_float32(message["bytes"])
+                await emit(await run_blocking(transcriber.feed, samples))
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "config":
+                    config.update({
+                        key: control[key] for key in ("source_language", "target_culture") if key in control
+                    })
+                elif control.get("type") == "end":
+                    await emit(await run_blocking(transcriber.flush))
+                    break
+        
+        if pending_translations:
+            await asyncio.gather(*pending_translations)
+        await websocket.close()
+    except WebSocketDisconnect:
+        for task in pending_translations:
+            task.cancel()
+    except Exception as e:
+        await send({"type": "error", "detail": str(e)})
+        await websocket.close(code=1011)
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving its event loop"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: per-component load state; 503 until endpoint models are loaded"""
+    required = TRANSLATE_MODELS + ASR_MODELS
+    ready = not _missing_models(required)
+    components = {
+        name: {**state, "required": name in required} for name, state in registry.status().items()
+    }
+    return JSONResponse(
+        {
+            "ready": ready,
+            "startup_mode": settings.STARTUP_MODE,
+            "components": components,
+            "upstreams": upstream_states()
+        },
+        status_code=200 if ready else 503
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of stage latencies, fallbacks, tokens and caches"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    """Rolling summary and recent turns of a conversation session"""
+    session = await run_blocking(registry.get("sessions").get, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return session.to_dict()
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """Forget a conversation session"""
+    await run_blocking(registry.get("sessions").delete, session_id)
+    return {"deleted": session_id}
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss statistics of the translation and adaptation cache"""
+    return registry.get("cache").stats()
+
 @app.get("/cultures")
 async def get_supported_cultures():
     """Get list of supported cultures"""
-    from config.settings import settings
     return {"cultures": settings.SUPPORTED_CULTURES}
 
 if __name__ == "__main__":
@@ -2,18 +2,30 @@
 Automatic Speech Recognition module
 """
 
-import speech_recognition as sr
-import whisper
-import io
-import tempfile
-import os
-from typing import Optional
+from typing import Dict, List, Optional
+import numpy as np
 from config.settings import settings
+from .inference_profile import inference_threads
+from .audio import SAMPLE_RATE, decode_audio, float32_to_pcm16, split_on_silence
+from .metrics import record_fallback, span
+from .model_registry import registry
 
 class ASRProcessor:
     def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.whisper_model = whisper.load_model(settings.WHISPER_MODEL)
+        self._recognizer = None
+    
+    @property
+    def recognizer(self):
+        """speech_recognition client, imported only if Google ASR is used"""
+        if self._recognizer is None:
+            import speech_recognition as sr
+            self._recognizer = sr.Recognizer()
+        return self._recognizer
+    
+    @property
+    def whisper_model(self):
+        """Shared Whisper model, loaded on first use"""
+        return registry.get("whisper")
     
     def transcribe_audio(self, audio_data: bytes, method: str = "whisper") -> Optional[str]:
         """
@@ -32,23 +44,102 @@ class ASRProcessor:
             elif method == "google":
                 return self._google_transcribe(audio_data)
         except Exception as e:
-            print(f"ASR Error: {e}")
+            record_fallback("asr", e)
             return None
     
+    def transcribe_segments(self, audio_data: bytes) -> List[Dict]:
+        """
+        Transcribe audio with Whisper and return timestamped segments
+        
+        Args:
+            audio_data: Uploaded audio file bytes (any format ffmpeg can decode)
+        
+        Returns:
+            List of {"start", "end", "text"} dictionaries (times in seconds)
+        """
+        with span("asr_decode"):
+            audio = decode_audio(audio_data)
+        with span("asr_transcribe"):
+            return self._whisper_segments(audio)
+    
+    def transcribe_array(self, audio: np.ndarray, prompt: Optional[str] = None) -> str:
+        """
+        Transcribe an already decoded 16 kHz float32 buffer (e.g. a live window)
+        
+        Args:
+            audio: Float32 samples
+            prompt: Previous utterance, used as decoding context
+        
+        Returns:
+            Transcribed text
+        """
+        with span("asr_transcribe"), inference_threads("whisper"):
+            result = self.whisper_model.transcribe(
+                audio, fp16=False, initial_prompt=prompt, condition_on_previous_text=False
+            )
+        return result["text"].strip()
+    
     def _whisper_transcribe(self, audio_data: bytes) -> str:
         """Transcribe using Whisper model"""
-        # Whisper needs a file path, not BytesIO
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-            temp_file.write(audio_data)
-            temp_file.flush()
-            
-            try:
-                result = self.whisper_model.transcribe(temp_file.name)
-                return result["text"]
-            finally:
-                os.unlink(temp_file.name)
+        segments = self.transcribe_segments(audio_data)
+        return " ".join(segment["text"] for segment in segments).strip()
+    
+    def _whisper_segments(self, audio: np.ndarray) -> List[Dict]:
+        """Decode in memory; long recordings are split and decoded in batches"""
+        if len(audio) <= settings.ASR_CHUNK_SECONDS * SAMPLE_RATE:
+            with inference_threads("whisper"):
+                result = self.whisper_model.transcribe(audio, fp16=False)
+            return [
+                {"start": seg["start"], "end": seg["end"], "text": seg["text"].strip()}
+                for seg in result.get("segments", [])
+            ]
+        
+        chunks = split_on_silence(
+            audio,
+            max_chunk_seconds=settings.ASR_CHUNK_SECONDS,
+            min_silence_ms=settings.ASR_MIN_SILENCE_MS
+        )
+        segments = []
+        batch_size = settings.ASR_BATCH_SIZE
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+            texts = self._whisper_decode_batch([audio[start:end] for start, end in batch])
+            for (start, end), text in zip(batch, texts):
+                if text:
+                    segments.append({
+                        "start": start / SAMPLE_RATE,
+                        "end": end / SAMPLE_RATE,
+                        "text": text
+                    })
+        return segments
+    
+    def _whisper_decode_batch(self, chunks: List[np.ndarray]) -> List[str]:
+        """Decode up to 30 s chunks in a single batched Whisper forward pass"""
+        model = self.whisper_model
+        # Models served by the shared inference pool decode next to the weights
+        if hasattr(model, "decode_batch"):
+            return model.decode_batch(chunks)
+        return decode_batch(model, chunks)
     
     def _google_transcribe(self, audio_data: bytes) -> str:
         """Transcribe using Google Speech Recognition"""
-        audio = sr.AudioData(audio_data, 16000, 2)
-        return self.recognizer.recognize_google(audio)
+        with span("asr_decode"):
+            pcm = float32_to_pcm16(decode_audio(audio_data))
+        import speech_recognition as sr
+        audio = sr.AudioData(pcm, SAMPLE_RATE, 2)
+        with span("asr_transcribe"):
+            return self.recognizer.recognize_google(audio)
+
+def decode_batch(model, chunks: List[np.ndarray]) -> List[str]:
+    """Decode up to 30 s chunks with a loaded Whisper model in one forward pass"""
+    import torch
+    import whisper
+    
+    mels = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(chunk), n_mels=model.dims.n_mels)
+        for chunk in chunks
+    ]).to(model.device)
+    options = whisper.DecodingOptions(fp16=False, without_timestamps=True)
+    with torch.inference_mode(), inference_threads("whisper"):
+        results = whisper.decode(model, mels, options)
+    return [result.text.strip() for result in results]
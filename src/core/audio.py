@@ -0,0 +1,186 @@
+"""
+In-memory audio ingestion: decoding, resampling and VAD-aligned chunking
+"""
+
+import io
+import subprocess
+import wave
+from typing import List, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class AudioDecodeError(Exception):
+    """Raised when uploaded audio cannot be decoded"""
+
+
+class UnrecognizedAudioError(AudioDecodeError):
+    """Raised when ffmpeg cannot detect the format of the input"""
+
+
+# Signatures of containers/codecs ffmpeg should have decoded; input that
+# starts with one of them and still fails is corrupt, not headerless PCM
+_MAGIC = (b"RIFF", b"RIFX", b"ID3", b"OggS", b"fLaC", b"\x1aE\xdf\xa3", b"FORM", b"caff", b"#!AMR", b"MThd")
+
+
+def _has_container_magic(data: bytes) -> bool:
+    """Whether the bytes start like a known audio file"""
+    if data.startswith(_MAGIC) or data[4:8] == b"ftyp":
+        return True
+    if len(data) >= 3 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0:
+        if data[1] & 0xF6 == 0xF0:
+            return True  # AAC ADTS
+        # MPEG audio frame: valid version, layer and bitrate index
+        return (data[1] >> 3) & 3 != 1 and (data[1] >> 1) & 3 != 0 and data[2] >> 4 != 0xF
+    return False
+
+
+def decode_audio(data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an uploaded audio file into a mono float32 buffer
+
+    16-bit PCM WAV at the target rate is parsed directly; every other
+    container/codec is piped through ffmpeg in memory (no temp files).
+    Input whose format ffmpeg cannot detect and that has no known file
+    signature is treated as raw 16 kHz 16-bit PCM, the format the Google
+    recognizer used to assume.
+
+    Args:
+        data: Uploaded file bytes
+        sample_rate: Output sample rate
+
+    Returns:
+        Float32 samples in [-1, 1]
+    """
+    audio = _decode_wav(data, sample_rate)
+    if audio is not None:
+        return audio
+
+    try:
+        return _decode_ffmpeg(data, sample_rate)
+    except UnrecognizedAudioError:
+        if data and len(data) % 2 == 0 and sample_rate == SAMPLE_RATE and not _has_container_magic(data):
+            return pcm16_to_float32(data)
+        raise
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Convert little-endian 16-bit mono PCM to float32 samples"""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def float32_to_pcm16(audio: np.ndarray) -> bytes:
+    """Convert float32 samples to little-endian 16-bit PCM"""
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def _decode_wav(data: bytes, sample_rate: int):
+    """Fast path for PCM WAV already at the target rate; None otherwise"""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            if wav.getsampwidth() != 2 or wav.getframerate() != sample_rate:
+                return None
+            channels = wav.getnchannels()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    audio = pcm16_to_float32(frames)
+    if channels > 1:
+        audio = audio[: len(audio) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return audio.astype(np.float32, copy=False)
+
+
+def _decode_ffmpeg(data: bytes, sample_rate: int) -> np.ndarray:
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "pipe:1"
+    ]
+    try:
+        result = subprocess.run(cmd, input=data, capture_output=True, check=True)
+    except FileNotFoundError as e:
+        raise AudioDecodeError("ffmpeg is not installed") from e
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode("utf-8", errors="ignore")
+        if "Invalid data found when processing input" in message:
+            raise UnrecognizedAudioError(message[-500:]) from e
+        raise AudioDecodeError(message[-500:]) from e
+    return pcm16_to_float32(result.stdout)
+
+
+def frame_energy(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    """RMS energy of consecutive non-overlapping frames"""
+    n_frames = len(audio) // frame_length
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n_frames * frame_length].reshape(n_frames, frame_length)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def speech_threshold(energy: np.ndarray, floor: float = 0.005) -> float:
+    """Adaptive speech/silence energy threshold for a recording"""
+    if len(energy) == 0:
+        return floor
+    noise = np.percentile(energy, 10)
+    peak = np.percentile(energy, 95)
+    return max(floor, noise + 0.1 * (peak - noise))
+
+
+def split_on_silence(audio: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                     max_chunk_seconds: float = 30.0, min_silence_ms: int = 300,
+                     frame_ms: int = 30) -> List[Tuple[int, int]]:
+    """
+    Split a recording into chunks no longer than max_chunk_seconds
+
+    Cuts are placed in the quietest stretch of the second half of each
+    window, so words are not split between chunks. Chunks that contain no
+    speech at all are dropped.
+
+    Args:
+        audio: Float32 samples
+        sample_rate: Sample rate of audio
+        max_chunk_seconds: Maximum chunk length (Whisper's window is 30 s)
+        min_silence_ms: Length of the quiet stretch a cut point is centred in
+        frame_ms: VAD frame length
+
+    Returns:
+        List of (start_sample, end_sample) pairs
+    """
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    energy = frame_energy(audio, frame_length)
+    threshold = speech_threshold(energy)
+    max_frames = max(1, int(max_chunk_seconds * 1000 // frame_ms))
+    smooth = max(1, min_silence_ms // frame_ms)
+
+    # Moving average so cuts land in sustained silence, not between syllables
+    if len(energy) >= smooth:
+        smoothed = np.convolve(energy, np.ones(smooth) / smooth, mode="same")
+    else:
+        smoothed = energy
+
+    chunks = []
+    start = 0
+    total_frames = len(energy)
+    while start < total_frames:
+        end = min(start + max_frames, total_frames)
+        if end < total_frames:
+            search_from = start + max_frames // 2
+            end = search_from + int(np.argmin(smoothed[search_from:end]))
+            end = max(end, start + 1)
+        if np.any(energy[start:end] >= threshold):
+            chunks.append((start * frame_length, end * frame_length))
+        start = end
+
+    tail = total_frames * frame_length
+    if chunks and chunks[-1][1] == tail and tail < len(audio):
+        chunks[-1] = (chunks[-1][0], len(audio))
+    if total_frames == 0 and len(audio):
+        # Shorter than one VAD frame
+        chunks.append((0, len(audio)))
+    return chunks
@@ -0,0 +1,259 @@
+"""
+Batch translation and resumable JSONL bulk jobs
+
+Usage:
+    python -m src.core.batch_runner input.jsonl output.jsonl [--suggestions] [--retry-failed]
+
+Each input line is a JSON object with "text", "source_language" and
+"target_culture". Output lines carry the input line number, so an
+interrupted job can be restarted with the same arguments and only the
+missing lines are processed; add --retry-failed to also reprocess lines
+that failed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from config.settings import settings
+from .metrics import record_fallback, span
+from .scheduler import batch_work
+from .sessions import format_message
+
+REQUIRED_FIELDS = ("text", "source_language", "target_culture")
+
+
+class BatchProcessor:
+    """
+    Runs many translation records through the pipeline with bounded concurrency
+
+    Records are grouped by (source language, target culture) so each group
+    shares culture lookups and can be translated as one batch.
+    """
+
+    def __init__(self, translator, response_generator=None, concurrency: int = None,
+                 group_size: int = None, include_suggestions: bool = False):
+        """
+        Args:
+            translator: CulturalTranslator
+            response_generator: ResponseGenerator, required for suggestions
+            concurrency: Maximum number of groups processed at once
+            group_size: Maximum records per translate_batch call
+            include_suggestions: Also generate response suggestions per record
+        """
+        self.translator = translator
+        self.response_generator = response_generator
+        self.concurrency = concurrency or settings.BATCH_CONCURRENCY
+        self.group_size = group_size or settings.BATCH_GROUP_SIZE
+        self.include_suggestions = include_suggestions and response_generator is not None
+
+    def process(self, records: List[Dict]) -> List[Dict]:
+        """
+        Translate a list of records
+
+        Args:
+            records: Dictionaries with text, source_language and target_culture
+
+        Returns:
+            One result per record, in input order; invalid or failed records
+            get an "error" entry instead of translation fields
+        """
+        results: List[Optional[Dict]] = [None] * len(records)
+        groups: "OrderedDict[Tuple[str, str], List[int]]" = OrderedDict()
+
+        for i, record in enumerate(records):
+            missing = [field for field in REQUIRED_FIELDS if not isinstance(record.get(field), str)]
+            if missing:
+                results[i] = {"error": f"Missing or invalid fields: {', '.join(missing)}"}
+                continue
+            key = (record["source_language"], record["target_culture"])
+            groups.setdefault(key, []).append(i)
+
+        jobs = []
+        for (source_language, target_culture), indices in groups.items():
+            for start in range(0, len(indices), self.group_size):
+                jobs.append((source_language, target_culture, indices[start:start + self.group_size]))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as pool:
+            futures = [
+                (indices, pool.submit(self._process_group, records, source_language, target_culture, indices))
+                for source_language, target_culture, indices in jobs
+            ]
+            for indices, future in futures:
+                try:
+                    group_results = future.result()
+                except Exception as e:
+                    group_results = [{"error": str(e)}] * len(indices)
+                for i, result in zip(indices, group_results):
+                    results[i] = result
+
+        return results
+
+    def _process_group(self, records: List[Dict], source_language: str,
+                       target_culture: str, indices: List[int]) -> List[Dict]:
+        texts = [records[i]["text"] for i in indices]
+        # Upstream calls queue behind interactive requests
+        with batch_work():
+            results = self.translator.translate_batch(texts, source_language, target_culture)
+            if self.include_suggestions:
+                guidance = self._cultural_contexts(texts, target_culture)
+                for text, result, context in zip(texts, results, guidance):
+                    result["response_suggestions"] = self.response_generator.generate_responses(
+                        format_message(text), target_culture, query=text, cultural_context=context
+                    )
+        return results
+
+    def _cultural_contexts(self, texts: List[str], target_culture: str) -> List[Optional[List[str]]]:
+        """Cultural guidance for every text of a group, retrieved in one call"""
+        try:
+            with span("rag_retrieval"):
+                return self.response_generator.cultural_rag.retrieve_cultural_context_batch(texts, target_culture)
+        except Exception as e:
+            # Each suggestion call retrieves (or falls back) on its own
+            record_fallback("rag_retrieval", e)
+            return [None] * len(texts)
+
+
+def completed_lines(output_path: str, retry_failed: bool = False) -> Set[int]:
+    """
+    Line numbers already written to an output file
+
+    A trailing partial line (left by a crash mid-write) is truncated so
+    appended results start on a fresh line. With ``retry_failed``, lines
+    with an "error" entry are removed from the file and not counted, so
+    their records are processed again.
+    """
+    done: Set[int] = set()
+    if not os.path.exists(output_path):
+        return done
+
+    staging = f"{output_path}.tmp"
+    kept = open(staging, "wb") if retry_failed else None
+    try:
+        with open(output_path, "rb+") as f:
+            valid_end = 0
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                valid_end += len(raw)
+                try:
+                    line = json.loads(raw)
+                    if retry_failed and "error" in line:
+                        continue
+                    done.add(line["line"])
+                except (ValueError, KeyError, TypeError):
+                    pass
+                if kept:
+                    kept.write(raw)
+            f.truncate(valid_end)
+    finally:
+        if kept:
+            kept.close()
+    if retry_failed:
+        os.replace(staging, output_path)
+    return done
+
+
+def read_records(input_path: str, skip: Set[int]) -> Iterator[Tuple[int, Dict]]:
+    """Stream (line number, record) pairs, skipping completed and blank lines"""
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line_number in skip or not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = {"_error": f"Invalid JSON: {e}"}
+            if not isinstance(record, dict):
+                record = {"_error": "Record must be a JSON object"}
+            yield line_number, record
+
+
+def run_job(input_path: str, output_path: str, processor: BatchProcessor,
+            chunk_size: int = None, log=sys.stderr, retry_failed: bool = False) -> Dict[str, float]:
+    """
+    Stream a JSONL file through the pipeline, appending results incrementally
+
+    Args:
+        input_path: JSONL file of translation records
+        output_path: JSONL file results are appended to (resumable)
+        processor: BatchProcessor doing the work
+        chunk_size: Records read and processed per round
+        log: Stream for progress messages (None to disable)
+        retry_failed: Process records that failed in an earlier run again
+
+    Returns:
+        Summary with processed/skipped/failed counts and throughput
+    """
+    chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE
+    done = completed_lines(output_path, retry_failed)
+    stats = {"processed": 0, "failed": 0, "skipped": len(done)}
+    started = time.perf_counter()
+
+    def flush(chunk: List[Tuple[int, Dict]], out):
+        valid = [(n, r) for n, r in chunk if "_error" not in r]
+        results = dict(zip((n for n, _ in valid), processor.process([r for _, r in valid])))
+        for line_number, record in chunk:
+            result = results.get(line_number) or {"error": record.get("_error")}
+            if "error" in result:
+                stats["failed"] += 1
+            out.write(json.dumps({"line": line_number, **record, **result}, ensure_ascii=False) + "\n")
+        out.flush()
+        os.fsync(out.fileno())
+        stats["processed"] += len(chunk)
+        if log:
+            elapsed = time.perf_counter() - started
+            print(
+                f"{stats['processed']} records in {elapsed:.1f}s "
+                f"({stats['processed'] / elapsed:.1f}/s, {stats['failed']} failed)",
+                file=log
+            )
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        chunk: List[Tuple[int, Dict]] = []
+        for line_number, record in read_records(input_path, done):
+            chunk.append((line_number, record))
+            if len(chunk) >= chunk_size:
+                flush(chunk, out)
+                chunk = []
+        if chunk:
+            flush(chunk, out)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = elapsed
+    stats["records_per_second"] = stats["processed"] / elapsed if elapsed else 0.0
+    return stats
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Translate a JSONL file with cultural adaptation")
+    parser.add_argument("input", help="JSONL file of {text, source_language, target_culture} records")
+    parser.add_argument("output", help="JSONL output file (appended to; reruns resume)")
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_CONCURRENCY)
+    parser.add_argument("--group-size", type=int, default=settings.BATCH_GROUP_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=settings.BATCH_CHUNK_SIZE)
+    parser.add_argument("--suggestions", action="store_true", help="Also generate response suggestions")
+    parser.add_argument("--retry-failed", action="store_true", help="Reprocess records that failed in an earlier run")
+    args = parser.parse_args(argv)
+
+    from .translator import CulturalTranslator
+    from .response_generator import ResponseGenerator
+
+    processor = BatchProcessor(
+        CulturalTranslator(),
+        ResponseGenerator() if args.suggestions else None,
+        concurrency=args.concurrency,
+        group_size=args.group_size,
+        include_suggestions=args.suggestions
+    )
+    stats = run_job(args.input, args.output, processor, chunk_size=args.chunk_size, retry_failed=args.retry_failed)
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
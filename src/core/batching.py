@@ -0,0 +1,125 @@
+"""
+Dynamic micro-batching for model inference and LLM calls
+"""
+
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into batches
+
+    Callers submit items from any thread. A single worker thread waits up
+    to ``max_wait_ms`` after the first pending item for more to arrive,
+    groups what it collected by key (e.g. a language pair or a culture)
+    and hands each group to ``process_batch`` in one call.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[Hashable, List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        name: str = "micro-batcher",
+        concurrency: int = 1
+    ):
+        """
+        Args:
+            process_batch: Function mapping (key, items) to one result per item
+            max_batch_size: Maximum number of items collected per batch
+            max_wait_ms: How long to wait for more items after the first one
+            name: Worker thread name
+            concurrency: Number of batches processed at once; use 1 for
+                local model inference and more for I/O-bound upstream calls
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._pool = (
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+            if concurrency > 1 else None
+        )
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, key: Hashable, item: Any) -> Future:
+        """Queue one item and return a future for its result"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future: Future = Future()
+        self._queue.put((key, item, future))
+        return future
+
+    def run(self, key: Hashable, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit one item and block until its batch has been processed"""
+        return self.submit(key, item).result(timeout=timeout)
+
+    def close(self):
+        """Stop the worker after draining items already queued"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._worker.join()
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+
+    def _collect(self) -> Tuple[List[Tuple[Hashable, Any, Future]], bool]:
+        """Block for the first item, then gather more until full or timed out"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._collect()
+
+            groups: "OrderedDict[Hashable, List[Tuple[Any, Future]]]" = OrderedDict()
+            for key, item, future in batch:
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault(key, []).append((item, future))
+
+            for key, entries in groups.items():
+                if self._pool is not None:
+                    self._pool.submit(self._process_group, key, entries)
+                else:
+                    self._process_group(key, entries)
+
+    def _process_group(self, key: Hashable, entries: List[Tuple[Any, Future]]):
+        items = [item for item, _ in entries]
+        try:
+            results = self.process_batch(key, items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batch returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            for _, future in entries:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(entries, results):
+            future.set_result(result)
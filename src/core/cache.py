@@ -0,0 +1,292 @@
+"""
+Multi-tier cache for translations, cultural adaptations and response suggestions
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+MISS = object()
+
+
+# Stages whose output follows the casing of the input ("Polish"/"polish",
+# "US"/"us", names): their keys keep the case
+_CASE_SENSITIVE_NAMESPACES = frozenset({"translation", "adaptation"})
+
+
+def normalize_text(text: str, casefold: bool = True) -> str:
+    """Normalise text for cache keys (Unicode form, whitespace and, optionally, case)"""
+    text = " ".join(unicodedata.normalize("NFKC", text).split())
+    return text.casefold() if casefold else text
+
+
+def make_key(namespace: str, text: str, source_lang: str = "", target_culture: str = "",
+             model: str = "", prompt_version: str = "") -> str:
+    """
+    Build a cache key
+
+    Args:
+        namespace: Pipeline stage, e.g. "translation" or "adaptation"
+        text: Input text (normalised before hashing; case is kept for
+            translations and adaptations)
+        source_lang: Source language code
+        target_culture: Target culture key or language code
+        model: Model/backend that produces the value
+        prompt_version: Version of the prompt template used
+
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = json.dumps(
+        [namespace, normalize_text(text, namespace not in _CASE_SENSITIVE_NAMESPACES), source_lang, target_culture, model, prompt_version],
+        ensure_ascii=False
+    )
+    return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def sqlite_path_from_url(database_url: str) -> Optional[str]:
+    """Extract the file path from a sqlite:/// URL, or None for other databases"""
+    prefix = "sqlite:///"
+    if not database_url or not database_url.startswith(prefix):
+        return None
+    path = database_url[len(prefix):]
+    return path if path and path != ":memory:" else None
+
+
+class LRUCache:
+    """In-process LRU cache with a per-entry time-to-live"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISS
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """On-disk cache tier storing JSON-serialisable values in SQLite"""
+
+    def __init__(self, path: str, ttl_seconds: float = 86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return MISS
+        value, expires_at = row
+        if expires_at < time.time():
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return MISS
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, time.time() + ttl)
+            )
+
+    def purge_expired(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    In-memory LRU in front of an optional SQLite tier
+
+    ``get_or_compute`` de-duplicates concurrent misses for the same key:
+    only one caller runs the expensive computation and the others wait
+    for its result. Failed computations are never cached.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "sets": 0,
+            "errors": 0
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, key: str) -> Any:
+        """Return the cached value or MISS"""
+        value = self.memory.get(key)
+        if value is not MISS:
+            self._count("memory_hits")
+            return value
+
+        if self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except Exception:
+                self._count("errors")
+                value = MISS
+            if value is not MISS:
+                self._count("disk_hits")
+                self.memory.set(key, value)
+                return value
+
+        self._count("misses")
+        return MISS
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        self._count("sets")
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except Exception:
+                # Non-serialisable values simply stay memory-only
+                self._count("errors")
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss
+
+        Args:
+            key: Cache key (see make_key)
+            compute: Zero-argument function producing the value; exceptions
+                propagate to every waiting caller and nothing is cached
+
+        Returns:
+            The cached or freshly computed value
+        """
+        value = self.get(key)
+        if value is not MISS:
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                # A leader may have finished between our lookup and the lock
+                value = self.memory.get(key)
+                if value is not MISS:
+                    return value
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        self.set(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and derived hit rate"""
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["inflight"] = len(self._inflight)
+        return stats
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+class NullCache:
+    """Drop-in replacement used when caching is disabled"""
+
+    def get(self, key: str) -> Any:
+        return MISS
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        return compute()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": False}
+
+    def clear(self):
+        pass
@@ -0,0 +1,90 @@
+"""
+Bounded worker pool for running blocking pipeline stages off the event loop
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from config.settings import settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide worker pool, creating it on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.MAX_WORKERS,
+                    thread_name_prefix="cultitrans-worker"
+                )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking callable on the shared worker pool
+
+    Args:
+        func: Blocking function (network, LLM or model inference call)
+        *args, **kwargs: Arguments forwarded to func
+
+    Returns:
+        The function's return value, awaited without blocking the event loop
+    """
+    loop = asyncio.get_running_loop()
+    # Carry request-scoped context (e.g. stage timings) into the worker
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+async def iterate_blocking(func: Callable[..., Iterable[Any]], *args, **kwargs) -> AsyncIterator[Any]:
+    """
+    Consume a blocking generator on the shared worker pool
+
+    Args:
+        func: Function returning a (blocking) iterable, e.g. a token stream
+        *args, **kwargs: Arguments forwarded to func
+
+    Yields:
+        Items as soon as the worker produces them
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def produce():
+        try:
+            for item in func(*args, **kwargs):
+                loop.call_soon_threadsafe(queue.put_nowait, (False, item))
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, (True, e))
+        else:
+            loop.call_soon_threadsafe(queue.put_nowait, (True, None))
+
+    producer = loop.run_in_executor(get_executor(), contextvars.copy_context().run, produce)
+    while True:
+        finished, payload = await queue.get()
+        if finished:
+            await producer
+            if payload is not None:
+                raise payload
+            return
+        yield payload
+
+
+def shutdown_executor(wait: bool = True):
+    """Shut down the shared worker pool (used on application shutdown)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
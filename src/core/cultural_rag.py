@@ -2,49 +2,195 @@
 Retrieval-Augmented Generation for Cultural Knowledge
 """
 
+import hashlib
+import json
+import logging
 import os
-from typing import List, Dict
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from typing import Dict, Iterable, Iterator, List, Tuple
 from langchain_community.vectorstores import Chroma
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_core.documents import Document
 from config.settings import settings
+from .knowledge_loader import BatchedIngestor, iter_documents
+from .lexical_index import BM25Index, reciprocal_rank_fusion
+from .model_registry import registry
+from .vector_index import CultureVectorIndex
+
+logger = logging.getLogger("cultitrans")
+
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
 
 class CulturalRAG:
     def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings()
+        self.embeddings = registry.get("embeddings")
         self.vector_store = None
+        self.index = None
+        self.lexical_index = None
+        self.ingest_stats = None
+        self.retrieval_stats = {"lexical_only": 0, "hybrid": 0, "dense": 0}
+        self.persist_directory = os.path.join(settings.CULTURAL_DB_PATH, "chroma_db")
+        self.manifest_path = os.path.join(self.persist_directory, "manifest.json")
         self._initialize_knowledge_base()
     
     def _initialize_knowledge_base(self):
-        """Initialize the cultural knowledge vector database"""
-        cultural_data = self._load_cultural_data()
+        """
+        Open the persisted cultural knowledge vector database and sync it
+        
+        Documents are tracked in a content-hash manifest next to the Chroma
+        collection, so a restart only embeds new or changed documents and
+        removes chunks of documents that no longer exist.
+        """
+        manifest = self._load_manifest()
+        
+        os.makedirs(self.persist_directory, exist_ok=True)
+        self.vector_store = self._open_collection()
+        
+        # A manifest without its collection (or vice versa) cannot be trusted
+        stored = self.vector_store._collection.count()
+        if stored == 0:
+            manifest["documents"] = {}
+        elif not manifest["documents"]:
+            # Untracked vectors (older layout or another embedding model)
+            self.vector_store.delete_collection()
+            self.vector_store = self._open_collection()
         
-        if cultural_data:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=500,
-                chunk_overlap=50
+        self.ingest_stats = self._sync_documents(self._load_cultural_data(), manifest)
+        self._save_manifest(manifest)
+        self._build_index()
+        
+        if self.ingest_stats["documents_changed"] or self.ingest_stats["chunks_deleted"]:
+            logger.info(
+                "Cultural knowledge sync: %d documents embedded, %d stale chunks removed in %.1fs (%.0f chunks/s)",
+                self.ingest_stats["documents_changed"], self.ingest_stats["chunks_deleted"],
+                self.ingest_stats["seconds"], self.ingest_stats["chunks_per_second"]
             )
+    
+    def _build_index(self):
+        """Load the stored chunks into the in-memory dense and keyword indexes"""
+        if self.vector_store is None:
+            return
+        collection = self.vector_store._collection
+        if settings.RAG_IN_MEMORY_INDEX:
+            self.index = CultureVectorIndex.from_collection(collection)
+        if settings.RAG_RETRIEVAL_MODE == "hybrid":
+            self.lexical_index = BM25Index.from_collection(collection)
+    
+    def _open_collection(self) -> Chroma:
+        return Chroma(
+            collection_name=settings.CULTURAL_COLLECTION,
+            embedding_function=self.embeddings,
+            persist_directory=self.persist_directory
+        )
+    
+    def _sync_documents(self, cultural_data: Iterable[Dict], manifest: Dict) -> Dict[str, float]:
+        """
+        Upsert new/changed documents and delete removed ones
+        
+        Documents are consumed as a stream; chunks are embedded and written
+        in batches of INGEST_BATCH_SIZE, so memory does not grow with the
+        corpus.
+        
+        Returns:
+            Ingestion counters and throughput
+        """
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP
+        )
+        collection = self.vector_store._collection
+        ingestor = BatchedIngestor(
+            embed=self.embeddings.embed_documents,
+            upsert=collection.upsert,
+            delete=lambda ids: collection.delete(ids=ids),
+            batch_size=settings.INGEST_BATCH_SIZE
+        )
+        known = manifest["documents"]
+        seen = set()
+        
+        for item in cultural_data:
+            doc_id = self._document_id(item)
+            content_hash = self._document_hash(item)
+            seen.add(doc_id)
+            ingestor.stats["documents"] += 1
             
-            docs = []
-            for item in cultural_data:
-                doc = Document(
-                    page_content=item["content"],
-                    metadata={"culture": item["culture"], "category": item["category"]}
-                )
-                docs.append(doc)
-            
-            split_docs = text_splitter.split_documents(docs)
+            entry = known.get(doc_id)
+            if entry and entry["hash"] == content_hash:
+                continue
+            if entry:
+                ingestor.remove(entry["chunk_ids"])
             
-            self.vector_store = Chroma.from_documents(
-                documents=split_docs,
-                embedding=self.embeddings,
-                persist_directory=os.path.join(settings.CULTURAL_DB_PATH, "chroma_db")
-            )
+            metadata = {"culture": item["culture"], "category": item["category"]}
+            chunk_ids = []
+            for i, chunk in enumerate(text_splitter.split_text(item["content"])):
+                chunk_id = f"{doc_id}:{content_hash[:12]}:{i}"
+                ingestor.add(chunk_id, chunk, metadata)
+                chunk_ids.append(chunk_id)
+            known[doc_id] = {"hash": content_hash, "chunk_ids": chunk_ids}
+            ingestor.stats["documents_changed"] += 1
+        
+        for doc_id in list(known):
+            if doc_id not in seen:
+                ingestor.remove(known.pop(doc_id)["chunk_ids"])
+        
+        ingestor.flush()
+        return ingestor.summary()
+    
+    @staticmethod
+    def _document_id(item: Dict) -> str:
+        """Stable identity of a knowledge document"""
+        if item.get("id"):
+            return str(item["id"])
+        key = f"{item['culture']}|{item['category']}|{item['content']}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
     
-    def _load_cultural_data(self) -> List[Dict]:
-        """Load cultural etiquette data"""
-        # Sample cultural data - in practice, load from files/database
+    @staticmethod
+    def _document_hash(item: Dict) -> str:
+        """Hash of everything that affects a document's stored chunks"""
+        payload = json.dumps(
+            [item["culture"], item["category"], item["content"], CHUNK_SIZE, CHUNK_OVERLAP],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _embedding_signature(self) -> str:
+        return getattr(self.embeddings, "model_name", type(self.embeddings).__name__)
+    
+    def _load_manifest(self) -> Dict:
+        """Load the content-hash manifest, discarding it if it is incompatible"""
+        empty = {
+            "version": MANIFEST_VERSION,
+            "embedding_model": self._embedding_signature(),
+            "documents": {}
+        }
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        
+        if (manifest.get("version") != MANIFEST_VERSION
+                or manifest.get("embedding_model") != empty["embedding_model"]):
+            # Vectors from another embedding model are unusable; rebuild
+            return empty
+        manifest.setdefault("documents", {})
+        return manifest
+    
+    def _save_manifest(self, manifest: Dict):
+        """Atomically write the manifest next to the Chroma collection"""
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def _load_cultural_data(self) -> Iterator[Dict]:
+        """Stream cultural etiquette documents: built-in samples, then corpus files"""
+        if settings.CULTURAL_INCLUDE_SAMPLES:
+            yield from self._sample_cultural_data()
+        yield from iter_documents(settings.CULTURAL_DB_PATH)
+    
+    def _sample_cultural_data(self) -> List[Dict]:
+        """Built-in sample etiquette data"""
         return [
             {
                 "culture": "japanese",
@@ -67,6 +213,10 @@ class CulturalRAG:
         """
         Retrieve relevant cultural context for a query
         
+        In hybrid mode, BM25 keyword hits are fused with dense results;
+        when the best keyword match is strong enough the query is answered
+        from the keyword index alone and never embedded.
+        
         Args:
             query: The text to find cultural context for
             culture: Target culture
@@ -78,6 +228,69 @@ class CulturalRAG:
         if not self.vector_store:
             return []
         
+        if self.lexical_index is None:
+            self.retrieval_stats["dense"] += 1
+            return self._dense_search(query, culture, k)
+        
+        lexical = self.lexical_index.search(query, culture, max(k, settings.RAG_FUSION_CANDIDATES))
+        if self._lexically_confident(lexical, culture, k):
+            self.retrieval_stats["lexical_only"] += 1
+            return [doc for doc, _ in lexical[:k]]
+        
+        self.retrieval_stats["hybrid"] += 1
+        dense = self._dense_search(query, culture, max(k, settings.RAG_FUSION_CANDIDATES))
+        return self._fuse(lexical, dense, k)
+    
+    def retrieve_cultural_context_batch(self, queries: List[str], culture: str, k: int = 3) -> List[List[str]]:
+        """
+        Retrieve cultural context for many queries of one culture
+        
+        Args:
+            queries: Texts to find cultural context for
+            culture: Target culture
+            k: Number of relevant documents per query
+        
+        Returns:
+            One list of cultural guidance texts per query
+        """
+        if not self.vector_store or not queries:
+            return [[] for _ in queries]
+        
+        if self.index is None or not hasattr(self.embeddings, "embed_queries"):
+            return [self.retrieve_cultural_context(query, culture, k) for query in queries]
+        
+        candidates = max(k, settings.RAG_FUSION_CANDIDATES)
+        results: List[List[str]] = [None] * len(queries)
+        lexical: Dict[int, List[Tuple[str, float]]] = {}
+        if self.lexical_index is not None:
+            for i, query in enumerate(queries):
+                lexical[i] = self.lexical_index.search(query, culture, candidates)
+                if self._lexically_confident(lexical[i], culture, k):
+                    self.retrieval_stats["lexical_only"] += 1
+                    results[i] = [doc for doc, _ in lexical[i][:k]]
+        
+        # Only queries the keyword index could not settle are embedded
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            dense = self.index.search_batch(
+                self.embeddings.embed_queries([queries[i] for i in pending]),
+                culture,
+                candidates if lexical else k
+            )
+            for i, docs in zip(pending, dense):
+                if i in lexical:
+                    self.retrieval_stats["hybrid"] += 1
+                    results[i] = self._fuse(lexical[i], docs, k)
+                else:
+                    self.retrieval_stats["dense"] += 1
+                    results[i] = docs
+        return results
+    
+    def _dense_search(self, query: str, culture: str, k: int) -> List[str]:
+        """Top-k documents by embedding similarity"""
+        if self.index is not None:
+            return self.index.search(self.embeddings.embed_query(query), culture, k)
+        
         # Search for relevant cultural information
         docs = self.vector_store.similarity_search(
             query,
@@ -86,3 +299,13 @@ class CulturalRAG:
         )
         
         return [doc.page_content for doc in docs]
+    
+    def _lexically_confident(self, lexical: List[Tuple[str, float]], culture: str, k: int) -> bool:
+        """Whether keyword hits alone are good enough to skip the dense pass"""
+        if not lexical or lexical[0][1] < settings.RAG_LEXICAL_CONFIDENCE:
+            return False
+        return len(lexical) >= min(k, self.lexical_index.count(culture))
+    
+    @staticmethod
+    def _fuse(lexical: List[Tuple[str, float]], dense: List[str], k: int) -> List[str]:
+        return reciprocal_rank_fusion([[doc for doc, _ in lexical], dense], k)
@@ -0,0 +1,67 @@
+"""
+Embedding model wrapper with a query-embedding cache
+"""
+
+from typing import Any, List
+
+import numpy as np
+
+from .cache import LRUCache, MISS, normalize_text
+
+
+class CachedEmbeddings:
+    """
+    Wraps a LangChain embeddings model and memoises query embeddings
+
+    Implements the ``embed_documents``/``embed_query`` interface, so it can
+    be handed to Chroma in place of the wrapped model. Other attributes
+    (e.g. ``model_name``) are delegated to the wrapped model.
+    """
+
+    def __init__(self, embeddings: Any, max_entries: int = 10000):
+        self.embeddings = embeddings
+        self._cache = LRUCache(max_entries=max_entries, ttl_seconds=float("inf"))
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__dict__["embeddings"], name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents (uncached; used for ingestion)"""
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed one query, served from the cache when seen before"""
+        return self.embed_queries([text])[0].tolist()
+
+    def embed_queries(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed many queries with a single model call for the cache misses
+
+        Args:
+            texts: Query strings
+
+        Returns:
+            Float32 matrix with one row per query
+        """
+        keys = [normalize_text(text) for text in texts]
+        vectors = [self._cache.get(key) for key in keys]
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is MISS:
+                missing.setdefault(keys[i], texts[i])
+
+        self.hits += len(texts) - sum(1 for v in vectors if v is MISS)
+        self.misses += len(missing)
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            fresh = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(missing, embedded)
+            }
+            for key, vector in fresh.items():
+                self._cache.set(key, vector)
+            vectors = [fresh[keys[i]] if v is MISS else v for i, v in enumerate(vectors)]
+
+        return np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
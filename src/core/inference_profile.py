@@ -0,0 +1,222 @@
+"""
+CPU inference profiles for the local models
+
+INFERENCE_PROFILE selects how Whisper, M2M100 and the embedding model are
+loaded:
+
+    fp32  full precision PyTorch (the previous behaviour)
+    int8  PyTorch with dynamic int8 quantisation of every Linear layer
+    onnx  M2M100 and embeddings exported to ONNX Runtime (int8 weights with
+          ONNX_QUANTIZE), Whisper as in int8; needs ``optimum[onnxruntime]``
+
+Thread counts are set per model (WHISPER_THREADS, M2M_THREADS,
+EMBEDDING_THREADS) around each inference call.
+"""
+
+import os
+import re
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config.settings import settings
+
+PROFILES = ("fp32", "int8", "onnx")
+
+_thread_lock = threading.Lock()
+
+
+def _profile(profile: Optional[str]) -> str:
+    profile = (profile or settings.INFERENCE_PROFILE).lower()
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown inference profile '{profile}' (expected one of {', '.join(PROFILES)})")
+    return profile
+
+
+def model_threads(model: str) -> int:
+    """Configured torch intra-op threads for a model (0: leave torch's default)"""
+    return {
+        "whisper": settings.WHISPER_THREADS,
+        "m2m100": settings.M2M_THREADS,
+        "embeddings": settings.EMBEDDING_THREADS,
+    }.get(model, 0)
+
+
+@contextmanager
+def inference_threads(model: str):
+    """
+    Run a block with the model's torch thread count
+
+    With torch's default OpenMP backend the count applies to parallel
+    regions started from the calling thread, so concurrent calls for
+    different models keep their own budgets.
+    """
+    threads = model_threads(model)
+    torch = sys.modules.get("torch")
+    if not threads or torch is None:
+        yield
+        return
+    with _thread_lock:
+        previous = torch.get_num_threads()
+        torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def quantize_dynamic(model):
+    """Dynamic int8 quantisation of the Linear layers of a PyTorch model (CPU)"""
+    import torch
+
+    # Subclasses of nn.Linear (Whisper's casts its weight to the input
+    # dtype, a no-op in fp32) are not matched by the quantiser
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_whisper(profile: Optional[str] = None):
+    """Whisper model; quantised on CPU unless the profile is fp32"""
+    profile = _profile(profile)
+    import whisper
+
+    if profile == "fp32":
+        return whisper.load_model(settings.WHISPER_MODEL)
+    return quantize_dynamic(whisper.load_model(settings.WHISPER_MODEL, device="cpu").eval())
+
+
+def load_m2m100_model(profile: Optional[str] = None):
+    """M2M100 model for the given profile (supports ``generate`` in every profile)"""
+    profile = _profile(profile)
+    if profile == "onnx":
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        return ORTModelForSeq2SeqLM.from_pretrained(export_onnx(settings.TRANSLATION_MODEL, "seq2seq"))
+
+    from transformers import M2M100ForConditionalGeneration
+    model = M2M100ForConditionalGeneration.from_pretrained(settings.TRANSLATION_MODEL).eval()
+    if profile == "int8":
+        model = quantize_dynamic(model)
+    return model
+
+
+def load_embeddings(profile: Optional[str] = None):
+    """
+    LangChain-compatible embedding model for the given profile
+
+    Non-fp32 profiles tag ``model_name`` with the profile, so the vector
+    store is re-embedded rather than mixing vectors from different profiles.
+    """
+    profile = _profile(profile)
+    if profile == "onnx":
+        return OnnxEmbeddings(
+            export_onnx(settings.EMBEDDING_MODEL, "feature-extraction"), f"{settings.EMBEDDING_MODEL}@onnx"
+        )
+
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    if profile == "fp32":
+        embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL)
+        return ThreadLimitedEmbeddings(embeddings, settings.EMBEDDING_MODEL)
+    embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL, model_kwargs={"device": "cpu"})
+    embeddings.client = quantize_dynamic(embeddings.client)
+    return ThreadLimitedEmbeddings(embeddings, f"{settings.EMBEDDING_MODEL}@int8")
+
+
+class ThreadLimitedEmbeddings:
+    """Runs a LangChain embeddings model under EMBEDDING_THREADS"""
+
+    def __init__(self, embeddings, model_name: str):
+        self.embeddings = embeddings
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with inference_threads("embeddings"):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class OnnxEmbeddings:
+    """Sentence embeddings (mean-pooled, L2-normalised) from an ONNX Runtime export"""
+
+    def __init__(self, model_dir: str, model_name: str, batch_size: int = 32):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + self.batch_size], padding=True, truncation=True, return_tensors="np"
+            )
+            hidden = np.asarray(self.model(**encoded).last_hidden_state, dtype=np.float32)
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def export_onnx(model_id: str, task: str, quantize: Optional[bool] = None) -> str:
+    """
+    Export a Hugging Face model to ONNX once and return its directory
+
+    Exports are cached under ONNX_EXPORT_DIR. With ``quantize`` every
+    ``.onnx`` file is additionally given dynamic int8 weights.
+
+    Args:
+        model_id: Hugging Face model name or path
+        task: "seq2seq" or "feature-extraction"
+        quantize: Quantise the export (default: ONNX_QUANTIZE)
+    """
+    quantize = settings.ONNX_QUANTIZE if quantize is None else quantize
+    base = os.path.join(settings.ONNX_EXPORT_DIR, re.sub(r"[^\w.-]+", "--", model_id))
+    fp32_dir = os.path.join(base, "fp32")
+    target = os.path.join(base, "int8") if quantize else fp32_dir
+    if os.path.exists(os.path.join(target, "config.json")):
+        return target
+
+    if not os.path.exists(os.path.join(fp32_dir, "config.json")):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTModelForSeq2SeqLM
+        from transformers import AutoTokenizer
+
+        model_class = ORTModelForSeq2SeqLM if task == "seq2seq" else ORTModelForFeatureExtraction
+        model_class.from_pretrained(model_id, export=True).save_pretrained(fp32_dir)
+        AutoTokenizer.from_pretrained(model_id).save_pretrained(fp32_dir)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic as quantize_onnx
+
+        staging = target + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.copytree(fp32_dir, staging, ignore=shutil.ignore_patterns("*.onnx", "*.onnx_data"))
+        for name in os.listdir(fp32_dir):
+            if name.endswith(".onnx"):
+                quantize_onnx(
+                    os.path.join(fp32_dir, name), os.path.join(staging, name), weight_type=QuantType.QInt8
+                )
+        os.replace(staging, target)
+    return target
+
+
+def describe() -> Dict:
+    """Active profile and thread settings (reported by the benchmark)"""
+    return {
+        "profile": settings.INFERENCE_PROFILE,
+        "threads": {name: model_threads(name) for name in ("whisper", "m2m100", "embeddings")},
+        "onnx_quantize": settings.ONNX_QUANTIZE,
+    }
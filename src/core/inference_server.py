@@ -0,0 +1,455 @@
+"""
+Shared multi-process inference pool for the heavy local models
+
+Usage:
+    python -m src.core.inference_server [--address /run/cultitrans/inference.sock] [--workers N]
+
+The server loads Whisper, the embedding model and (with the m2m100
+backend) M2M100 once, then forks its worker processes, which share the
+weights copy-on-write. API processes started with INFERENCE_SERVER_ADDRESS
+reach it over a Unix socket: the registry hands them RemoteWhisper,
+RemoteM2M100Engine and RemoteEmbeddings instead of loading the models, so
+adding uvicorn workers no longer multiplies model memory.
+
+Requests are pickled, so only the server's user may connect: the socket is
+created mode 0600 (by default in a private 0700 directory) and clients must
+present INFERENCE_AUTHKEY. Without a configured key the server generates
+one and writes it next to the socket as ``<address>.key`` (mode 0600),
+where clients of the same user read it.
+"""
+
+import argparse
+import gc
+import json
+import os
+import queue
+import secrets
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import AuthenticationError, get_context
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from .batching import MicroBatcher
+from .metrics import metrics
+from .model_registry import registry
+
+INFERENCE_REQUESTS = metrics.counter(
+    "cultitrans_inference_requests_total", "Calls to the shared inference pool by operation and outcome",
+    ["op", "outcome"]
+)
+
+
+class InferenceBusyError(RuntimeError):
+    """Raised when the inference pool is saturated and rejects a request"""
+
+
+class InferenceError(RuntimeError):
+    """Raised when an operation fails inside the inference pool"""
+
+
+def default_address() -> str:
+    """Socket path in a per-user directory under the temporary directory"""
+    return os.path.join(tempfile.gettempdir(), f"cultitrans-{os.getuid()}", "inference.sock")
+
+
+def key_path(address: str) -> str:
+    return f"{address}.key"
+
+
+def read_authkey(address: str, authkey: Optional[str] = None) -> bytes:
+    """The configured key, or the one a server generated for this address"""
+    authkey = authkey or settings.INFERENCE_AUTHKEY
+    if authkey:
+        return authkey.encode("utf-8")
+    try:
+        with open(key_path(address), "rb") as f:
+            return f.read().strip()
+    except OSError as e:
+        raise ConnectionError(f"No INFERENCE_AUTHKEY and no key file for {address}: {e}") from e
+
+
+def _write_private(path: str, data: bytes):
+    staging = f"{path}.tmp"
+    if os.path.exists(staging):
+        os.unlink(staging)
+    fd = os.open(staging, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(staging, path)
+
+
+# Operations, run inside the forked worker processes against the models
+# the server loaded before forking
+
+def _whisper_transcribe(audio, options: Dict) -> Dict:
+    return registry.get("whisper").transcribe(audio, **options)
+
+
+def _whisper_decode_batch(chunks) -> List[str]:
+    from .asr import decode_batch
+    return decode_batch(registry.get("whisper"), chunks)
+
+
+def _translate_batch(texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+    return registry.get("m2m100_engine").translate_batch(texts, source_lang, target_lang)
+
+
+def _m2m_languages() -> List[str]:
+    return sorted(getattr(registry.get("m2m100_tokenizer"), "lang_code_to_id", {}))
+
+
+def _embed_documents(texts: List[str]) -> List[List[float]]:
+    return registry.get("embeddings").embed_documents(texts)
+
+
+def _model_name(name: str) -> str:
+    model = registry.get(name)
+    return getattr(model, "model_name", type(model).__name__)
+
+
+OPERATIONS = {
+    "ping": os.getpid,
+    "whisper_transcribe": _whisper_transcribe,
+    "whisper_decode_batch": _whisper_decode_batch,
+    "translate_batch": _translate_batch,
+    "m2m_languages": _m2m_languages,
+    "embed_documents": _embed_documents,
+    "model_name": _model_name,
+}
+
+
+def _execute(op: str, args: tuple) -> Any:
+    return OPERATIONS[op](*args)
+
+
+def _init_worker(threads: int):
+    """Bound intra-op threads so the workers together use each core once"""
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+
+class InferenceServer:
+    """
+    Process pool serving model operations over a Unix socket
+
+    At most ``max_pending`` requests are admitted at once (running or
+    queued for a worker). A request that cannot be admitted within
+    ``queue_timeout`` seconds is rejected as busy, so a saturated pool
+    pushes back on the API instead of queueing without bound.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        authkey: Optional[str] = None,
+        models: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        queue_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            address: Unix socket path
+            authkey: Shared secret clients must present (default: INFERENCE_AUTHKEY,
+                else a random key written to ``<address>.key``)
+            models: Registry names loaded before forking
+            workers: Worker processes (default: cores / threads_per_worker)
+            threads_per_worker: Torch intra-op threads per worker
+            max_pending: Requests admitted at once (default: twice the workers)
+            queue_timeout: Seconds a request may wait for admission
+        """
+        self.address = address
+        configured = authkey or settings.INFERENCE_AUTHKEY
+        self.authkey = configured.encode("utf-8") if configured else secrets.token_hex(32).encode("ascii")
+        self._key_file = None if configured else key_path(address)
+        self.models = list(models if models is not None else settings.INFERENCE_MODELS)
+        self.threads_per_worker = max(1, threads_per_worker or settings.INFERENCE_THREADS_PER_WORKER)
+        self.workers = workers or settings.INFERENCE_WORKERS or max(
+            1, (os.cpu_count() or 1) // self.threads_per_worker
+        )
+        self.max_pending = max_pending or settings.INFERENCE_MAX_PENDING or 2 * self.workers
+        self.queue_timeout = settings.INFERENCE_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self.stats = {"completed": 0, "failed": 0, "rejected": 0}
+        self.worker_pids: List[int] = []
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._stats_lock = threading.Lock()
+        self._close_lock = threading.Lock()
+        self._closed = threading.Event()
+        self.broken = False
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._listener: Optional[Listener] = None
+
+    def start(self):
+        """Load the models, fork the workers, then accept connections"""
+        for name in self.models:
+            registry.get(name)
+
+        # Objects created so far are never collected, so the GC does not
+        # write to (and copy) the pages the workers share with this process
+        gc.collect()
+        gc.freeze()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_context("fork"),
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker,)
+        )
+        # The fork context starts every worker on the first submit, before
+        # any of the server's own threads exist
+        self._pool.submit(_execute, "ping", ()).result()
+        self.worker_pids = sorted(self._pool._processes)
+
+        directory = os.path.dirname(os.path.abspath(self.address))
+        if not os.path.isdir(directory):
+            os.makedirs(directory, mode=0o700)
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        if self._key_file:
+            _write_private(self._key_file, self.authkey)
+        # Bind with a restrictive umask so the socket is never reachable by
+        # other users, even between bind and chmod
+        umask = os.umask(0o177)
+        try:
+            self._listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        finally:
+            os.umask(umask)
+        os.chmod(self.address, 0o600)
+        threading.Thread(target=self._accept_loop, name="inference-accept", daemon=True).start()
+
+    def serve_forever(self):
+        self.start()
+        print(json.dumps({
+            "address": self.address, "workers": self.worker_pids, "max_pending": self.max_pending
+        }), file=sys.stderr)
+        try:
+            self._closed.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        with self._close_lock:
+            self._closed.set()
+            if self._listener is not None:
+                self._listener.close()  # also removes the socket file
+                self._listener = None
+                if self._key_file and os.path.exists(self._key_file):
+                    os.unlink(self._key_file)
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+    def _accept_loop(self):
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                continue
+            except (OSError, AttributeError):
+                return
+            threading.Thread(target=self._serve, args=(conn,), name="inference-conn", daemon=True).start()
+
+    def _serve(self, conn):
+        """Answer one client connection's requests in order"""
+        with conn:
+            while not self._closed.is_set():
+                try:
+                    op, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self._handle(op, args))
+
+    def _handle(self, op: str, args: tuple) -> tuple:
+        if op not in OPERATIONS:
+            return ("error", "KeyError", f"Unknown operation '{op}'")
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count("rejected")
+            return ("busy", f"Inference pool saturated ({self.max_pending} requests in flight)")
+        try:
+            result = self._pool.submit(_execute, op, args).result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. out of memory); exit so the supervisor restarts the pool
+            self._count("failed")
+            self.broken = True
+            threading.Thread(target=self.close, daemon=True).start()
+            return ("error", type(e).__name__, str(e))
+        except Exception as e:
+            self._count("failed")
+            return ("error", type(e).__name__, str(e))
+        finally:
+            self._slots.release()
+        self._count("completed")
+        return ("ok", result)
+
+    def _count(self, outcome: str):
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+
+class InferenceClient:
+    """
+    Thread-safe client keeping a small pool of connections to the server
+
+    Each connection carries one request at a time; at most
+    ``max_connections`` requests are in flight from this process.
+    """
+
+    def __init__(self, address: str, authkey: Optional[str] = None, max_connections: Optional[int] = None):
+        self.address = address
+        self._configured_authkey = authkey
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, max_connections or settings.INFERENCE_CLIENT_CONNECTIONS))
+
+    def call(self, op: str, *args) -> Any:
+        """
+        Run one operation in the inference pool
+
+        Raises:
+            InferenceBusyError: The pool is saturated
+            InferenceError: The operation failed in the pool
+            ConnectionError: The server cannot be reached
+        """
+        with self._slots:
+            try:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    # Read per connection: a restarted server may have a new key
+                    authkey = read_authkey(self.address, self._configured_authkey)
+                    conn = Client(self.address, family="AF_UNIX", authkey=authkey)
+                conn.send((op, args))
+                reply = conn.recv()
+            except (EOFError, OSError, AuthenticationError) as e:
+                INFERENCE_REQUESTS.inc(op=op, outcome="unavailable")
+                raise ConnectionError(f"Inference server at {self.address} is unavailable: {e}") from e
+            self._idle.put(conn)
+
+        INFERENCE_REQUESTS.inc(op=op, outcome=reply[0])
+        if reply[0] == "ok":
+            return reply[1]
+        if reply[0] == "busy":
+            raise InferenceBusyError(reply[1])
+        raise InferenceError(f"{op} failed in the inference pool: {reply[1]}: {reply[2]}")
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RemoteWhisper:
+    """Whisper model served by the inference pool"""
+
+    def __init__(self, client: InferenceClient):
+        self.client = client
+        client.call("ping")
+
+    def transcribe(self, audio, **options) -> Dict:
+        return self.client.call("whisper_transcribe", audio, options)
+
+    def decode_batch(self, chunks) -> List[str]:
+        """Batched decoding of up to 30 s chunks, run next to the model"""
+        return self.client.call("whisper_decode_batch", list(chunks))
+
+
+class RemoteM2M100Engine:
+    """
+    M2M100 engine served by the inference pool
+
+    Concurrent ``translate`` calls are still micro-batched in this process,
+    so each batch costs one round trip to the pool.
+    """
+
+    def __init__(self, client: InferenceClient):
+        self.client = client
+        self._languages = set(client.call("m2m_languages"))
+        self._batcher = MicroBatcher(
+            lambda key, texts: self.translate_batch(texts, *key),
+            max_batch_size=settings.M2M_MAX_BATCH_SIZE * 4,
+            max_wait_ms=settings.M2M_MAX_WAIT_MS,
+            name="m2m100-remote-batcher",
+            concurrency=settings.INFERENCE_CLIENT_CONNECTIONS
+        )
+
+    def supports(self, source_lang: str, target_lang: str) -> bool:
+        return source_lang in self._languages and target_lang in self._languages
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        return self._batcher.run((source_lang, target_lang), text)
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        return self.client.call("translate_batch", list(texts), source_lang, target_lang)
+
+    def close(self):
+        self._batcher.close()
+
+
+class RemoteEmbeddings:
+    """Embedding model served by the inference pool (LangChain embeddings interface)"""
+
+    def __init__(self, client: InferenceClient):
+        self.client = client
+        self.model_name = client.call("model_name", "embeddings")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.client.call("embed_documents", list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+_client: Optional[InferenceClient] = None
+_client_lock = threading.Lock()
+
+
+def inference_client() -> InferenceClient:
+    """Process-wide client for INFERENCE_SERVER_ADDRESS"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InferenceClient(settings.INFERENCE_SERVER_ADDRESS)
+    return _client
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Serve Whisper, M2M100 and embeddings to API processes")
+    parser.add_argument(
+        "--address", default=settings.INFERENCE_SERVER_ADDRESS or default_address(),
+        help="Unix socket path"
+    )
+    parser.add_argument("--workers", type=int, default=settings.INFERENCE_WORKERS or None)
+    parser.add_argument("--threads-per-worker", type=int, default=settings.INFERENCE_THREADS_PER_WORKER)
+    parser.add_argument("--max-pending", type=int, default=settings.INFERENCE_MAX_PENDING or None)
+    args = parser.parse_args(argv)
+
+    # This process owns the real models; never proxy to ourselves
+    settings.INFERENCE_SERVER_ADDRESS = ""
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    models = list(settings.INFERENCE_MODELS)
+    if settings.TRANSLATION_BACKEND == "m2m100":
+        models += [name for name in ("m2m100_tokenizer", "m2m100_engine") if name not in models]
+
+    server = InferenceServer(
+        args.address,
+        models=models,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        max_pending=args.max_pending
+    )
+    server.serve_forever()
+    if server.broken:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Streaming loader and batched ingestion for the cultural knowledge corpus
+
+Corpus files live under settings.CULTURAL_DB_PATH:
+
+- ``*.jsonl``: one {"culture", "category", "content", "id"?} object per line
+- ``*.csv``: columns culture, category, content and optionally id
+- ``*.md``: culture/category from front matter or the path
+  ``<culture>/<category>.md``; each ``#``/``##`` section is one document
+
+Usage:
+    python -m src.core.knowledge_loader
+"""
+
+import csv
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, Iterator, List
+
+SUPPORTED_EXTENSIONS = (".jsonl", ".csv", ".md")
+REQUIRED_FIELDS = ("culture", "category", "content")
+
+_HEADING = re.compile(r"^#{1,2}\s+")
+
+
+def iter_corpus_files(root: str, exclude: tuple = ("chroma_db",)) -> Iterator[str]:
+    """Corpus files under root in a stable order"""
+    if not os.path.isdir(root):
+        return
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if d not in exclude and not d.startswith("."))
+        for name in sorted(files):
+            if name.endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.join(directory, name)
+
+
+def iter_documents(root: str) -> Iterator[Dict]:
+    """
+    Stream knowledge documents from every corpus file under root
+
+    Documents without an explicit id get one derived from their file and
+    position, so edits are detected as changes rather than as new documents.
+    Records missing culture, category or content are skipped.
+    """
+    for path in iter_corpus_files(root):
+        relative = os.path.relpath(path, root).replace(os.sep, "/")
+        if path.endswith(".jsonl"):
+            records = _read_jsonl(path)
+        elif path.endswith(".csv"):
+            records = _read_csv(path)
+        else:
+            records = _read_markdown(path, relative)
+
+        for position, record in records:
+            if not all(isinstance(record.get(field), str) and record[field].strip() for field in REQUIRED_FIELDS):
+                continue
+            yield {
+                "id": str(record.get("id") or f"{relative}:{position}"),
+                "culture": record["culture"].strip().lower(),
+                "category": record["category"].strip().lower(),
+                "content": record["content"].strip()
+            }
+
+
+def _read_jsonl(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield line_number, record
+
+
+def _read_csv(path: str):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row_number, row in enumerate(csv.DictReader(f), 1):
+            yield row_number, row
+
+
+def _read_markdown(path: str, relative: str):
+    parts = relative[:-len(".md")].split("/")
+    defaults = {
+        "culture": parts[-2] if len(parts) >= 2 else "",
+        "category": parts[-1]
+    }
+
+    with open(path, "r", encoding="utf-8") as f:
+        lines = iter(f)
+        first = next(lines, "")
+        meta = dict(defaults)
+        pending = []
+        if first.strip() == "---":
+            for line in lines:
+                if line.strip() == "---":
+                    break
+                key, _, value = line.partition(":")
+                if value:
+                    meta[key.strip().lower()] = value.strip()
+        else:
+            pending.append(first)
+
+        section = 0
+        buffer: List[str] = []
+        for line in _chain(pending, lines):
+            if _HEADING.match(line) and "".join(buffer).strip():
+                section += 1
+                yield section, {**meta, "content": "".join(buffer)}
+                buffer = []
+            buffer.append(line)
+        if "".join(buffer).strip():
+            yield section + 1, {**meta, "content": "".join(buffer)}
+
+
+def _chain(first: List[str], rest) -> Iterator[str]:
+    yield from first
+    yield from rest
+
+
+class BatchedIngestor:
+    """
+    Embeds and writes chunks in fixed-size batches
+
+    Only one batch of chunk texts is held in memory at a time, and every
+    flush is a single bulk upsert into the vector store.
+    """
+
+    def __init__(self, embed: Callable[[List[str]], List[List[float]]],
+                 upsert: Callable[..., None], delete: Callable[[List[str]], None],
+                 batch_size: int = 256):
+        """
+        Args:
+            embed: Function embedding a list of texts
+            upsert: Function(ids, embeddings, documents, metadatas) writing one batch
+            delete: Function deleting chunk ids
+            batch_size: Chunks embedded and written per batch
+        """
+        self.embed = embed
+        self.upsert = upsert
+        self.delete = delete
+        self.batch_size = batch_size
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict] = []
+        self._stale: List[str] = []
+        self.started = time.perf_counter()
+        self.stats = {
+            "documents": 0,
+            "documents_changed": 0,
+            "chunks_written": 0,
+            "chunks_deleted": 0
+        }
+
+    def add(self, chunk_id: str, text: str, metadata: Dict):
+        """Queue one chunk, flushing when a full batch is pending"""
+        self._ids.append(chunk_id)
+        self._texts.append(text)
+        self._metadatas.append(metadata)
+        if len(self._ids) >= self.batch_size:
+            self._flush_writes()
+
+    def remove(self, chunk_ids: List[str]):
+        """Queue chunk ids for deletion"""
+        self._stale.extend(chunk_ids)
+        if len(self._stale) >= self.batch_size:
+            self._flush_deletes()
+
+    def flush(self):
+        """Write everything still pending"""
+        self._flush_deletes()
+        self._flush_writes()
+
+    def _flush_writes(self):
+        if not self._ids:
+            return
+        embeddings = self.embed(self._texts)
+        self.upsert(
+            ids=self._ids, embeddings=embeddings,
+            documents=self._texts, metadatas=self._metadatas
+        )
+        self.stats["chunks_written"] += len(self._ids)
+        self._ids, self._texts, self._metadatas = [], [], []
+
+    def _flush_deletes(self):
+        if not self._stale:
+            return
+        self.delete(self._stale)
+        self.stats["chunks_deleted"] += len(self._stale)
+        self._stale = []
+
+    def summary(self) -> Dict[str, float]:
+        """Counters plus ingestion throughput"""
+        elapsed = time.perf_counter() - self.started
+        summary = dict(self.stats)
+        summary["seconds"] = elapsed
+        summary["documents_per_second"] = self.stats["documents"] / elapsed if elapsed else 0.0
+        summary["chunks_per_second"] = self.stats["chunks_written"] / elapsed if elapsed else 0.0
+        return summary
+
+
+def main():
+    from .model_registry import registry
+
+    rag = registry.get("cultural_rag")
+    print(json.dumps(rag.ingest_stats or {}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+BM25 keyword index and score fusion for cultural context retrieval
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it its
+me my no not of on or our so that the their them then there these they this to
+us was we were what when where which who why will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords"""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class _CultureBM25:
+    """Inverted index over the documents of one culture"""
+
+    def __init__(self, documents: List[str], k1: float, b: float):
+        self.documents = documents
+        self.k1 = k1
+        tokenized = [tokenize(doc) for doc in documents]
+        lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+        # Per-document length normalisation, precomputed once
+        self.norms = k1 * (1 - b + b * lengths / avg_length)
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for row, tokens in enumerate(tokenized):
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((row, tf))
+
+        n = len(documents)
+        self.unseen_idf = float(np.log(1 + (n + 0.5) / 0.5))
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.idf: Dict[str, float] = {}
+        for term, entries in postings.items():
+            rows = np.array([row for row, _ in entries], dtype=np.int32)
+            tfs = np.array([tf for _, tf in entries], dtype=np.float32)
+            self.postings[term] = (rows, tfs)
+            df = len(entries)
+            self.idf[term] = float(np.log(1 + (n - df + 0.5) / (df + 0.5)))
+
+    def search(self, terms: List[str], k: int) -> List[Tuple[str, float]]:
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        best_possible = 0.0
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if posting is None:
+                # Unseen terms count as maximally specific misses
+                best_possible += self.unseen_idf
+                continue
+            rows, tfs = posting
+            idf = self.idf[term]
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + self.norms[rows])
+            best_possible += idf
+
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) == 0 or k <= 0:
+            return []
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        # Normalise against an average-length document containing every
+        # query term once, so the score is comparable across queries
+        return [(self.documents[i], min(1.0, float(scores[i]) / best_possible)) for i in hits]
+
+
+class BM25Index:
+    """
+    Per-culture BM25 keyword index
+
+    Catches exact etiquette terms (honorifics, "bowing", "face-saving")
+    that dense embeddings blur, and costs a few posting-list lookups per
+    query. Scores are normalised to [0, 1] so they can gate the dense pass.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._cultures: Dict[str, _CultureBM25] = {}
+
+    @classmethod
+    def from_collection(cls, collection) -> "BM25Index":
+        """Build the index from the chunks already stored in a Chroma collection"""
+        data = collection.get(include=["documents", "metadatas"])
+        index = cls()
+        index.build(data["documents"], data["metadatas"])
+        return index
+
+    def build(self, documents: Sequence[str], metadatas: Sequence[Dict]):
+        """Replace the index contents, grouping documents by their "culture" metadata"""
+        grouped: Dict[str, List[str]] = {}
+        for document, metadata in zip(documents, metadatas):
+            grouped.setdefault((metadata or {}).get("culture"), []).append(document)
+        self._cultures = {
+            culture: _CultureBM25(docs, self.k1, self.b)
+            for culture, docs in grouped.items()
+        }
+
+    def __len__(self) -> int:
+        return sum(len(index.documents) for index in self._cultures.values())
+
+    def count(self, culture: str) -> int:
+        """Number of documents indexed for a culture"""
+        index = self._cultures.get(culture)
+        return len(index.documents) if index is not None else 0
+
+    def search(self, query: str, culture: str, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        Top-k documents of one culture by keyword relevance
+
+        Returns:
+            (document, normalised score) pairs, best match first
+        """
+        index = self._cultures.get(culture)
+        if index is None:
+            return []
+        return index.search(tokenize(query), k)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int,
+                           weights: Sequence[float] = None, offset: int = 60) -> List[str]:
+    """
+    Merge ranked document lists with reciprocal rank fusion
+
+    Args:
+        rankings: Ranked lists of documents, best first
+        k: Number of documents to return
+        weights: Optional weight per ranking
+        offset: RRF damping constant
+
+    Returns:
+        Top-k documents by fused score
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, document in enumerate(ranking):
+            scores[document] = scores.get(document, 0.0) + weight / (offset + rank + 1)
+    return sorted(scores, key=lambda document: -scores[document])[:k]
@@ -0,0 +1,105 @@
+"""
+Helpers shared by the LLM-backed pipeline stages
+"""
+
+from typing import Iterator
+
+import openai
+
+from config.settings import settings
+from .metrics import record_usage, span
+from .model_registry import registry
+from .scheduler import UpstreamScheduler
+from .sessions import estimate_tokens
+from .upstream import Upstream, get_upstream, register_upstream
+
+# Transient OpenAI failures worth retrying (APITimeoutError is an APIConnectionError)
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    TimeoutError,
+    ConnectionError
+)
+
+register_upstream(Upstream(
+    "openai",
+    timeout=settings.LLM_TIMEOUT_SECONDS,
+    max_retries=settings.UPSTREAM_MAX_RETRIES,
+    retry_base_delay=settings.UPSTREAM_RETRY_BASE_DELAY,
+    hedge_after=settings.LLM_HEDGE_AFTER_MS / 1000.0 if settings.LLM_HEDGE_AFTER_MS > 0 else None,
+    retry_on=RETRYABLE_ERRORS,
+    throttle_on=(openai.RateLimitError,),
+    rejected_on=(openai.BadRequestError, openai.UnprocessableEntityError),
+    scheduler=UpstreamScheduler(
+        "openai",
+        requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY
+    )
+))
+
+
+def delta_content(chunk) -> str:
+    """Text carried by one streamed chat completion chunk"""
+    if not chunk.choices:
+        return ""
+    return getattr(chunk.choices[0].delta, "content", None) or ""
+
+
+def chat_completion(prompt: str, max_tokens: int, stage: str, optional: bool = False) -> str:
+    """
+    Send one user prompt to the chat model
+
+    Args:
+        prompt: User message
+        max_tokens: Completion token limit
+        stage: Pipeline stage name for timing and token metrics
+        optional: The caller has a fallback; the call may be shed under load
+
+    Returns:
+        The reply text; raises on failure (including an open circuit)
+    """
+    client = registry.get("openai_client")
+    with span(stage):
+        response = get_upstream("openai").call(
+            client.chat.completions.create,
+            model=settings.LLM_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            optional=optional,
+            cost_tokens=estimate_tokens(prompt) + max_tokens
+        )
+    record_usage(stage, response)
+    return response.choices[0].message.content
+
+
+def stream_chat_completion(prompt: str, max_tokens: int, stage: str, optional: bool = False) -> Iterator[str]:
+    """
+    Stream the chat model's reply to one user prompt
+
+    Opening the stream is retried and deadline-bound like chat_completion;
+    once tokens flow, a stall is bounded by the HTTP read timeout. The
+    scheduler's concurrency slot is held until the stream is open.
+
+    Yields:
+        Non-empty text deltas
+    """
+    client = registry.get("openai_client")
+    with span(stage):
+        stream = get_upstream("openai").call(
+            client.chat.completions.create,
+            model=settings.LLM_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+            optional=optional,
+            cost_tokens=estimate_tokens(prompt) + max_tokens
+        )
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                record_usage(stage, chunk)
+            delta = delta_content(chunk)
+            if delta:
+                yield delta
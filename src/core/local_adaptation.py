@@ -0,0 +1,160 @@
+"""
+Local confidence scoring that decides when cultural adaptation needs the LLM
+
+Short, formulaic text (greetings, thanks, numbers, yes/no answers) reads the
+same after an LLM rewrite, so the basic translation is used as the
+adaptation when the local confidence is high enough. The score combines:
+
+    length       longer text has more room for tone problems
+    rules        phrasings that clash with the culture's politeness and
+                 directness (settings.SUPPORTED_CULTURES); English only
+    agreement    similarity of the M2M100 and Google translations, when a
+                 second translation is available
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from config.settings import settings
+from .metrics import metrics
+
+ADAPTATION_ROUTES = metrics.counter(
+    "cultitrans_adaptation_routes_total", "Adaptations answered locally or escalated to the LLM",
+    ["culture", "tier"]
+)
+
+# Text without words (numbers, amounts, times, emoji, punctuation) or a URL/e-mail
+_NO_WORDS = re.compile(r"^[\W\d_]*$", re.UNICODE)
+_ADDRESS = re.compile(r"^\s*(https?://\S+|[\w.+-]+@[\w-]+\.[\w.]+)\s*$")
+
+# Formulas that read the same in every register
+_FORMULAIC = re.compile(
+    r"^\s*(hi|hello|hey|good (morning|afternoon|evening|night)|bye|goodbye|see you( later| soon)?"
+    r"|thanks?( you)?( (so|very) much)?|thank you( (so|very) much)?|many thanks|you'?re welcome"
+    r"|yes|ok(ay)?|sure|of course|sorry|excuse me|welcome|congratulations|cheers"
+    r"|happy (birthday|new year|holidays)|merry christmas|nice to meet you|how are you"
+    r"|(please )?take care|good luck|bon app[eé]tit)(,? (sir|madam|everyone|all|friend))?[\s.!?]*$",
+    re.IGNORECASE
+)
+
+# (trait, value) -> [(pattern, weight)]: phrasings a culture with that
+# trait would rewrite; the weight is the confidence lost when one matches
+_RULES: Dict[Tuple[str, str], List[Tuple[re.Pattern, float]]] = {
+    ("politeness", "high"): [
+        (re.compile(r"^\s*(give|send|tell|show|bring|do|stop|hurry|come|go|call|fix|make)\b", re.I), 0.5),
+        (re.compile(r"\b(i want|i need|you must|you have to|you should|you need to|right now|asap)\b", re.I), 0.4),
+        (re.compile(r"\b(hey you|whatever|shut up|what\?$)", re.I), 0.6),
+    ],
+    ("politeness", "medium"): [
+        (re.compile(r"\b(shut up|whatever|hey you)\b", re.I), 0.4),
+    ],
+    ("directness", "low"): [
+        (re.compile(r"^\s*no\b|\b(i disagree|you('re| are) wrong|that('s| is) wrong|bad idea|i refuse|i won'?t|can'?t you)\b", re.I), 0.5),
+        (re.compile(r"\b(never|impossible|terrible|stupid|ridiculous|unacceptable)\b", re.I), 0.4),
+        (re.compile(r"\b(but|however|actually)\b", re.I), 0.15),
+    ],
+    ("directness", "medium"): [
+        (re.compile(r"\b(you('re| are) wrong|stupid|ridiculous|unacceptable)\b", re.I), 0.3),
+    ],
+    ("directness", "high"): [
+        (re.compile(r"\b(i was wondering if|would it be possible|if it'?s not too much trouble|perhaps maybe|sort of|kind of)\b", re.I), 0.3),
+    ],
+}
+
+
+class Assessment(NamedTuple):
+    """Outcome of the local tier for one translation"""
+    confidence: float  # that the basic translation needs no cultural rewrite
+    translation_confidence: float  # in the basic translation itself (length and agreement)
+    local: bool  # confident enough to skip the LLM
+    signals: Dict[str, float]
+
+
+def rule_penalty(text: str, culture_info: Dict) -> float:
+    """Fraction of confidence lost to phrasings that clash with the culture (0-1)"""
+    kept = 1.0
+    for trait in ("politeness", "directness"):
+        for pattern, weight in _RULES.get((trait, culture_info.get(trait, "medium")), ()):
+            if pattern.search(text):
+                kept *= 1.0 - weight
+    return 1.0 - kept
+
+
+def length_score(text: str) -> float:
+    """1.0 up to three words, falling to 0.3 for long text"""
+    words = len(text.split())
+    if words <= 1 and len(text.strip()) > 12:
+        # Unsegmented scripts (Chinese, Japanese): about two characters a word
+        words = len(text.strip()) // 2
+    return max(0.3, 1.0 - 0.04 * max(0, words - 3))
+
+
+def similarity(a: str, b: str, n: int = 3) -> float:
+    """Character n-gram Dice similarity of two texts, ignoring case, spacing and punctuation"""
+    a, b = _normalize(a), _normalize(b)
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    grams_a, grams_b = _ngrams(a, n), _ngrams(b, n)
+    if not grams_a or not grams_b:
+        return 0.0
+    overlap = sum(min(count, grams_b.get(gram, 0)) for gram, count in grams_a.items())
+    return 2.0 * overlap / (sum(grams_a.values()) + sum(grams_b.values()))
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[\W_]+", "", text.lower(), flags=re.UNICODE)
+
+
+def _ngrams(text: str, n: int) -> Dict[str, int]:
+    n = min(n, len(text))  # short texts compare whole
+    grams: Dict[str, int] = {}
+    for i in range(len(text) - n + 1):
+        grams[text[i:i + n]] = grams.get(text[i:i + n], 0) + 1
+    return grams
+
+
+def is_formulaic(text: str) -> bool:
+    """Whether the text needs no adaptation in any culture"""
+    return bool(_NO_WORDS.match(text) or _ADDRESS.match(text) or _FORMULAIC.match(text))
+
+
+def assess(text: str, translation: str, source_lang: str, target_lang: str, culture_info: Dict,
+           second_translation: Optional[str] = None, threshold: Optional[float] = None) -> Assessment:
+    """
+    Score how safely the basic translation can be used as the adaptation
+
+    Args:
+        text: Input text
+        translation: Basic translation of the text
+        source_lang: Source language code ("auto" allowed)
+        target_lang: Target language code
+        culture_info: Target culture entry of settings.SUPPORTED_CULTURES
+        second_translation: The same text translated by the other backend
+        threshold: Minimum confidence for the local tier (default: LOCAL_ADAPTATION_THRESHOLD)
+    """
+    threshold = settings.LOCAL_ADAPTATION_THRESHOLD if threshold is None else threshold
+    signals: Dict[str, float] = {}
+
+    # An English translation of a formula (e.g. "ありがとう" -> "Thank you") counts too
+    if is_formulaic(text) or (target_lang == "en" and _FORMULAIC.match(translation)):
+        signals["formulaic"] = 1.0
+        return Assessment(1.0, 1.0, True, signals)
+
+    translation_confidence = signals["length"] = length_score(text)
+    if second_translation is not None:
+        signals["agreement"] = similarity(translation, second_translation)
+        translation_confidence *= 0.5 + 0.5 * signals["agreement"]
+
+    # The rules are English phrasings: check the input or, for English
+    # targets, the translation; otherwise tone cannot be judged locally.
+    # "auto" input may be in any language, so it is not checked
+    english = [t for t, lang in ((text, source_lang), (translation, target_lang)) if lang == "en"]
+    if english:
+        signals["rules"] = max(rule_penalty(t, culture_info) for t in english)
+    else:
+        signals["rules"] = settings.LOCAL_ADAPTATION_UNCHECKED_PENALTY
+
+    confidence = translation_confidence * (1.0 - signals["rules"])
+    return Assessment(confidence, translation_confidence, confidence >= threshold, signals)
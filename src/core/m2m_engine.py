@@ -0,0 +1,84 @@
+"""
+Local batched M2M100 translation engine
+"""
+
+import threading
+from typing import List, Tuple
+
+from config.settings import settings
+from .batching import MicroBatcher
+from .inference_profile import inference_threads
+
+
+class M2M100Engine:
+    """
+    Offline M2M100 translation with dynamic micro-batching
+
+    Concurrent ``translate`` calls are queued for a few milliseconds and
+    generated together. Each batch is sorted by input length and split
+    into sub-batches so padding stays small, then run under
+    ``torch.inference_mode``.
+    """
+
+    def __init__(self, model, tokenizer, max_batch_size: int = None,
+                 max_wait_ms: float = None, max_new_tokens: int = None):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max_batch_size or settings.M2M_MAX_BATCH_SIZE
+        self.max_new_tokens = max_new_tokens or settings.M2M_MAX_NEW_TOKENS
+        # The tokenizer keeps the source language as mutable state
+        self._tokenizer_lock = threading.Lock()
+        if hasattr(self.model, "eval"):  # ONNX Runtime models have no train mode
+            self.model.eval()
+        self._batcher = MicroBatcher(
+            self._process_batch,
+            max_batch_size=self.max_batch_size * 4,
+            max_wait_ms=settings.M2M_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms,
+            name="m2m100-batcher"
+        )
+
+    def supports(self, source_lang: str, target_lang: str) -> bool:
+        """Whether both languages are known to the M2M100 tokenizer"""
+        lang_codes = getattr(self.tokenizer, "lang_code_to_id", {})
+        return source_lang in lang_codes and target_lang in lang_codes
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Translate one text, batched with other concurrent callers"""
+        return self._batcher.run((source_lang, target_lang), text)
+
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """Translate many texts for one language pair in length-sorted batches"""
+        return self._process_batch((source_lang, target_lang), list(texts))
+
+    def close(self):
+        self._batcher.close()
+
+    def _process_batch(self, key: Tuple[str, str], texts: List[str]) -> List[str]:
+        source_lang, target_lang = key
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        results: List[str] = [""] * len(texts)
+
+        for start in range(0, len(order), self.max_batch_size):
+            indices = order[start:start + self.max_batch_size]
+            decoded = self._generate([texts[i] for i in indices], source_lang, target_lang)
+            for i, text in zip(indices, decoded):
+                results[i] = text
+        return results
+
+    def _generate(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        import torch
+
+        with self._tokenizer_lock:
+            self.tokenizer.src_lang = source_lang
+            encoded = self.tokenizer(
+                texts, return_tensors="pt", padding=True, truncation=True
+            )
+            forced_bos_token_id = self.tokenizer.get_lang_id(target_lang)
+
+        with torch.inference_mode(), inference_threads("m2m100"):
+            generated = self.model.generate(
+                **encoded,
+                forced_bos_token_id=forced_bos_token_id,
+                max_new_tokens=self.max_new_tokens
+            )
+        return self.tokenizer.batch_decode(generated, skip_special_tokens=True)
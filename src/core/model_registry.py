@@ -0,0 +1,264 @@
+"""
+Process-wide registry of heavy models and shared resources
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from config.settings import settings
+from .metrics import record_fallback
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelRegistry:
+    """
+    Lazily loads each registered resource at most once per process
+
+    Loading is thread-safe: concurrent callers asking for the same model
+    wait for a single load instead of each building their own copy.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._status: Dict[str, str] = {}
+        self._errors: Dict[str, str] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Register (or replace) the loader for a named resource"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._status.setdefault(name, NOT_LOADED)
+
+    def get(self, name: str) -> Any:
+        """
+        Return the named resource, loading it on first use
+
+        Args:
+            name: Registered resource name
+
+        Returns:
+            The shared instance
+        """
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model '{name}'")
+
+        with self._locks[name]:
+            if name in self._instances:
+                return self._instances[name]
+
+            self._status[name] = LOADING
+            started = time.perf_counter()
+            try:
+                instance = self._loaders[name]()
+            except Exception as e:
+                self._status[name] = FAILED
+                self._errors[name] = str(e)
+                raise
+            self._load_seconds[name] = time.perf_counter() - started
+            self._instances[name] = instance
+            self._status[name] = READY
+            self._errors.pop(name, None)
+            return instance
+
+    def set(self, name: str, instance: Any):
+        """Install an already-built instance (e.g. a test double)"""
+        with self._lock:
+            self._locks.setdefault(name, threading.Lock())
+        self._instances[name] = instance
+        self._status[name] = READY
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def status(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """Load state of every registered resource"""
+        return {
+            name: {
+                "status": self._status.get(name, NOT_LOADED),
+                "error": self._errors.get(name),
+                "load_seconds": self._load_seconds.get(name)
+            }
+            for name in self._loaders
+        }
+
+    def load_async(self, name: str) -> bool:
+        """
+        Start loading a resource in a daemon thread
+
+        Returns:
+            False if it is already loaded or loading, True if a load was started
+        """
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model '{name}'")
+        with self._lock:
+            if name in self._instances or self._status.get(name) == LOADING:
+                return False
+            self._status[name] = LOADING
+
+        def _load():
+            try:
+                self.get(name)
+            except Exception as e:
+                record_fallback(f"{name}_load", e)
+
+        threading.Thread(target=_load, name=f"model-load-{name}", daemon=True).start()
+        return True
+
+    def unload(self, name: str):
+        """Drop a loaded instance so the next get() reloads it"""
+        with self._locks.get(name, self._lock):
+            self._instances.pop(name, None)
+            self._status[name] = NOT_LOADED
+
+    def warmup(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Load models ahead of the first request
+
+        Args:
+            names: Resources to load (defaults to every registered resource)
+            background: Load in a daemon thread instead of blocking the caller
+
+        Returns:
+            The warm-up thread when running in the background
+        """
+        names = list(names) if names is not None else list(self._loaders)
+
+        def _load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    record_fallback(f"{name}_load", e)
+
+        if not background:
+            _load_all()
+            return None
+
+        thread = threading.Thread(target=_load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+
+def _load_whisper():
+    if settings.INFERENCE_SERVER_ADDRESS:
+        from .inference_server import RemoteWhisper, inference_client
+        return RemoteWhisper(inference_client())
+    from .inference_profile import load_whisper
+    return load_whisper()
+
+
+def _load_m2m100_model():
+    from .inference_profile import load_m2m100_model
+    return load_m2m100_model()
+
+
+def _load_m2m100_tokenizer():
+    from transformers import M2M100Tokenizer
+    return M2M100Tokenizer.from_pretrained(settings.TRANSLATION_MODEL)
+
+
+def _load_m2m100_engine():
+    if settings.INFERENCE_SERVER_ADDRESS:
+        from .inference_server import RemoteM2M100Engine, inference_client
+        return RemoteM2M100Engine(inference_client())
+    from .m2m_engine import M2M100Engine
+    return M2M100Engine(registry.get("m2m100_model"), registry.get("m2m100_tokenizer"))
+
+
+def _load_cache():
+    from .cache import LRUCache, NullCache, SQLiteCache, TieredCache, sqlite_path_from_url
+    if not settings.CACHE_ENABLED:
+        return NullCache()
+    disk = None
+    db_path = sqlite_path_from_url(settings.DATABASE_URL)
+    if settings.CACHE_PERSIST and db_path:
+        disk = SQLiteCache(db_path, ttl_seconds=settings.CACHE_TTL_SECONDS)
+    memory = LRUCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+    return TieredCache(memory, disk)
+
+
+def _load_semantic_cache():
+    from .semantic_cache import SemanticCache
+    return SemanticCache(
+        registry.get("embeddings"),
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.CACHE_TTL_SECONDS,
+        audit_rate=settings.SEMANTIC_CACHE_AUDIT_RATE
+    )
+
+
+def _load_sessions():
+    from .cache import sqlite_path_from_url
+    from .sessions import SessionStore
+    return SessionStore(
+        max_turns=settings.SESSION_MAX_TURNS,
+        history_tokens=settings.SESSION_HISTORY_TOKENS,
+        summary_tokens=settings.SESSION_SUMMARY_TOKENS,
+        max_sessions=settings.SESSION_MAX_ACTIVE,
+        ttl_seconds=settings.SESSION_TTL_SECONDS,
+        path=sqlite_path_from_url(settings.DATABASE_URL) if settings.SESSION_PERSIST else None
+    )
+
+
+def _load_phrasebook():
+    from .phrasebook import load_phrasebook
+    # None until a phrasebook has been built
+    return load_phrasebook()
+
+
+def _load_embeddings():
+    from .embeddings import CachedEmbeddings
+    if settings.INFERENCE_SERVER_ADDRESS:
+        from .inference_server import RemoteEmbeddings, inference_client
+        model = RemoteEmbeddings(inference_client())
+    else:
+        from .inference_profile import load_embeddings
+        model = load_embeddings()
+    # Query embeddings stay cached in this process either way
+    return CachedEmbeddings(model, max_entries=settings.EMBEDDING_CACHE_SIZE)
+
+
+def _load_cultural_rag():
+    from .cultural_rag import CulturalRAG
+    return CulturalRAG()
+
+
+def _load_openai_client():
+    import openai
+    from .upstream import pooled_http_client
+    # Retries are handled by the upstream layer, not the SDK
+    return openai.OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=pooled_http_client(settings.LLM_TIMEOUT_SECONDS),
+        max_retries=0
+    )
+
+
+registry = ModelRegistry()
+registry.register("whisper", _load_whisper)
+registry.register("m2m100_model", _load_m2m100_model)
+registry.register("m2m100_tokenizer", _load_m2m100_tokenizer)
+registry.register("m2m100_engine", _load_m2m100_engine)
+registry.register("cache", _load_cache)
+registry.register("embeddings", _load_embeddings)
+registry.register("cultural_rag", _load_cultural_rag)
+registry.register("openai_client", _load_openai_client)
+registry.register("sessions", _load_sessions)
+registry.register("semantic_cache", _load_semantic_cache)
+registry.register("phrasebook", _load_phrasebook)
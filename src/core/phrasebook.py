@@ -0,0 +1,349 @@
+"""
+Precomputed per-culture phrasebook in a memory-mapped key/value file
+
+Usage:
+    python -m src.core.phrasebook build [--phrases FILE] [--output FILE] [--cultures japanese,german]
+
+The build step runs stock phrases (greetings, thanks, apologies, meeting
+logistics) through the full pipeline for every supported culture. /translate
+consults the file before anything else with a normalised-text lookup.
+
+File layout (little-endian):
+
+    header   magic "CTPB", version, entry count, bucket count, metadata length
+    metadata JSON: source languages, LLM model, prompt versions, build time
+    buckets  (hash u64, record offset u64) per bucket, open addressing
+    records  key length u32, value length u32, key bytes, JSON value bytes
+
+The file is opened read-only with mmap, so worker processes share the
+page cache copy and a lookup touches a handful of pages without loading
+or parsing anything up front.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.settings import settings
+from .cache import normalize_text
+from .metrics import FALLBACKS, metrics, record_fallback
+from .model_registry import registry
+
+logger = logging.getLogger("cultitrans")
+
+MAGIC = b"CTPB"
+VERSION = 2  # bumped whenever the file layout or key normalisation changes
+_HEADER = struct.Struct("<4sIIII")
+_BUCKET = struct.Struct("<QQ")
+_RECORD = struct.Struct("<II")
+
+# How often get_phrasebook checks whether the file was (re)built
+RELOAD_CHECK_SECONDS = 1.0
+
+# Identity of the file the registry instance was loaded from, and when it was last checked
+_watch = {"identity": None, "checked": float("-inf")}
+
+PHRASEBOOK_LOOKUPS = metrics.counter(
+    "cultitrans_phrasebook_lookups_total", "Phrasebook lookups by outcome", ["outcome"]
+)
+
+# Stages whose fallback leaves untranslated text or generic suggestions in a result
+_RESULT_STAGES = ("translation", "adaptation", "adaptation_parse", "response_generation")
+
+_LEADING = re.compile(r"^[\W_]+", re.UNICODE)
+_TRAILING = re.compile(r"[\W_]+$", re.UNICODE)
+
+
+class PhrasebookBuildError(RuntimeError):
+    """Raised when the pipeline fell back during a build"""
+
+
+def normalize(text: str) -> str:
+    """
+    Lookup form of a phrase: the cache key normalisation without edge
+    punctuation, except that a final "?" or "!" is kept ("No?" is not "No.")
+    """
+    text = _LEADING.sub("", normalize_text(text))
+    trailing = _TRAILING.search(text)
+    if trailing is None:
+        return text
+    marks = "".join(dict.fromkeys(c for c in trailing.group() if c in "?!"))
+    return text[:trailing.start()].rstrip() + marks
+
+
+def make_phrase_key(text: str, source_lang: str, culture: str) -> bytes:
+    return "\x1f".join((culture, source_lang, normalize(text))).encode("utf-8")
+
+
+def _hash(key: bytes) -> int:
+    # Stable across processes, unlike hash(); 0 marks an empty bucket
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+def _versions() -> Dict[str, str]:
+    """Settings the stored results depend on; a mismatch makes the file stale"""
+    from .response_generator import RESPONSE_PROMPT_VERSION
+    from .translator import ADAPTATION_PROMPT_VERSION
+    return {
+        "llm_model": settings.LLM_MODEL,
+        "adaptation_prompt": ADAPTATION_PROMPT_VERSION,
+        "response_prompt": RESPONSE_PROMPT_VERSION,
+    }
+
+
+def write_phrasebook(path: str, entries: Iterable[Tuple[bytes, Dict]], metadata: Dict) -> int:
+    """
+    Write entries to a phrasebook file atomically
+
+    Readers that already mapped the previous file keep using it until
+    get_phrasebook notices the new one (within RELOAD_CHECK_SECONDS).
+
+    Args:
+        path: Output file
+        entries: (key from make_phrase_key, result dictionary) pairs; later keys win
+        metadata: JSON-serialisable build information
+
+    Returns:
+        Number of entries written
+    """
+    records: Dict[bytes, bytes] = {}
+    for key, value in entries:
+        records[key] = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    # At most half full keeps probe sequences short
+    buckets = 8
+    while buckets < 2 * len(records):
+        buckets *= 2
+    meta = json.dumps(metadata, ensure_ascii=False).encode("utf-8")
+    offset = _HEADER.size + len(meta) + buckets * _BUCKET.size
+
+    table = [(0, 0)] * buckets
+    body = bytearray()
+    for key, value in records.items():
+        h = _hash(key)
+        slot = h & (buckets - 1)
+        while table[slot][0]:
+            slot = (slot + 1) & (buckets - 1)
+        table[slot] = (h, offset + len(body))
+        body += _RECORD.pack(len(key), len(value)) + key + value
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    staging = f"{path}.tmp"
+    with open(staging, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(records), buckets, len(meta)))
+        f.write(meta)
+        f.write(b"".join(_BUCKET.pack(h, record) for h, record in table))
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(staging, path)
+    return len(records)
+
+
+class Phrasebook:
+    """Read-only, memory-mapped view of a phrasebook file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self._buckets, meta_length = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} phrasebook")
+        self.metadata = json.loads(self._map[_HEADER.size:_HEADER.size + meta_length])
+        self._table = _HEADER.size + meta_length
+        self.source_languages: List[str] = self.metadata.get("source_languages", [])
+        self.path = path
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, key: bytes) -> Optional[Dict]:
+        """Stored result for an exact key, or None"""
+        h = _hash(key)
+        mask = self._buckets - 1
+        slot = h & mask
+        for _ in range(self._buckets):
+            stored, offset = _BUCKET.unpack_from(self._map, self._table + slot * _BUCKET.size)
+            if not stored:
+                return None
+            if stored == h:
+                key_length, value_length = _RECORD.unpack_from(self._map, offset)
+                start = offset + _RECORD.size
+                if self._map[start:start + key_length] == key:
+                    start += key_length
+                    return json.loads(self._map[start:start + value_length])
+            slot = (slot + 1) & mask
+        return None
+
+    def lookup(self, text: str, source_lang: str, culture: str) -> Optional[Dict]:
+        """
+        Precomputed result for a phrase, or None
+
+        "auto" as the source language matches the languages the phrasebook
+        was built from.
+        """
+        languages = self.source_languages if source_lang == "auto" else [source_lang]
+        for language in languages:
+            result = self.get(make_phrase_key(text, language, culture))
+            if result is not None:
+                PHRASEBOOK_LOOKUPS.inc(outcome="hit")
+                return result
+        PHRASEBOOK_LOOKUPS.inc(outcome="miss")
+        return None
+
+    def close(self):
+        self._map.close()
+
+
+def load_phrasebook(path: str = None) -> Optional[Phrasebook]:
+    """Open the phrasebook file; None if it does not exist or was built for another format, models or prompts"""
+    path = path or settings.PHRASEBOOK_PATH
+    if not os.path.exists(path):
+        return None
+    try:
+        phrasebook = Phrasebook(path)
+    except ValueError as e:
+        logger.warning("Ignoring phrasebook: %s; rebuild it", e)
+        return None
+    built_for = phrasebook.metadata.get("versions")
+    if built_for != _versions():
+        logger.warning("Ignoring stale phrasebook %s (built for %s, now %s)", path, built_for, _versions())
+        phrasebook.close()
+        return None
+    return phrasebook
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def get_phrasebook() -> Optional[Phrasebook]:
+    """
+    The shared phrasebook, or None when disabled or unavailable
+
+    A file that is built, rebuilt or removed after the first lookup is
+    picked up without a restart. The replaced mapping is not closed, as
+    other threads may be reading it; it is released once unreferenced.
+    """
+    if not settings.PHRASEBOOK_ENABLED:
+        return None
+    try:
+        now = time.monotonic()
+        if now - _watch["checked"] >= RELOAD_CHECK_SECONDS:
+            _watch["checked"] = now
+            identity = _file_identity(settings.PHRASEBOOK_PATH)
+            if identity != _watch["identity"]:
+                _watch["identity"] = identity
+                registry.unload("phrasebook")
+        return registry.get("phrasebook")
+    except Exception as e:
+        record_fallback("phrasebook", e)
+        return None
+
+
+def read_phrases(path: str) -> List[str]:
+    """Phrases of a list file: one per line, blank lines and # comments skipped"""
+    with open(path, "r", encoding="utf-8") as f:
+        phrases = [line.strip() for line in f]
+    return [p for p in phrases if p and not p.startswith("#")]
+
+
+def _result_fallbacks() -> float:
+    return sum(FALLBACKS.total(stage=stage) for stage in _RESULT_STAGES)
+
+
+def build(phrases: List[str], cultures: List[str], source_lang: str, processor) -> List[Tuple[bytes, Dict]]:
+    """
+    Run every phrase through the pipeline for every culture
+
+    Failed stages answer with fallbacks (the input text, generic
+    suggestions) that must not be served as precomputed results, so any
+    fallback aborts the build.
+
+    Args:
+        phrases: Stock phrases in ``source_lang``
+        cultures: Keys of settings.SUPPORTED_CULTURES
+        source_lang: Language of the phrases
+        processor: BatchProcessor with suggestions enabled
+
+    Returns:
+        (key, result) pairs; phrases that failed are left out
+
+    Raises:
+        PhrasebookBuildError: A translation, adaptation or suggestion stage fell back
+    """
+    entries = []
+    for culture in cultures:
+        records = [{"text": p, "source_language": source_lang, "target_culture": culture} for p in phrases]
+        before = _result_fallbacks()
+        results = processor.process(records)
+        fallbacks = _result_fallbacks() - before
+        if fallbacks:
+            raise PhrasebookBuildError(f"{fallbacks:.0f} pipeline fallbacks while building {culture}")
+        for phrase, result in zip(phrases, results):
+            if "error" in result:
+                logger.warning("Skipping %r for %s: %s", phrase, culture, result["error"])
+                continue
+            entries.append((make_phrase_key(phrase, source_lang, culture), result))
+    return entries
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Precompute the per-culture phrasebook")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    build_parser = subcommands.add_parser("build", help="Run the phrase list through the pipeline")
+    build_parser.add_argument("--phrases", default=settings.PHRASEBOOK_PHRASES, help="Phrase list (one per line)")
+    build_parser.add_argument("--output", default=settings.PHRASEBOOK_PATH)
+    build_parser.add_argument("--source-language", default="en", help="Language of the phrase list")
+    build_parser.add_argument("--cultures", default=",".join(settings.SUPPORTED_CULTURES),
+                              help="Comma-separated target cultures")
+    args = parser.parse_args(argv)
+
+    cultures = [c.strip() for c in args.cultures.split(",") if c.strip()]
+    unknown = set(cultures) - set(settings.SUPPORTED_CULTURES)
+    if unknown:
+        parser.error(f"Unknown cultures: {', '.join(sorted(unknown))}")
+
+    from .batch_runner import BatchProcessor
+    from .response_generator import ResponseGenerator
+    from .translator import CulturalTranslator
+
+    phrases = read_phrases(args.phrases)
+    started = time.perf_counter()
+    processor = BatchProcessor(CulturalTranslator(), ResponseGenerator(), include_suggestions=True)
+    try:
+        entries = build(phrases, cultures, args.source_language, processor)
+    except PhrasebookBuildError as e:
+        # The previous phrasebook, if any, stays in place
+        sys.exit(f"Phrasebook build failed, nothing written: {e}")
+    count = write_phrasebook(args.output, entries, {
+        "source_languages": [args.source_language],
+        "cultures": cultures,
+        "versions": _versions(),
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    })
+    print(json.dumps({
+        "entries": count,
+        "phrases": len(phrases),
+        "cultures": len(cultures),
+        "bytes": os.path.getsize(args.output),
+        "seconds": round(time.perf_counter() - started, 1)
+    }), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
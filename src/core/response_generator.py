@@ -2,17 +2,89 @@
 Cultural response recommendation module
 """
 
-import openai
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from config.settings import settings
-from .cultural_rag import CulturalRAG
+from .cache import MISS, make_key
+from .llm import chat_completion, stream_chat_completion
+from .metrics import record_fallback, span
+from .model_registry import registry
+from .semantic_cache import get_semantic_cache
+from .sessions import format_message
 
-class ResponseGenerator:
+# Bump when the response prompt changes so cached suggestions are not reused
+RESPONSE_PROMPT_VERSION = "1"
+
+def _semantic_namespace(num_responses: int) -> str:
+    """Semantic cache namespace of suggestions from the current model and prompt"""
+    return f"responses:{settings.LLM_MODEL}:{RESPONSE_PROMPT_VERSION}:{num_responses}"
+
+def _semantic_text(conversation_context: str, query: str = None):
+    """
+    Input of the semantic tier, or None to skip it
+
+    Session history comes before the latest message and can fill the
+    embedding model's input window, so turns that share a history would
+    look like duplicates; only contexts without history are matched.
+    """
+    if query is None:
+        return conversation_context
+    return query if conversation_context == format_message(query) else None
+
+class ResponseSuggestionParser:
+    """
+    Incremental parser for "Response X: ... / Explanation: ..." LLM output
+    
+    Text can be fed in arbitrary chunks (e.g. streamed tokens); each
+    suggestion is returned as soon as its explanation line is complete.
+    """
+    
     def __init__(self):
-        openai.api_key = settings.OPENAI_API_KEY
-        self.cultural_rag = CulturalRAG()
+        self._buffer = ""
+        self._current = {}
+    
+    def feed(self, text: str) -> List[Dict]:
+        """Consume a chunk of output and return suggestions completed by it"""
+        self._buffer += text
+        completed = []
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            completed.extend(self._parse_line(line))
+        return completed
+    
+    def close(self) -> List[Dict]:
+        """Flush the last line and any suggestion still in progress"""
+        completed = self._parse_line(self._buffer)
+        self._buffer = ""
+        if self._current:
+            completed.append(self._current)
+            self._current = {}
+        return completed
+    
+    def _parse_line(self, line: str) -> List[Dict]:
+        completed = []
+        if line.startswith('Response'):
+            if self._current:
+                completed.append(self._current)
+            self._current = {'text': line.split(':', 1)[1].strip()}
+        elif line.startswith('Explanation'):
+            self._current['explanation'] = line.split(':', 1)[1].strip()
+            completed.append(self._current)
+            self._current = {}
+        return completed
+
+class ResponseGenerator:
+    @property
+    def cultural_rag(self):
+        """Shared cultural knowledge base, built on first use"""
+        return registry.get("cultural_rag")
     
-    def generate_responses(self, conversation_context: str, target_culture: str, num_responses: int = 3) -> List[Dict]:
+    @property
+    def cache(self):
+        """Shared response suggestion cache"""
+        return registry.get("cache")
+    
+    def generate_responses(self, conversation_context: str, target_culture: str, num_responses: int = 3,
+                           query: str = None, cultural_context: List[str] = None) -> List[Dict]:
         """
         Generate culturally appropriate response suggestions
         
@@ -20,32 +92,113 @@ class ResponseGenerator:
             conversation_context: The conversation history/context
             target_culture: Target culture for responses
             num_responses: Number of response options to generate
+            query: Text used to retrieve cultural context (defaults to
+                conversation_context; pass the latest message when the
+                context carries session history)
+            cultural_context: Already retrieved cultural guidance (skips retrieval)
         
         Returns:
             List of response dictionaries with text and explanation
         """
-        # Get cultural context from RAG
-        cultural_context = self.cultural_rag.retrieve_cultural_context(
-            conversation_context, target_culture
+        key = make_key(
+            "responses", conversation_context, target_culture=target_culture,
+            model=settings.LLM_MODEL, prompt_version=f"{RESPONSE_PROMPT_VERSION}:{num_responses}"
         )
         
-        culture_info = settings.SUPPORTED_CULTURES.get(target_culture, {})
+        compute = lambda: self._request_responses(conversation_context, target_culture, query, cultural_context)
+        semantic = get_semantic_cache()
+        semantic_text = _semantic_text(conversation_context, query)
+        if semantic is not None and semantic_text is not None:
+            # Exact cache first, then near-duplicate messages, then the LLM
+            request = compute
+            compute = lambda: semantic.get_or_compute(
+                _semantic_namespace(num_responses), target_culture, semantic_text, request
+            )
+        try:
+            return self.cache.get_or_compute(key, compute)
+        except Exception as e:
+            record_fallback("response_generation", e)
+            return self._fallback_responses(target_culture)
+    
+    def stream_responses(self, conversation_context: str, target_culture: str, num_responses: int = 3,
+                         query: str = None) -> Iterator[Dict]:
+        """
+        Stream response suggestions as the LLM produces them
         
-        prompt = self._build_response_prompt(
-            conversation_context, target_culture, cultural_context, culture_info
+        Args:
+            conversation_context: The conversation history/context
+            target_culture: Target culture for responses
+            num_responses: Number of response options to generate
+            query: Text used to retrieve cultural context (defaults to conversation_context)
+        
+        Yields:
+            Response dictionaries, each as soon as its explanation is complete
+        """
+        key = make_key(
+            "responses", conversation_context, target_culture=target_culture,
+            model=settings.LLM_MODEL, prompt_version=f"{RESPONSE_PROMPT_VERSION}:{num_responses}"
         )
+        cached = self.cache.get(key)
+        if cached is not MISS:
+            yield from cached
+            return
+        semantic = get_semantic_cache()
+        semantic_text = _semantic_text(conversation_context, query)
+        if semantic_text is None:
+            semantic = None
+        if semantic is not None:
+            similar = semantic.lookup(_semantic_namespace(num_responses), target_culture, semantic_text)
+            if similar is not MISS:
+                yield from similar
+                return
         
+        parser = ResponseSuggestionParser()
+        responses = []
         try:
-            response = openai.ChatCompletion.create(
-                model=settings.LLM_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300
-            )
-            
-            return self._parse_response_suggestions(response.choices[0].message.content)
+            prompt = self._prepare_prompt(conversation_context, target_culture, query)
+            for delta in stream_chat_completion(prompt, max_tokens=300, stage="response_llm", optional=True):
+                for suggestion in parser.feed(delta):
+                    responses.append(suggestion)
+                    yield suggestion
+            for suggestion in parser.close():
+                responses.append(suggestion)
+                yield suggestion
         except Exception as e:
-            print(f"Response generation error: {e}")
-            return self._fallback_responses(target_culture)
+            record_fallback("response_generation", e)
+            if not responses:
+                yield from self._fallback_responses(target_culture)
+            return
+        
+        if responses:
+            self.cache.set(key, responses)
+            if semantic is not None:
+                semantic.store(_semantic_namespace(num_responses), target_culture, semantic_text, responses)
+    
+    def _prepare_prompt(self, conversation_context: str, target_culture: str, query: str = None,
+                        cultural_context: List[str] = None) -> str:
+        """Retrieve cultural context (unless given) and build the response prompt"""
+        # Get cultural context from RAG
+        if cultural_context is None:
+            with span("rag_retrieval"):
+                cultural_context = self.cultural_rag.retrieve_cultural_context(
+                    query or conversation_context, target_culture
+                )
+        
+        culture_info = settings.SUPPORTED_CULTURES.get(target_culture, {})
+        
+        return self._build_response_prompt(
+            conversation_context, target_culture, cultural_context, culture_info
+        )
+    
+    def _request_responses(self, conversation_context: str, target_culture: str, query: str = None,
+                           cultural_context: List[str] = None) -> List[Dict]:
+        """Retrieve cultural context and call the LLM; raises on failure"""
+        prompt = self._prepare_prompt(conversation_context, target_culture, query, cultural_context)
+        
+        reply = chat_completion(prompt, max_tokens=300, stage="response_llm", optional=True)
+        
+        with span("response_parse"):
+            return self._parse_response_suggestions(reply)
     
     def _build_response_prompt(self, context: str, culture: str, cultural_context: List[str], culture_info: Dict) -> str:
         """Build the prompt for response generation"""
@@ -71,22 +224,8 @@ class ResponseGenerator:
     
     def _parse_response_suggestions(self, llm_output: str) -> List[Dict]:
         """Parse LLM output into structured response suggestions"""
-        responses = []
-        lines = llm_output.split('\n')
-        
-        current_response = {}
-        for line in lines:
-            if line.startswith('Response'):
-                if current_response:
-                    responses.append(current_response)
-                current_response = {'text': line.split(':', 1)[1].strip()}
-            elif line.startswith('Explanation'):
-                current_response['explanation'] = line.split(':', 1)[1].strip()
-        
-        if current_response:
-            responses.append(current_response)
-        
-        return responses
+        parser = ResponseSuggestionParser()
+        return parser.feed(llm_output) + parser.close()
     
     def _fallback_responses(self, culture: str) -> List[Dict]:
         """Provide fallback responses if generation fails"""
@@ -0,0 +1,280 @@
+"""
+Admission control and priority scheduling for upstream calls
+
+Every call to a rate-limited upstream first asks that upstream's scheduler
+for admission. Request and token budgets are token buckets; callers that
+cannot run yet wait in a priority queue, where interactive work goes before
+batch jobs and translation/adaptation before optional work (response
+suggestions). Under pressure optional interactive work is shed and batch
+work is deferred, so the service degrades to its local fallbacks instead
+of being throttled by the provider.
+"""
+
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from config.settings import settings
+from .metrics import metrics
+
+INTERACTIVE = 0
+INTERACTIVE_OPTIONAL = 1
+BATCH = 2
+BATCH_OPTIONAL = 3
+
+PRIORITY_NAMES = ("interactive", "interactive_optional", "batch", "batch_optional")
+
+ADMISSIONS = metrics.counter(
+    "cultitrans_upstream_admissions_total", "Upstream admission decisions by priority and outcome",
+    ["upstream", "priority", "outcome"]
+)
+QUEUE_WAIT = metrics.histogram(
+    "cultitrans_upstream_queue_wait_seconds", "Time admitted calls spent queued", ["upstream", "priority"]
+)
+
+_batch_work = contextvars.ContextVar("cultitrans_batch_work", default=False)
+
+
+class UpstreamOverloaded(RuntimeError):
+    """Raised when a call is shed or cannot be admitted in time"""
+
+
+@contextmanager
+def batch_work() -> Iterator[None]:
+    """Mark upstream calls made in this block (and its copied contexts) as batch work"""
+    token = _batch_work.set(True)
+    try:
+        yield
+    finally:
+        _batch_work.reset(token)
+
+
+def current_priority(optional: bool = False) -> int:
+    """Priority of a call made from the current context"""
+    return (BATCH if _batch_work.get() else INTERACTIVE) + (1 if optional else 0)
+
+
+class TokenBucket:
+    """
+    Budget refilled continuously at ``rate`` per second up to ``capacity``
+
+    A single charge larger than the capacity is allowed once the bucket is
+    full and leaves it in debt, so oversized calls are slowed, not blocked.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be charged (0 if it can be now)"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def charge(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= amount
+
+    def drain(self, now: float):
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+
+class Admission:
+    """A granted slot; release it when the call is finished"""
+
+    def __init__(self, scheduler: "UpstreamScheduler"):
+        self._scheduler = scheduler
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._scheduler._release()
+
+    def __enter__(self) -> "Admission":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class UpstreamScheduler:
+    """
+    Token-bucket admission with a strict priority queue for one upstream
+
+    Only the head of the queue (highest priority, then arrival order) is
+    admitted, so a burst of batch work cannot overtake interactive calls.
+    A full queue sheds its lowest-priority waiter to make room for more
+    important work. Limits of 0 are disabled.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 0,
+        max_queue: Optional[int] = None,
+        burst_seconds: Optional[float] = None,
+        shed_after: Optional[float] = None,
+        batch_max_wait: Optional[float] = None,
+        throttle_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            name: Upstream name used in errors and metrics
+            requests_per_minute: Request budget (0: unlimited)
+            tokens_per_minute: Token budget, prompt plus max completion tokens (0: unlimited)
+            max_concurrency: Calls in flight at once (0: unlimited)
+            max_queue: Waiting calls before the lowest priority is shed
+            burst_seconds: Bucket capacity in seconds of budget
+            shed_after: Longest wait of optional interactive work before it is shed
+            batch_max_wait: Longest wait of batch work (its call deadline starts once admitted)
+            throttle_seconds: Pause after the upstream reports a rate limit without Retry-After
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = settings.SCHEDULER_MAX_QUEUE if max_queue is None else max_queue
+        self.shed_after = settings.SCHEDULER_SHED_AFTER_SECONDS if shed_after is None else shed_after
+        self.batch_max_wait = settings.SCHEDULER_BATCH_MAX_WAIT_SECONDS if batch_max_wait is None else batch_max_wait
+        self.throttle_seconds = settings.SCHEDULER_THROTTLE_SECONDS if throttle_seconds is None else throttle_seconds
+        burst = settings.SCHEDULER_BURST_SECONDS if burst_seconds is None else burst_seconds
+        self.requests = TokenBucket(requests_per_minute / 60.0, requests_per_minute / 60.0 * burst) \
+            if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute / 60.0 * burst) \
+            if tokens_per_minute > 0 else None
+        self.in_flight = 0
+        self._paused_until = 0.0
+        # Heap of [priority, arrival, tokens, state]; state is None while waiting
+        self._queue: List[list] = []
+        self._arrivals = itertools.count()
+        self._cond = threading.Condition()
+
+    def max_wait(self, priority: int, timeout: float) -> float:
+        """How long a call of this priority may wait for admission"""
+        if priority >= BATCH:
+            return max(timeout, self.batch_max_wait)
+        if priority == INTERACTIVE_OPTIONAL:
+            return min(timeout, self.shed_after)
+        return timeout
+
+    def admit(self, priority: int = INTERACTIVE, tokens: int = 0, timeout: float = 30.0) -> Admission:
+        """
+        Wait until a call may be made
+
+        Args:
+            priority: INTERACTIVE, INTERACTIVE_OPTIONAL, BATCH or BATCH_OPTIONAL
+            tokens: Tokens the call is charged against the token budget
+            timeout: Call deadline; bounds the wait of interactive work
+
+        Returns:
+            Admission to release once the call has finished
+
+        Raises:
+            UpstreamOverloaded: The call was shed or not admitted in time
+        """
+        label = PRIORITY_NAMES[priority]
+        started = time.monotonic()
+        expires = started + self.max_wait(priority, timeout)
+        entry = [priority, next(self._arrivals), tokens, None]
+
+        with self._cond:
+            if self.max_queue and len(self._queue) >= self.max_queue:
+                worst = max(self._queue)
+                if worst[0] <= priority:
+                    self._reject(entry, "shed", "queue is full")
+                self._queue.remove(worst)
+                heapq.heapify(self._queue)
+                worst[3] = "shed"
+                self._cond.notify_all()
+            heapq.heappush(self._queue, entry)
+
+            while True:
+                now = time.monotonic()
+                if entry[3] == "shed":
+                    self._reject(entry, "shed", "displaced by higher-priority work")
+                delay = self._delay(entry, now) if self._queue[0] is entry else None
+                if delay == 0.0:
+                    heapq.heappop(self._queue)
+                    self._grant(entry, now)
+                    # The next waiter may be admissible too
+                    self._cond.notify_all()
+                    break
+                remaining = expires - now
+                if remaining <= 0:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                    outcome = "shed" if priority == INTERACTIVE_OPTIONAL else "expired"
+                    self._reject(entry, outcome, "no capacity before the deadline")
+                self._cond.wait(remaining if delay is None else min(remaining, delay))
+
+        wait = time.monotonic() - started
+        ADMISSIONS.inc(upstream=self.name, priority=label, outcome="admitted")
+        QUEUE_WAIT.observe(wait, upstream=self.name, priority=label)
+        return Admission(self)
+
+    def throttle(self, seconds: Optional[float] = None):
+        """The upstream reported a rate limit: pause admissions and empty the request budget"""
+        with self._cond:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + (seconds or self.throttle_seconds))
+            if self.requests is not None:
+                self.requests.drain(now)
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Waiting calls per priority, plus calls in flight"""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES}
+            for entry in self._queue:
+                depth[PRIORITY_NAMES[entry[0]]] += 1
+            depth["in_flight"] = self.in_flight
+        return depth
+
+    def _delay(self, entry: list, now: float) -> Optional[float]:
+        """Seconds until the head can be admitted; None while waiting for a release"""
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            return None
+        delay = max(0.0, self._paused_until - now)
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1, now))
+        if self.tokens is not None and entry[2]:
+            delay = max(delay, self.tokens.delay(entry[2], now))
+        return delay
+
+    def _grant(self, entry: list, now: float):
+        if self.requests is not None:
+            self.requests.charge(1, now)
+        if self.tokens is not None and entry[2]:
+            self.tokens.charge(entry[2], now)
+        self.in_flight += 1
+
+    def _release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def _reject(self, entry: list, outcome: str, reason: str):
+        ADMISSIONS.inc(upstream=self.name, priority=PRIORITY_NAMES[entry[0]], outcome=outcome)
+        raise UpstreamOverloaded(f"{self.name}: {PRIORITY_NAMES[entry[0]]} call {outcome} ({reason})")
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header on an HTTP error, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,241 @@
+"""
+Semantic near-duplicate cache for LLM outputs
+
+Paraphrases ("thanks so much" / "thank you very much") miss the exact
+cache but produce nearly identical adaptations and suggestions. This cache
+embeds the input with the shared embedding model and reuses the stored
+result of the nearest previous input of the same kind and culture when
+their cosine similarity reaches the threshold.
+"""
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from .cache import MISS
+from .metrics import metrics, record_fallback
+from .model_registry import registry
+
+# Seconds before a failed load of the cache (or its embedding model) is retried
+LOAD_RETRY_SECONDS = 60.0
+
+SIMILARITY_BUCKETS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.92, 0.94, 0.96, 0.98, 0.99, 1.0)
+
+SEMANTIC_LOOKUPS = metrics.counter(
+    "cultitrans_semantic_cache_lookups_total", "Semantic cache lookups by namespace and outcome",
+    ["namespace", "outcome"]
+)
+NEIGHBOUR_SIMILARITY = metrics.histogram(
+    "cultitrans_semantic_cache_similarity", "Similarity of the nearest cached input, by lookup outcome",
+    ["namespace", "outcome"], buckets=SIMILARITY_BUCKETS
+)
+HIT_AGREEMENT = metrics.histogram(
+    "cultitrans_semantic_cache_hit_agreement",
+    "Similarity between a reused result and a freshly computed one (audited hits)",
+    ["namespace"], buckets=SIMILARITY_BUCKETS
+)
+
+
+class _Partition:
+    """Normalised input vectors of one namespace and culture"""
+
+    def __init__(self, dimensions: int):
+        self.matrix = np.empty((16, dimensions), dtype=np.float32)
+        self.ids: List[int] = []
+
+    def add(self, entry_id: int, vector: np.ndarray):
+        if len(self.ids) == len(self.matrix):
+            self.matrix = np.concatenate([self.matrix, np.empty_like(self.matrix)])
+        self.matrix[len(self.ids)] = vector
+        self.ids.append(entry_id)
+
+    def remove(self, entry_id: int):
+        # Swap with the last row to keep the matrix dense
+        row = self.ids.index(entry_id)
+        last = len(self.ids) - 1
+        self.matrix[row] = self.matrix[last]
+        self.ids[row] = self.ids[last]
+        self.ids.pop()
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[int], float]:
+        if not self.ids:
+            return None, 0.0
+        scores = self.matrix[:len(self.ids)] @ vector
+        row = int(scores.argmax())
+        return self.ids[row], float(scores[row])
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache partitioned by namespace and target culture
+
+    Entries are evicted least-recently-used once ``max_entries`` is
+    reached, and expire after ``ttl_seconds``. A fraction ``audit_rate`` of
+    hits is recomputed and compared with the reused result, giving a
+    direct measure of hit quality for tuning ``threshold``.
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.95, max_entries: int = 5000,
+                 ttl_seconds: float = 86400, audit_rate: float = 0.0):
+        """
+        Args:
+            embeddings: Model with ``embed_queries`` (CachedEmbeddings) or ``embed_documents``
+            threshold: Minimum cosine similarity for reusing a result
+            max_entries: Entries kept across all partitions
+            ttl_seconds: Lifetime of an entry
+            audit_rate: Fraction of hits that are recomputed to measure agreement
+        """
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.audit_rate = audit_rate
+        self._partitions: Dict[Hashable, _Partition] = {}
+        # entry id -> (partition key, text, value, expires_at), in LRU order
+        self._entries: "OrderedDict[int, Tuple[Hashable, str, Any, float]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, namespace: str, culture: str, text: str) -> Any:
+        """Stored result for the nearest similar input, or MISS"""
+        return self.lookup_many(namespace, culture, [text])[0]
+
+    def lookup_many(self, namespace: str, culture: str, texts: List[str]) -> List[Any]:
+        """Look up many inputs of one namespace and culture with one embedding call"""
+        if not texts:
+            return []
+        try:
+            vectors = self._embed(texts)
+        except Exception as e:
+            record_fallback("semantic_cache", e)
+            return [MISS] * len(texts)
+        results = []
+        with self._lock:
+            partition = self._partitions.get((namespace, culture))
+            now = time.time()
+            for vector in vectors:
+                entry_id, similarity = partition.nearest(vector) if partition else (None, 0.0)
+                if entry_id is None:
+                    SEMANTIC_LOOKUPS.inc(namespace=namespace, outcome="empty")
+                    self.misses += 1
+                    results.append(MISS)
+                    continue
+                _, _, value, expires_at = self._entries[entry_id]
+                if similarity >= self.threshold and expires_at > now:
+                    self._entries.move_to_end(entry_id)
+                    outcome = "hit"
+                    self.hits += 1
+                    results.append(value)
+                else:
+                    if expires_at <= now:
+                        self._evict(entry_id)
+                    outcome = "miss"
+                    self.misses += 1
+                    results.append(MISS)
+                SEMANTIC_LOOKUPS.inc(namespace=namespace, outcome=outcome)
+                NEIGHBOUR_SIMILARITY.observe(similarity, namespace=namespace, outcome=outcome)
+        return results
+
+    def store(self, namespace: str, culture: str, text: str, value: Any):
+        """Remember the result computed for an input"""
+        try:
+            vector = self._embed([text])[0]
+        except Exception as e:
+            record_fallback("semantic_cache", e)
+            return
+        with self._lock:
+            key = (namespace, culture)
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = self._partitions[key] = _Partition(len(vector))
+            entry_id = self._next_id
+            self._next_id += 1
+            partition.add(entry_id, vector)
+            self._entries[entry_id] = (key, text, value, time.time() + self.ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def get_or_compute(self, namespace: str, culture: str, text: str, compute: Callable[[], Any]) -> Any:
+        """
+        Reuse the result of a similar input, or compute and store a new one
+
+        Audited hits return (and store) the fresh result. If the embedding
+        model fails, every lookup misses and results are not stored.
+        """
+        cached = self.lookup(namespace, culture, text)
+        if cached is not MISS and (self.audit_rate <= 0 or random.random() >= self.audit_rate):
+            return cached
+
+        fresh = compute()
+        if cached is not MISS:
+            self.record_agreement(namespace, cached, fresh)
+        self.store(namespace, culture, text, fresh)
+        return fresh
+
+    def record_agreement(self, namespace: str, reused: Any, fresh: Any):
+        """Record how similar a reused result is to a freshly computed one"""
+        try:
+            vectors = self._embed([_as_text(reused), _as_text(fresh)])
+        except Exception as e:
+            record_fallback("semantic_cache", e)
+            return
+        HIT_AGREEMENT.observe(float(vectors[0] @ vectors[1]), namespace=namespace)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._partitions.clear()
+            self._entries.clear()
+
+    def _evict(self, entry_id: int):
+        key = self._entries.pop(entry_id)[0]
+        self._partitions[key].remove(entry_id)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if hasattr(self.embeddings, "embed_queries"):
+            matrix = np.asarray(self.embeddings.embed_queries(texts), dtype=np.float32)
+        else:
+            matrix = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def _as_text(value: Any) -> str:
+    """Text of a cached result (an adaptation string or a list of suggestions)"""
+    if isinstance(value, list):
+        return "\n".join(item.get("text", "") if isinstance(item, dict) else str(item) for item in value)
+    return str(value)
+
+
+_retry_load_at = 0.0
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """
+    The shared semantic cache, or None when disabled or unavailable
+
+    A failed load is retried after LOAD_RETRY_SECONDS, not on every call.
+    """
+    global _retry_load_at
+    if not settings.SEMANTIC_CACHE_ENABLED or time.monotonic() < _retry_load_at:
+        return None
+    try:
+        return registry.get("semantic_cache")
+    except Exception as e:
+        _retry_load_at = time.monotonic() + LOAD_RETRY_SECONDS
+        record_fallback("semantic_cache", e)
+        return None
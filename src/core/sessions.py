@@ -0,0 +1,205 @@
+"""
+Server-side conversation sessions with bounded, token-budgeted history
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)"""
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+def format_message(text: str) -> str:
+    """Prompt line of the message being answered"""
+    return f"User said: {text}"
+
+
+def _clip(text: str, max_words: int) -> str:
+    words = text.split()
+    return " ".join(words[:max_words]) + (" ..." if len(words) > max_words else "")
+
+
+class Session:
+    """Rolling summary plus the most recent turns of one conversation"""
+
+    def __init__(self, session_id: str, summary: str = "", turns: Optional[List[Dict]] = None,
+                 updated_at: Optional[float] = None):
+        self.session_id = session_id
+        self.summary = summary
+        self.turns: List[Dict] = turns or []
+        self.updated_at = updated_at or time.time()
+
+    def to_dict(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "summary": self.summary,
+            "turns": list(self.turns),
+            "updated_at": self.updated_at
+        }
+
+
+class SessionStore:
+    """
+    In-memory LRU of sessions with optional SQLite write-through
+
+    Each session keeps at most ``max_turns`` recent turns within
+    ``history_tokens``; older turns are folded into a rolling extractive
+    summary capped at ``summary_tokens``. The context handed to the LLM is
+    therefore bounded no matter how long the conversation runs.
+    """
+
+    def __init__(self, max_turns: int = 6, history_tokens: int = 600, summary_tokens: int = 200,
+                 max_sessions: int = 10000, ttl_seconds: float = 86400, path: Optional[str] = None):
+        """
+        Args:
+            max_turns: Recent turns kept verbatim
+            history_tokens: Token budget of the verbatim turns
+            summary_tokens: Token budget of the rolling summary
+            max_sessions: Sessions kept in memory (older ones stay on disk)
+            ttl_seconds: Idle time after which a session is forgotten
+            path: SQLite file for persistence (None keeps sessions in memory only)
+        """
+        self.max_turns = max_turns
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions ("
+                    "session_id TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+                    "turns TEXT NOT NULL, updated_at REAL NOT NULL)"
+                )
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """Return a live session, or None if it does not exist or expired"""
+        with self._lock:
+            return self._get_locked(session_id)
+
+    def add_turn(self, session_id: str, text: str, translation: str = "", speaker: str = "user") -> Session:
+        """
+        Append a turn, folding the oldest turns into the summary when over budget
+
+        Args:
+            session_id: Conversation identifier
+            text: What was said
+            translation: Its cultural adaptation, if any
+            speaker: Who said it
+
+        Returns:
+            The updated session
+        """
+        with self._lock:
+            session = self._get_locked(session_id) or Session(session_id)
+            session.turns.append({"speaker": speaker, "text": text, "translation": translation})
+
+            folded = []
+            while len(session.turns) > 1 and (
+                len(session.turns) > self.max_turns
+                or sum(estimate_tokens(self._format_turn(t)) for t in session.turns) > self.history_tokens
+            ):
+                folded.append(session.turns.pop(0))
+            if folded:
+                session.summary = self._fold(session.summary, folded)
+
+            session.updated_at = time.time()
+            self._remember(session)
+            self._persist(session)
+            return session
+
+    def context(self, session_id: Optional[str]) -> str:
+        """Bounded history of a session for an LLM prompt ("" if there is none)"""
+        if not session_id:
+            return ""
+        session = self.get(session_id)
+        if session is None:
+            return ""
+        parts = []
+        if session.summary:
+            parts.append(f"Earlier in the conversation: {session.summary}")
+        if session.turns:
+            parts.append("Recent turns:\n" + "\n".join(self._format_turn(t) for t in session.turns))
+        return "\n".join(parts)
+
+    def conversation_context(self, session_id: Optional[str], text: str) -> str:
+        """Prompt context for a new message: session history followed by the message"""
+        history = self.context(session_id)
+        current = format_message(text)
+        return f"{history}\n{current}" if history else current
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def stats(self) -> Dict[str, int]:
+        return {"active_sessions": len(self._sessions)}
+
+    def _get_locked(self, session_id: str) -> Optional[Session]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._load(session_id)
+            if session is None:
+                return None
+        if time.time() - session.updated_at > self.ttl_seconds:
+            self._sessions.pop(session_id, None)
+            return None
+        self._remember(session)
+        return session
+
+    def _remember(self, session: Session):
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def _load(self, session_id: str) -> Optional[Session]:
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT summary, turns, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return Session(session_id, row[0], json.loads(row[1]), row[2])
+
+    def _persist(self, session: Session):
+        if self._conn is None:
+            return
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, summary, turns, updated_at) VALUES (?, ?, ?, ?)",
+                (session.session_id, session.summary, json.dumps(session.turns, ensure_ascii=False),
+                 session.updated_at)
+            )
+
+    @staticmethod
+    def _format_turn(turn: Dict) -> str:
+        line = f"{turn['speaker'].capitalize()}: {turn['text']}"
+        if turn.get("translation"):
+            line += f" (adapted as: {turn['translation']})"
+        return line
+
+    def _fold(self, summary: str, turns: List[Dict]) -> str:
+        """Append clipped folded turns to the summary, dropping its oldest lines to fit"""
+        lines = [line for line in summary.split(" | ") if line] if summary else []
+        lines.extend(f"{t['speaker']}: {_clip(t['text'], 20)}" for t in turns)
+        while len(lines) > 1 and estimate_tokens(" | ".join(lines)) > self.summary_tokens:
+            lines.pop(0)
+        return " | ".join(lines)
@@ -0,0 +1,166 @@
+"""
+Incremental speech recognition over a live audio stream
+"""
+
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .audio import SAMPLE_RATE, frame_energy
+
+
+class StreamingTranscriber:
+    """
+    Turns a stream of audio frames into partial and final transcripts
+
+    Incoming samples are split into VAD frames. While the speaker talks,
+    the current utterance is re-decoded over a sliding window every
+    ``partial_interval`` seconds and emitted as a partial transcript. A
+    pause of ``min_silence_ms`` (or hitting ``max_utterance_seconds``)
+    finalises the utterance.
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[np.ndarray, Optional[str]], str],
+        sample_rate: int = SAMPLE_RATE,
+        partial_interval: float = 1.0,
+        window_seconds: float = 10.0,
+        max_utterance_seconds: float = 30.0,
+        min_silence_ms: int = 600,
+        frame_ms: int = 30,
+        energy_floor: float = 0.01
+    ):
+        """
+        Args:
+            transcribe: Function decoding (samples, prompt) to text
+            sample_rate: Sample rate of the incoming audio
+            partial_interval: Seconds of new speech between partial decodes
+            window_seconds: Length of the sliding window used for partials
+            max_utterance_seconds: Force-finalise utterances longer than this
+            min_silence_ms: Pause length that ends an utterance
+            frame_ms: VAD frame length
+            energy_floor: Minimum RMS energy counted as speech
+        """
+        self.transcribe = transcribe
+        self.sample_rate = sample_rate
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.partial_samples = int(partial_interval * sample_rate)
+        self.window_samples = int(window_seconds * sample_rate)
+        self.max_utterance_samples = int(max_utterance_seconds * sample_rate)
+        self.silence_frames_to_end = max(1, min_silence_ms // frame_ms)
+        self.preroll_frames = max(1, 300 // frame_ms)
+        self.energy_floor = energy_floor
+
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._utterance: List[np.ndarray] = []
+        self._utterance_samples = 0
+        self._preroll: List[np.ndarray] = []
+        self._in_speech = False
+        self._silent_frames = 0
+        self._since_partial = 0
+        self._noise = energy_floor
+        self._last_partial = ""
+        self._last_final: Optional[str] = None
+        self._stream_position = 0
+        self._utterance_start = 0
+        self.utterance_count = 0
+
+    def feed(self, samples: np.ndarray) -> List[Dict]:
+        """
+        Consume newly received samples
+
+        Args:
+            samples: Float32 mono samples at ``sample_rate``
+
+        Returns:
+            Events produced by this chunk: {"type": "partial", "text"} and
+            {"type": "final", "text", "start", "end", "utterance"}
+        """
+        events = []
+        audio = np.concatenate([self._pending, samples.astype(np.float32, copy=False)])
+        n_frames = len(audio) // self.frame_length
+        self._pending = audio[n_frames * self.frame_length:]
+        if n_frames == 0:
+            return events
+
+        frames = audio[: n_frames * self.frame_length].reshape(n_frames, self.frame_length)
+        energies = frame_energy(audio[: n_frames * self.frame_length], self.frame_length)
+
+        for frame, energy in zip(frames, energies):
+            self._stream_position += self.frame_length
+            is_speech = energy >= max(self.energy_floor, self._noise * 3)
+
+            if not self._in_speech:
+                if not is_speech:
+                    # Track background noise and keep a short pre-roll
+                    self._noise = 0.95 * self._noise + 0.05 * float(energy)
+                    self._preroll.append(frame)
+                    self._preroll = self._preroll[-self.preroll_frames:]
+                    continue
+                self._start_utterance()
+
+            self._utterance.append(frame)
+            self._utterance_samples += self.frame_length
+            self._since_partial += self.frame_length
+            self._silent_frames = 0 if is_speech else self._silent_frames + 1
+
+            if (self._silent_frames >= self.silence_frames_to_end
+                    or self._utterance_samples >= self.max_utterance_samples):
+                final = self._finalise()
+                if final:
+                    events.append(final)
+            elif self._since_partial >= self.partial_samples:
+                partial = self._partial()
+                if partial:
+                    events.append(partial)
+        return events
+
+    def flush(self) -> List[Dict]:
+        """Finalise whatever speech is still buffered (end of stream)"""
+        if self._in_speech:
+            final = self._finalise()
+            if final:
+                return [final]
+        return []
+
+    def _start_utterance(self):
+        self._in_speech = True
+        self._utterance = list(self._preroll)
+        self._utterance_samples = len(self._utterance) * self.frame_length
+        self._utterance_start = self._stream_position - self._utterance_samples - self.frame_length
+        self._preroll = []
+        self._silent_frames = 0
+        self._since_partial = 0
+        self._last_partial = ""
+
+    def _partial(self) -> Optional[Dict]:
+        self._since_partial = 0
+        window = np.concatenate(self._utterance)[-self.window_samples:]
+        text = self.transcribe(window, self._last_final).strip()
+        if not text or text == self._last_partial:
+            return None
+        self._last_partial = text
+        return {"type": "partial", "text": text, "utterance": self.utterance_count + 1}
+
+    def _finalise(self) -> Optional[Dict]:
+        audio = np.concatenate(self._utterance)
+        start = max(0, self._utterance_start)
+        self._in_speech = False
+        self._utterance = []
+        self._utterance_samples = 0
+        self._silent_frames = 0
+        self._since_partial = 0
+
+        text = self.transcribe(audio, self._last_final).strip()
+        if not text:
+            return None
+        self.utterance_count += 1
+        self._last_final = text
+        return {
+            "type": "final",
+            "text": text,
+            "utterance": self.utterance_count,
+            "start": start / self.sample_rate,
+            "end": self._stream_position / self.sample_rate
+        }
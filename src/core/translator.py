@@ -2,18 +2,96 @@
 Cultural-aware translation module
 """
 
-from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
 from googletrans import Translator
-from typing import Dict, Any
-import openai
+from typing import Dict, Any, Iterator, List, Optional
+import re
+import threading
+import httpx
 from config.settings import settings
+from .batching import MicroBatcher
+from .cache import MISS, make_key
+from .llm import chat_completion, stream_chat_completion
+from .local_adaptation import ADAPTATION_ROUTES, Assessment, assess
+from .metrics import record_fallback, span
+from .model_registry import registry
+from .semantic_cache import get_semantic_cache
+from .scheduler import UpstreamScheduler
+from .upstream import Upstream, get_upstream, pooled_http_client, register_upstream
+
+# Bump when the adaptation prompt changes so cached adaptations are not reused
+ADAPTATION_PROMPT_VERSION = "1"
+
+_NUMBERED_LINE = re.compile(r"^\s*(\d+)\s*[.):]\s*(.*)$")
+
+def _semantic_source(source_text: Optional[str], source_lang: str) -> Optional[str]:
+    """
+    Text the semantic cache matches an adaptation on: the input the request
+    is about, when the embedding model handles its language; None skips it
+    """
+    return source_text if source_lang in settings.SEMANTIC_CACHE_LANGUAGES else None
+
+def _semantic_namespace() -> str:
+    """Semantic cache namespace of adaptations from the current model and prompt"""
+    return f"adaptation:{settings.LLM_MODEL}:{ADAPTATION_PROMPT_VERSION}"
+
+class AdaptationParseError(ValueError):
+    """Raised when a packed adaptation reply cannot be mapped back to its inputs"""
+
+# googletrans takes no per-call timeout; its pooled client's timeout bounds
+# each attempt and the upstream deadline bounds how long callers wait
+register_upstream(Upstream(
+    "google_translate",
+    timeout=settings.TRANSLATE_TIMEOUT_SECONDS,
+    max_retries=settings.UPSTREAM_MAX_RETRIES,
+    retry_base_delay=settings.UPSTREAM_RETRY_BASE_DELAY,
+    hedge_after=settings.TRANSLATE_HEDGE_AFTER_MS / 1000.0 if settings.TRANSLATE_HEDGE_AFTER_MS > 0 else None,
+    retry_on=(httpx.TransportError, TimeoutError, ConnectionError),
+    timeout_kwarg=None,
+    scheduler=UpstreamScheduler(
+        "google_translate",
+        requests_per_minute=settings.TRANSLATE_REQUESTS_PER_MINUTE,
+        max_concurrency=settings.TRANSLATE_MAX_CONCURRENCY
+    )
+))
 
 class CulturalTranslator:
-    def __init__(self):
+    def __init__(self, backend: str = None, adaptation_mode: str = None):
+        self.backend = backend or settings.TRANSLATION_BACKEND
+        self.adaptation_mode = adaptation_mode or settings.ADAPTATION_MODE
         self.google_translator = Translator()
-        self.m2m_model = M2M100ForConditionalGeneration.from_pretrained(settings.TRANSLATION_MODEL)
-        self.m2m_tokenizer = M2M100Tokenizer.from_pretrained(settings.TRANSLATION_MODEL)
-        openai.api_key = settings.OPENAI_API_KEY
+        self._use_pooled_client(self.google_translator)
+        self._adaptation_batcher = None
+        self._batcher_lock = threading.Lock()
+    
+    @staticmethod
+    def _use_pooled_client(translator):
+        """Swap googletrans' default client for a bounded keep-alive pool"""
+        client = getattr(translator, "client", None)
+        if isinstance(client, httpx.Client):
+            translator.client = pooled_http_client(
+                settings.TRANSLATE_TIMEOUT_SECONDS, headers=client.headers
+            )
+            client.close()
+    
+    @property
+    def cache(self):
+        """Shared translation/adaptation cache"""
+        return registry.get("cache")
+    
+    @property
+    def m2m_model(self):
+        """Shared M2M100 model, loaded on first use"""
+        return registry.get("m2m100_model")
+    
+    @property
+    def m2m_tokenizer(self):
+        """Shared M2M100 tokenizer, loaded on first use"""
+        return registry.get("m2m100_tokenizer")
+    
+    @property
+    def m2m_engine(self):
+        """Shared micro-batching M2M100 engine, loaded on first use"""
+        return registry.get("m2m100_engine")
     
     def translate_with_culture(self, text: str, source_lang: str, target_culture: str) -> Dict[str, Any]:
         """
@@ -33,32 +111,465 @@ class CulturalTranslator:
         # Basic translation
         basic_translation = self._translate_text(text, source_lang, target_lang)
         
-        # Cultural adaptation
-        cultural_adaptation = self._adapt_culturally(
-            basic_translation, target_culture, culture_info
-        )
+        # Cultural adaptation, skipping the LLM when the local tier is confident
+        assessment = self._assess(text, basic_translation, source_lang, target_lang, target_culture, culture_info)
+        if assessment.local:
+            cultural_adaptation = basic_translation
+        else:
+            cultural_adaptation = self._adapt_culturally(
+                basic_translation, target_culture, culture_info, text, source_lang
+            )
         
         return {
             "basic_translation": basic_translation,
             "cultural_adaptation": cultural_adaptation,
             "culture_notes": self._get_culture_notes(target_culture),
-            "confidence": 0.85  # Placeholder
+            "confidence": self._confidence(assessment)
+        }
+    
+    def translate_batch(self, texts: List[str], source_lang: str, target_culture: str) -> List[Dict[str, Any]]:
+        """
+        Translate many texts for one source language and target culture
+        
+        Culture lookups are shared across the batch and, with the M2M100
+        backend, uncached texts are translated in length-sorted batches.
+        
+        Args:
+            texts: Input texts
+            source_lang: Source language code
+            target_culture: Target culture key
+        
+        Returns:
+            One translate_with_culture-style dictionary per input text
+        """
+        culture_info = settings.SUPPORTED_CULTURES.get(target_culture, {})
+        target_lang = culture_info.get("language", "en")
+        culture_notes = self._get_culture_notes(target_culture)
+        
+        basic_translations = self._translate_texts(texts, source_lang, target_lang)
+        assessments = [
+            self._assess(text, basic, source_lang, target_lang, target_culture, culture_info)
+            for text, basic in zip(texts, basic_translations)
+        ]
+        
+        # Only texts the local tier is unsure about go to the LLM
+        adaptations = list(basic_translations)
+        escalated = [i for i, assessment in enumerate(assessments) if not assessment.local]
+        if escalated and self.adaptation_mode == "batched":
+            adapted = self._adapt_culturally_batch(
+                [basic_translations[i] for i in escalated], target_culture, culture_info,
+                [texts[i] for i in escalated], source_lang
+            )
+            for i, adaptation in zip(escalated, adapted):
+                adaptations[i] = adaptation
+        else:
+            for i in escalated:
+                adaptations[i] = self._adapt_culturally(
+                    basic_translations[i], target_culture, culture_info, texts[i], source_lang
+                )
+        
+        return [
+            {
+                "basic_translation": basic,
+                "cultural_adaptation": adaptation,
+                "culture_notes": culture_notes,
+                "confidence": self._confidence(assessment)
+            }
+            for basic, adaptation, assessment in zip(basic_translations, adaptations, assessments)
+        ]
+    
+    def stream_with_culture(self, text: str, source_lang: str, target_culture: str) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of translate_with_culture
+        
+        Args:
+            text: Input text to translate
+            source_lang: Source language code
+            target_culture: Target culture key
+        
+        Yields:
+            A "translation" event with the basic translation and culture notes,
+            then "adaptation_delta" events with LLM tokens (none when the
+            local tier answers), and finally an "adaptation" event with the
+            complete cultural adaptation and its confidence
+        """
+        culture_info = settings.SUPPORTED_CULTURES.get(target_culture, {})
+        target_lang = culture_info.get("language", "en")
+        
+        basic_translation = self._translate_text(text, source_lang, target_lang)
+        yield {
+            "type": "translation",
+            "basic_translation": basic_translation,
+            "culture_notes": self._get_culture_notes(target_culture)
+        }
+        
+        assessment = self._assess(text, basic_translation, source_lang, target_lang, target_culture, culture_info)
+        if assessment.local:
+            adaptation = basic_translation
+        else:
+            parts = []
+            for delta in self.stream_adaptation(basic_translation, target_culture, culture_info, text, source_lang):
+                parts.append(delta)
+                yield {"type": "adaptation_delta", "delta": delta}
+            adaptation = "".join(parts).strip()
+        
+        yield {
+            "type": "adaptation",
+            "cultural_adaptation": adaptation,
+            "confidence": self._confidence(assessment)
         }
     
+    def stream_adaptation(self, text: str, culture: str, culture_info: Dict,
+                          source_text: str = None, source_lang: str = "") -> Iterator[str]:
+        """
+        Stream the cultural adaptation token by token
+        
+        Cache hits are yielded in one piece; a completed stream is cached.
+        Falls back to the input text if the LLM fails before producing output.
+        ``source_text`` (in ``source_lang``) is what near-duplicates are
+        matched on.
+        """
+        key = make_key(
+            "adaptation", text, target_culture=culture,
+            model=settings.LLM_MODEL, prompt_version=ADAPTATION_PROMPT_VERSION
+        )
+        cached = self.cache.get(key)
+        if cached is not MISS:
+            yield cached
+            return
+        semantic_text = _semantic_source(source_text, source_lang)
+        semantic = get_semantic_cache() if semantic_text is not None else None
+        if semantic is not None:
+            similar = semantic.lookup(_semantic_namespace(), culture, semantic_text)
+            if similar is not MISS:
+                yield similar
+                return
+        
+        parts = []
+        try:
+            prompt = self._build_adaptation_prompt(text, culture, culture_info)
+            for delta in stream_chat_completion(prompt, max_tokens=150, stage="adaptation"):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            record_fallback("adaptation", e)
+            if not parts:
+                yield text  # Fallback
+            return
+        
+        adaptation = "".join(parts).strip()
+        if adaptation:
+            self.cache.set(key, adaptation)
+            if semantic is not None:
+                semantic.store(_semantic_namespace(), culture, semantic_text, adaptation)
+    
+    def _assess(self, text: str, translation: str, source_lang: str, target_lang: str,
+                culture: str, culture_info: Dict) -> Assessment:
+        """Local confidence for using the basic translation as the adaptation"""
+        try:
+            with span("local_adaptation"):
+                assessment = assess(text, translation, source_lang, target_lang, culture_info)
+                if (assessment.local and "formulaic" not in assessment.signals
+                        and settings.LOCAL_ADAPTATION_CROSS_CHECK):
+                    second = self._second_translation(text, source_lang, target_lang)
+                    if second is not None:
+                        assessment = assess(text, translation, source_lang, target_lang, culture_info, second)
+        except Exception as e:
+            record_fallback("local_adaptation", e)
+            assessment = Assessment(0.0, 0.0, False, {})
+        
+        if not settings.LOCAL_ADAPTATION_ENABLED:
+            assessment = assessment._replace(local=False)
+        ADAPTATION_ROUTES.inc(culture=culture, tier="local" if assessment.local else "llm")
+        return assessment
+    
+    @staticmethod
+    def _confidence(assessment: Assessment) -> float:
+        """
+        Reported confidence of a result
+        
+        A local result is as good as its assessment; an LLM adaptation
+        takes care of tone, leaving the confidence in the basic translation.
+        """
+        value = assessment.confidence if assessment.local else assessment.translation_confidence
+        return round(value, 3)
+    
+    def _second_translation(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """
+        The text translated by the other backend (cached), or None
+        
+        M2M100 is only consulted when it is already loaded; it is not
+        worth loading the model for a cross-check.
+        """
+        try:
+            if self.backend == "m2m100":
+                # Pairs M2M100 cannot translate already came from Google
+                if not self.m2m_engine.supports(source_lang, target_lang):
+                    return None
+                other = "google"
+                compute = lambda: self._google_translate(text, source_lang, target_lang)
+            else:
+                if not registry.is_loaded("m2m100_engine"):
+                    return None
+                engine = self.m2m_engine
+                if not engine.supports(source_lang, target_lang):
+                    return None
+                other = "m2m100"
+                compute = lambda: engine.translate(text, source_lang, target_lang)
+            key = make_key("translation", text, source_lang, target_lang, other)
+            return self.cache.get_or_compute(key, compute)
+        except Exception as e:
+            record_fallback("cross_check_translation", e)
+            return None
+    
     def _translate_text(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Basic translation using the configured backend (cached)"""
+        try:
+            key = make_key("translation", text, source_lang, target_lang, self.backend)
+            return self.cache.get_or_compute(
+                key, lambda: self._request_translation(text, source_lang, target_lang)
+            )
+        except Exception as e:
+            record_fallback("translation", e)
+            return text  # Fallback
+    
+    def _translate_texts(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """Basic translation of many texts, batching cache misses on M2M100"""
+        if self.backend == "m2m100":
+            try:
+                engine = self.m2m_engine
+                supported = engine.supports(source_lang, target_lang)
+            except Exception as e:
+                record_fallback("m2m100_load", e)
+                supported = False
+            
+            if supported:
+                keys = [make_key("translation", t, source_lang, target_lang, self.backend) for t in texts]
+                results = [self.cache.get(key) for key in keys]
+                missing = [i for i, result in enumerate(results) if result is MISS]
+                if missing:
+                    try:
+                        with span("translation"):
+                            translated = engine.translate_batch([texts[i] for i in missing], source_lang, target_lang)
+                    except Exception as e:
+                        record_fallback("translation", e)
+                        translated = None
+                    for pos, i in enumerate(missing):
+                        if translated is None:
+                            results[i] = texts[i]  # Fallback
+                        else:
+                            results[i] = translated[pos]
+                            self.cache.set(keys[i], translated[pos])
+                return results
+        
+        return [self._translate_text(text, source_lang, target_lang) for text in texts]
+    
+    def _request_translation(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Translate without caching or fallback; raises on failure"""
+        if self.backend == "m2m100":
+            engine = self.m2m_engine
+            # M2M100 cannot detect languages (source_lang="auto"), use Google for those
+            if engine.supports(source_lang, target_lang):
+                with span("translation"):
+                    return engine.translate(text, source_lang, target_lang)
+        with span("translation"):
+            return self._google_translate(text, source_lang, target_lang)
+    
+    def _google_translate(self, text: str, source_lang: str, target_lang: str) -> str:
         """Basic translation using Google Translate"""
+        result = get_upstream("google_translate").call(
+            self.google_translator.translate, text, src=source_lang, dest=target_lang
+        )
+        return result.text
+    
+    def _adapt_culturally(self, text: str, culture: str, culture_info: Dict,
+                          source_text: str = None, source_lang: str = "") -> str:
+        """
+        Adapt translation based on cultural context using LLM (cached)
+        
+        Near-duplicates are matched on ``source_text``, the input in
+        ``source_lang``, not on the translation.
+        """
+        if self.adaptation_mode == "batched":
+            # Coalesce with concurrent requests for the same culture
+            compute = lambda: self._coalesced_adaptation(text, culture)
+        else:
+            compute = lambda: self._request_adaptation(text, culture, culture_info)
+        semantic_text = _semantic_source(source_text, source_lang)
+        semantic = get_semantic_cache() if semantic_text is not None else None
+        if semantic is not None:
+            # Exact cache first, then near-duplicates, then the LLM
+            request = compute
+            compute = lambda: semantic.get_or_compute(_semantic_namespace(), culture, semantic_text, request)
         try:
-            result = self.google_translator.translate(text, src=source_lang, dest=target_lang)
-            return result.text
-        except:
+            key = make_key(
+                "adaptation", text, target_culture=culture,
+                model=settings.LLM_MODEL, prompt_version=ADAPTATION_PROMPT_VERSION
+            )
+            return self.cache.get_or_compute(key, compute)
+        except Exception as e:
+            record_fallback("adaptation", e)
             return text  # Fallback
     
-    def _adapt_culturally(self, text: str, culture: str, culture_info: Dict) -> str:
-        """Adapt translation based on cultural context using LLM"""
+    def _adapt_culturally_batch(self, texts: List[str], culture: str, culture_info: Dict,
+                                source_texts: List[str] = None, source_lang: str = "") -> List[str]:
+        """Adapt many texts for one culture with packed LLM prompts (cached; see _adapt_culturally)"""
+        keys = [
+            make_key("adaptation", text, target_culture=culture,
+                     model=settings.LLM_MODEL, prompt_version=ADAPTATION_PROMPT_VERSION)
+            for text in texts
+        ]
+        results = [self.cache.get(key) for key in keys]
+        
+        # Each distinct uncached text is sent once
+        pending = {}
+        sources = {}
+        for i, result in enumerate(results):
+            if result is MISS:
+                pending.setdefault(keys[i], texts[i])
+                if source_texts is not None:
+                    sources.setdefault(keys[i], _semantic_source(source_texts[i], source_lang))
+        
+        # Near-duplicates of earlier inputs reuse their adaptation
+        resolved = {}
+        semantic = get_semantic_cache() if any(sources.values()) else None
+        if pending and semantic is not None:
+            matched = [key for key in pending if sources.get(key) is not None]
+            similar = semantic.lookup_many(_semantic_namespace(), culture, [sources[key] for key in matched])
+            for key, adaptation in zip(matched, similar):
+                if adaptation is not MISS:
+                    self.cache.set(key, adaptation)
+                    resolved[key] = adaptation
+                    del pending[key]
+        
+        if pending:
+            pending_keys = list(pending)
+            try:
+                adapted = self._request_adaptations(list(pending.values()), culture, culture_info)
+            except Exception as e:
+                record_fallback("adaptation", e)
+                adapted = [None] * len(pending_keys)
+            for key, adaptation in zip(pending_keys, adapted):
+                if adaptation is not None:
+                    self.cache.set(key, adaptation)
+                    if semantic is not None and sources.get(key) is not None:
+                        semantic.store(_semantic_namespace(), culture, sources[key], adaptation)
+                    resolved[key] = adaptation
+        
+        for i, result in enumerate(results):
+            if result is MISS:
+                results[i] = resolved.get(keys[i], texts[i])  # Fallback
+        
+        return results
+    
+    def _coalesced_adaptation(self, text: str, culture: str) -> str:
+        adaptation = self._get_adaptation_batcher().run(culture, text)
+        if adaptation is None:
+            raise RuntimeError("Adaptation failed")
+        return adaptation
+    
+    def _get_adaptation_batcher(self) -> MicroBatcher:
+        """Batcher packing concurrent single adaptations per culture"""
+        if self._adaptation_batcher is None:
+            with self._batcher_lock:
+                if self._adaptation_batcher is None:
+                    self._adaptation_batcher = MicroBatcher(
+                        lambda culture, texts: self._request_adaptations(
+                            texts, culture, settings.SUPPORTED_CULTURES.get(culture, {})
+                        ),
+                        max_batch_size=settings.ADAPTATION_BATCH_SIZE,
+                        max_wait_ms=settings.ADAPTATION_BATCH_WAIT_MS,
+                        name="adaptation-batcher",
+                        concurrency=settings.ADAPTATION_BATCH_CONCURRENCY
+                    )
+        return self._adaptation_batcher
+    
+    def _request_adaptations(self, texts: List[str], culture: str, culture_info: Dict) -> List[Optional[str]]:
+        """
+        Adapt texts with as few LLM calls as possible
+        
+        Texts are packed ADAPTATION_BATCH_SIZE at a time into one numbered
+        prompt. If a reply cannot be parsed, the batch is split in half and
+        each half retried; single texts use the regular prompt.
+        
+        Returns:
+            Adaptations in input order; None where a single text failed
+        """
+        size = settings.ADAPTATION_BATCH_SIZE
+        if len(texts) > size:
+            results = []
+            for start in range(0, len(texts), size):
+                results.extend(self._request_adaptations(texts[start:start + size], culture, culture_info))
+            return results
+        
+        if len(texts) == 1:
+            try:
+                return [self._request_adaptation(texts[0], culture, culture_info)]
+            except Exception as e:
+                record_fallback("adaptation", e)
+                return [None]
+        
+        try:
+            return self._request_packed_adaptation(texts, culture, culture_info)
+        except AdaptationParseError as e:
+            record_fallback("adaptation_parse", e)
+            middle = len(texts) // 2
+            return (self._request_adaptations(texts[:middle], culture, culture_info)
+                    + self._request_adaptations(texts[middle:], culture, culture_info))
+    
+    def _build_packed_adaptation_prompt(self, texts: List[str], culture: str, culture_info: Dict) -> str:
+        """Build one prompt adapting several numbered texts"""
         politeness = culture_info.get("politeness", "medium")
         directness = culture_info.get("directness", "medium")
+        numbered = "\n".join(
+            f"{i}. {' '.join(text.split())}" for i, text in enumerate(texts, 1)
+        )
+        
+        return f"""
+        Adapt each of the following {len(texts)} texts for {culture} culture.
+        
+        Cultural guidelines:
+        - Politeness level: {politeness}
+        - Directness level: {directness}
+        
+        Texts:
+        {numbered}
         
-        prompt = f"""
+        Reply with exactly {len(texts)} lines, one per text and in the same order,
+        each formatted as "<number>. <culturally appropriate version>".
+        Do not add any other text.
+        """
+    
+    def _request_packed_adaptation(self, texts: List[str], culture: str, culture_info: Dict) -> List[str]:
+        """Call the LLM once for several adaptations; raises on failure"""
+        prompt = self._build_packed_adaptation_prompt(texts, culture, culture_info)
+        reply = chat_completion(prompt, max_tokens=150 * len(texts), stage="adaptation")
+        return self._parse_packed_adaptations(reply, len(texts))
+    
+    @staticmethod
+    def _parse_packed_adaptations(llm_output: str, expected: int) -> List[str]:
+        """Map a numbered reply back to its inputs; raises AdaptationParseError"""
+        adaptations = {}
+        for line in llm_output.splitlines():
+            match = _NUMBERED_LINE.match(line)
+            if not match:
+                continue
+            number, text = int(match.group(1)), match.group(2).strip().strip('"').strip()
+            if 1 <= number <= expected and text and number not in adaptations:
+                adaptations[number] = text
+        
+        if len(adaptations) != expected:
+            raise AdaptationParseError(
+                f"Expected {expected} numbered adaptations, got {len(adaptations)}"
+            )
+        return [adaptations[i] for i in range(1, expected + 1)]
+    
+    def _build_adaptation_prompt(self, text: str, culture: str, culture_info: Dict) -> str:
+        """Build the prompt for cultural adaptation"""
+        politeness = culture_info.get("politeness", "medium")
+        directness = culture_info.get("directness", "medium")
+        
+        return f"""
         Adapt the following text for {culture} culture:
         Original: "{text}"
         
@@ -68,16 +579,11 @@ class CulturalTranslator:
         
         Provide a culturally appropriate version:
         """
-        
-        try:
-            response = openai.ChatCompletion.create(
-                model=settings.LLM_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=150
-            )
-            return response.choices[0].message.content.strip()
-        except:
-            return text  # Fallback
+    
+    def _request_adaptation(self, text: str, culture: str, culture_info: Dict) -> str:
+        """Call the LLM for one adaptation; raises on failure"""
+        prompt = self._build_adaptation_prompt(text, culture, culture_info)
+        return chat_completion(prompt, max_tokens=150, stage="adaptation").strip()
     
     def _get_culture_notes(self, culture: str) -> str:
         """Get cultural notes for the target culture"""
@@ -0,0 +1,319 @@
+"""
+Resilient calls to remote services: admission control, deadlines, retries,
+hedging, circuit breaking
+"""
+
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from config.settings import settings
+from .metrics import metrics
+from .scheduler import BATCH, UpstreamScheduler, current_priority, retry_after
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+UPSTREAM_CALLS = metrics.counter(
+    "cultitrans_upstream_calls_total", "Outbound calls by upstream and outcome", ["upstream", "outcome"]
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the upstream while its circuit is open"""
+
+
+class UpstreamTimeout(TimeoutError):
+    """Raised when a call does not finish within its deadline"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately for ``reset_timeout`` seconds. Then one probe
+    call is let through: success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may be made now (claims the probe when half-open)"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def release_probe(self):
+        """Give back a probe claimed by allow() for a call that was never made"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class Upstream:
+    """
+    Wraps calls to one remote service
+
+    Every call gets an overall deadline. Transient errors (``retry_on``)
+    are retried with full-jitter exponential backoff while time remains,
+    errors about the request itself (``rejected_on``) are raised as is,
+    and a slow attempt can be hedged with a second identical request after
+    ``hedge_after`` seconds. Failures feed a circuit breaker, so while the
+    service is unhealthy callers go straight to their local fallback. With
+    a scheduler, each call first waits for admission by priority and budget.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 10.0,
+        max_retries: int = 2,
+        retry_base_delay: float = 0.2,
+        retry_max_delay: float = 2.0,
+        hedge_after: Optional[float] = None,
+        retry_on: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError),
+        timeout_kwarg: Optional[str] = "timeout",
+        breaker: Optional[CircuitBreaker] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        scheduler: Optional[UpstreamScheduler] = None,
+        throttle_on: Tuple[Type[BaseException], ...] = (),
+        rejected_on: Tuple[Type[BaseException], ...] = ()
+    ):
+        """
+        Args:
+            name: Upstream name used in errors and metrics
+            timeout: Default deadline per call in seconds, retries included
+            max_retries: Retries after the first attempt
+            retry_base_delay: First backoff ceiling in seconds
+            retry_max_delay: Maximum backoff ceiling in seconds
+            hedge_after: Seconds before a duplicate request is sent (None disables)
+            retry_on: Exception types treated as transient upstream failures
+            timeout_kwarg: Keyword the remaining time is passed to the callable
+                under (None if it does not take a timeout)
+            breaker: Circuit breaker (a new one by default)
+            executor: Pool running attempts (shared upstream pool by default)
+            scheduler: Admission control for this upstream (None admits every call)
+            throttle_on: Exception types meaning the upstream is rate limiting us
+            rejected_on: Exception types meaning the upstream is healthy but refused
+                this request; any other error counts against the circuit
+        """
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.hedge_after = hedge_after
+        self.retry_on = tuple(retry_on) + (UpstreamTimeout,)
+        self.timeout_kwarg = timeout_kwarg
+        self.breaker = breaker or CircuitBreaker(
+            settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_SECONDS
+        )
+        self._executor = executor
+        self.scheduler = scheduler
+        self.throttle_on = tuple(throttle_on)
+        self.rejected_on = tuple(rejected_on)
+
+    def call(self, func: Callable[..., Any], *args, deadline: Optional[float] = None,
+             optional: bool = False, cost_tokens: int = 0, **kwargs) -> Any:
+        """
+        Call ``func`` under this upstream's admission, deadline, retry and breaker policy
+
+        Args:
+            func: Blocking call to the remote service
+            deadline: Seconds allowed for the whole call (default: ``timeout``);
+                batch work's deadline starts once it is admitted
+            optional: The caller has a fallback and the call may be shed under load
+            cost_tokens: Tokens charged against the scheduler's token budget
+            *args, **kwargs: Arguments forwarded to func
+
+        Returns:
+            The first successful result
+
+        Raises:
+            CircuitOpenError: The circuit is open; the upstream was not called
+            UpstreamOverloaded: The call was shed or not admitted in time
+            UpstreamTimeout: No attempt finished within the deadline
+            Exception: The last transient error, or any non-transient error
+        """
+        if not self.breaker.allow():
+            UPSTREAM_CALLS.inc(upstream=self.name, outcome="short_circuited")
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        deadline = deadline or self.timeout
+        started = time.monotonic()
+        if self.scheduler is None:
+            return self._call(func, args, kwargs, started + deadline)
+
+        priority = current_priority(optional)
+        try:
+            admission = self.scheduler.admit(priority, cost_tokens, timeout=deadline)
+        except BaseException:
+            # A shed half-open probe must not leave the circuit waiting for its outcome
+            self.breaker.release_probe()
+            raise
+        with admission:
+            if priority >= BATCH:
+                started = time.monotonic()
+            return self._call(func, args, kwargs, started + deadline)
+
+    def _call(self, func, args, kwargs, expires: float) -> Any:
+        """Attempts with retries until one succeeds or the deadline passes"""
+        retries = 0
+        while True:
+            try:
+                result = self._attempt(func, args, kwargs, expires)
+            except self.retry_on as e:
+                if self.scheduler is not None and isinstance(e, self.throttle_on):
+                    self.scheduler.throttle(retry_after(e))
+                remaining = expires - time.monotonic()
+                delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** retries))
+                if retries >= self.max_retries or delay >= remaining:
+                    self.breaker.record_failure()
+                    UPSTREAM_CALLS.inc(upstream=self.name, outcome="failed")
+                    raise
+                retries += 1
+                UPSTREAM_CALLS.inc(upstream=self.name, outcome="retried")
+                time.sleep(delay)
+                continue
+            except self.rejected_on:
+                # The upstream answered; the error is about this request
+                self.breaker.record_success()
+                UPSTREAM_CALLS.inc(upstream=self.name, outcome="rejected")
+                raise
+            except Exception:
+                # Not worth retrying, but e.g. a blocked or changed scraping
+                # endpoint fails every call the same way
+                self.breaker.record_failure()
+                UPSTREAM_CALLS.inc(upstream=self.name, outcome="failed")
+                raise
+            self.breaker.record_success()
+            UPSTREAM_CALLS.inc(upstream=self.name, outcome="ok")
+            return result
+
+    def _submit(self, func, args, kwargs, expires: float) -> Future:
+        if self.timeout_kwarg:
+            kwargs = {**kwargs, self.timeout_kwarg: max(0.001, expires - time.monotonic())}
+        context = contextvars.copy_context()
+        return (self._executor or get_upstream_executor()).submit(context.run, func, *args, **kwargs)
+
+    def _attempt(self, func, args, kwargs, expires: float) -> Any:
+        """One attempt, optionally hedged, bounded by the deadline"""
+        futures = [self._submit(func, args, kwargs, expires)]
+        remaining = expires - time.monotonic()
+
+        if self.hedge_after is not None and self.hedge_after < remaining:
+            done, _ = wait(futures, timeout=self.hedge_after)
+            if not done:
+                UPSTREAM_CALLS.inc(upstream=self.name, outcome="hedged")
+                futures.append(self._submit(func, args, kwargs, expires))
+
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, expires - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending:
+            raise error
+        raise UpstreamTimeout(f"{self.name} did not respond within the deadline")
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_upstreams: Dict[str, Upstream] = {}
+_lock = threading.Lock()
+
+
+def get_upstream_executor() -> ThreadPoolExecutor:
+    """Pool running outbound attempts, so callers can stop waiting at their deadline"""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.UPSTREAM_MAX_CONCURRENCY,
+                    thread_name_prefix="cultitrans-upstream"
+                )
+    return _executor
+
+
+def register_upstream(upstream: Upstream) -> Upstream:
+    """Install (or replace) a named upstream"""
+    with _lock:
+        _upstreams[upstream.name] = upstream
+    return upstream
+
+
+def get_upstream(name: str) -> Upstream:
+    """Return a registered upstream"""
+    return _upstreams[name]
+
+
+def pooled_http_client(timeout: float, **kwargs):
+    """
+    Keep-alive httpx client with bounded connection pool and timeouts
+
+    Args:
+        timeout: Read/write/pool timeout in seconds
+        **kwargs: Extra httpx.Client arguments (e.g. headers)
+    """
+    import httpx
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE
+        ),
+        timeout=httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT),
+        **kwargs
+    )
+
+
+def upstream_states() -> Dict[str, str]:
+    """Circuit state of every registered upstream"""
+    return {name: upstream.breaker.state for name, upstream in _upstreams.items()}
+
+
+def upstream_queue_depths() -> Dict[str, int]:
+    """Waiting and in-flight calls of every scheduled upstream, keyed by upstream/priority"""
+    return {
+        f"{name}/{priority}": depth
+        for name, upstream in _upstreams.items() if upstream.scheduler is not None
+        for priority, depth in upstream.scheduler.queue_depth().items()
+    }
@@ -0,0 +1,83 @@
+"""
+In-memory per-culture vector index for cultural context retrieval
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+class CultureVectorIndex:
+    """
+    Dense top-k search over one normalised NumPy matrix per culture
+
+    Scores are cosine similarities computed with a single matrix product;
+    the top k rows are selected with ``argpartition``, so a query costs
+    one BLAS call instead of a round trip through the vector store.
+    """
+
+    def __init__(self):
+        self._matrices: Dict[str, np.ndarray] = {}
+        self._documents: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_collection(cls, collection) -> "CultureVectorIndex":
+        """Build the index from the vectors already stored in a Chroma collection"""
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        index = cls()
+        index.build(data["embeddings"], data["documents"], data["metadatas"])
+        return index
+
+    def build(self, embeddings: Sequence, documents: Sequence[str], metadatas: Sequence[Dict]):
+        """Replace the index contents, grouping rows by their "culture" metadata"""
+        grouped: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            grouped.setdefault((metadata or {}).get("culture"), []).append(i)
+
+        matrix = np.asarray(embeddings, dtype=np.float32) if len(documents) else None
+        self._matrices = {}
+        self._documents = {}
+        for culture, rows in grouped.items():
+            vectors = matrix[rows]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            self._matrices[culture] = vectors / np.maximum(norms, 1e-12)
+            self._documents[culture] = [documents[i] for i in rows]
+
+    def __len__(self) -> int:
+        return sum(len(docs) for docs in self._documents.values())
+
+    def search(self, query_vector: Sequence[float], culture: str, k: int = 3) -> List[str]:
+        """Top-k documents of one culture for one query vector"""
+        query = np.asarray(query_vector, dtype=np.float32)[None, :]
+        return self.search_batch(query, culture, k)[0]
+
+    def search_batch(self, query_matrix: np.ndarray, culture: str, k: int = 3) -> List[List[str]]:
+        """
+        Top-k documents of one culture for many queries at once
+
+        Args:
+            query_matrix: One query embedding per row
+            culture: Culture whose documents are searched
+            k: Number of documents per query
+
+        Returns:
+            Document texts per query, best match first
+        """
+        matrix = self._matrices.get(culture)
+        if matrix is None or k <= 0:
+            return [[] for _ in range(len(query_matrix))]
+
+        queries = np.asarray(query_matrix, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores = queries @ matrix.T
+
+        k = min(k, matrix.shape[0])
+        if k < matrix.shape[0]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(matrix.shape[0]), (len(queries), 1))
+        order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+        top = np.take_along_axis(top, order, axis=1)
+
+        documents = self._documents[culture]
+        return [[documents[i] for i in row] for row in top]
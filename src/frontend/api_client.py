@@ -0,0 +1,161 @@
+"""
+Thin HTTP client of the CultiTrans API for the Streamlit frontend
+
+One pooled ``httpx.AsyncClient`` runs on a private event loop thread, so
+the client can be cached once per Streamlit process and shared by every
+session and rerun; the script thread just consumes results.
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from config.settings import settings
+
+_DONE = object()
+
+
+class APIError(RuntimeError):
+    """The API answered with an error or could not be reached"""
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """Stage durations in milliseconds from a Server-Timing header"""
+    timings: Dict[str, float] = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+class APIClient:
+    """Blocking facade over an async, keep-alive connection pool to the API"""
+
+    def __init__(self, base_url: str = None, timeout: float = None, max_connections: int = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Args:
+            base_url: API root (default: API_BASE_URL)
+            timeout: Read timeout per request in seconds (default: API_TIMEOUT_SECONDS)
+            max_connections: Connection pool size (default: API_MAX_CONNECTIONS)
+            transport: Custom httpx transport (tests)
+        """
+        timeout = timeout or settings.API_TIMEOUT_SECONDS
+        max_connections = max_connections or settings.API_MAX_CONNECTIONS
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="cultitrans-api-client", daemon=True)
+        self._thread.start()
+        self._client = httpx.AsyncClient(
+            base_url=base_url or settings.API_BASE_URL,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT),
+            transport=transport
+        )
+
+    def _run(self, coroutine) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _iterate(self, stream: AsyncIterator[Any]) -> Iterator[Any]:
+        """Consume an async iterator on the client loop, item by item"""
+        items: "queue.Queue" = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in stream:
+                    items.put(item)
+            except BaseException as e:
+                items.put(e)
+            finally:
+                items.put(_DONE)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        try:
+            while True:
+                item = items.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise APIError(str(item)) from item
+                yield item
+        finally:
+            # The reader stopped early (e.g. a Streamlit rerun): close the stream
+            future.cancel()
+
+    def stream_translation(self, text: str, source_language: str, target_culture: str,
+                           session_id: str = None) -> Iterator[Dict]:
+        """
+        Events of POST /translate/stream, each with ``elapsed_ms`` since the request
+
+        Raises:
+            APIError: The API rejected the request or the connection failed
+        """
+        payload = {
+            "text": text,
+            "source_language": source_language,
+            "target_culture": target_culture,
+            "session_id": session_id
+        }
+
+        async def events():
+            started = time.perf_counter()
+            async with self._client.stream("POST", "/translate/stream", json=payload) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise APIError(_error_detail(response))
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        event = json.loads(line)
+                        event["elapsed_ms"] = (time.perf_counter() - started) * 1000
+                        yield event
+
+        return self._iterate(events())
+
+    def transcribe(self, audio: bytes, filename: str = "audio.wav") -> Tuple[str, Dict[str, float]]:
+        """
+        Transcribe an upload with POST /transcribe
+
+        Returns:
+            The transcription and the server's stage timings (ms)
+        """
+        async def request():
+            return await self._client.post("/transcribe", files={"audio": (filename, audio)})
+
+        try:
+            response = self._run(request())
+        except httpx.HTTPError as e:
+            raise APIError(str(e)) from e
+        if response.status_code != 200:
+            raise APIError(_error_detail(response))
+        return response.json()["transcription"], parse_server_timing(response.headers.get("server-timing"))
+
+    def ready(self) -> bool:
+        """Whether the API answers /readyz with 200"""
+        try:
+            return self._run(self._client.get("/readyz")).status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def close(self):
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def _error_detail(response: httpx.Response) -> str:
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    detail = body.get("detail") if isinstance(body, dict) else None
+    return f"API error {response.status_code}: {detail or response.text[:200]}"
@@ -10,12 +10,36 @@ except Exception as e:
         "'pip install streamlit' and restart the application."
     ) from e
 
-import io
-from src.core.asr import ASRProcessor
-from src.core.translator import CulturalTranslator
-from src.core.response_generator import ResponseGenerator
+import time
+import uuid
+from typing import Dict, Iterator
 from config.settings import settings
 
+# "api": thin client of the FastAPI backend (no models in this process);
+# "local": run the pipeline inside the Streamlit process
+API_MODE = settings.FRONTEND_MODE == "api"
+
+STAGE_LABELS = {
+    "translation": "Basic translation",
+    "adaptation": "Cultural adaptation",
+    "suggestion": "First suggestion",
+    "done": "Total",
+}
+
+@st.cache_resource
+def load_components():
+    """Build the pipeline once per process; models are shared via the registry"""
+    from src.core.asr import ASRProcessor
+    from src.core.translator import CulturalTranslator
+    from src.core.response_generator import ResponseGenerator
+    return ASRProcessor(), CulturalTranslator(), ResponseGenerator()
+
+@st.cache_resource
+def api_client():
+    """One pooled async HTTP client per process, shared by every session"""
+    from src.frontend.api_client import APIClient
+    return APIClient()
+
 def main():
     st.set_page_config(
         page_title="CultiTrans",
@@ -27,11 +51,15 @@ def main():
     st.markdown("**Bridging languages and cultures with AI**")
     
     # Initialize components
-    if 'asr' not in st.session_state:
-        st.session_state.asr = ASRProcessor()
-        st.session_state.translator = CulturalTranslator()
-        st.session_state.response_gen = ResponseGenerator()
+    if not API_MODE:
+        asr, translator, response_gen = load_components()
+        st.session_state.asr = asr
+        st.session_state.translator = translator
+        st.session_state.response_gen = response_gen
+    if 'conversation_history' not in st.session_state:
         st.session_state.conversation_history = []
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
     
     # Sidebar for settings
     with st.sidebar:
@@ -47,6 +75,9 @@ def main():
         st.info(f"**Language:** {culture_info.get('language', 'N/A')}")
         st.info(f"**Politeness Level:** {culture_info.get('politeness', 'N/A')}")
         st.info(f"**Directness Level:** {culture_info.get('directness', 'N/A')}")
+        
+        if API_MODE:
+            st.caption(f"Backend: {settings.API_BASE_URL}")
     
     # Main interface
     col1, col2 = st.columns(2)
@@ -65,33 +96,33 @@ def main():
             st.audio(audio_file)
             if st.button("Transcribe Audio"):
                 audio_bytes = audio_file.read()
-                transcribed_text = st.session_state.asr.transcribe_audio(audio_bytes)
+                transcribed_text = transcribe(audio_bytes, audio_file.name)
                 if transcribed_text:
                     user_text = transcribed_text
                     st.success(f"Transcribed: {transcribed_text}")
         
-        if st.button("Translate & Get Cultural Suggestions") and user_text:
-            process_translation(user_text, source_lang, target_culture)
+        translate_clicked = st.button("Translate & Get Cultural Suggestions") and user_text
     
     with col2:
         st.header("Results")
         
-        if 'translation_result' in st.session_state:
+        if translate_clicked:
+            process_translation(user_text, source_lang, target_culture)
+        elif 'translation_result' in st.session_state:
             result = st.session_state.translation_result
             
             st.subheader("Translation")
-            st.write(f"**Basic:** {result['basic_translation']}")
-            st.write(f"**Cultural Adaptation:** {result['cultural_adaptation']}")
+            st.write(f"**Basic:** {result.get('basic_translation', '')}")
+            st.write(f"**Cultural Adaptation:** {result.get('cultural_adaptation', '')}")
             
             st.subheader("Cultural Notes")
-            st.info(result['culture_notes'])
+            st.info(result.get('culture_notes', ''))
             
             st.subheader("Response Suggestions")
             if 'response_suggestions' in st.session_state:
                 for i, resp in enumerate(st.session_state.response_suggestions, 1):
-                    with st.expander(f"Response Option {i}"):
-                        st.write(f"**Text:** {resp['text']}")
-                        st.write(f"**Explanation:** {resp['explanation']}")
+                    render_suggestion(i, resp)
+            render_timings(result.get('timings', {}))
     
     # Conversation history
     if st.session_state.conversation_history:
@@ -99,29 +130,116 @@ def main():
         for item in st.session_state.conversation_history[-5:]:  # Show last 5
             st.text(f"[{item['timestamp']}] {item['source']} → {item['target']}")
 
+def render_suggestion(index: int, resp: dict):
+    """Render one response suggestion"""
+    with st.expander(f"Response Option {index}"):
+        st.write(f"**Text:** {resp.get('text', '')}")
+        st.write(f"**Explanation:** {resp.get('explanation', '')}")
+
+def render_timings(timings: Dict[str, float]):
+    """Show when each stage's result arrived (ms since the request)"""
+    if timings:
+        st.caption(" · ".join(
+            f"{STAGE_LABELS.get(stage, stage)}: {ms:.0f} ms" for stage, ms in timings.items()
+        ))
+
+def transcribe(audio_bytes: bytes, filename: str) -> str:
+    """Transcribe an upload through the API or the local Whisper model"""
+    if not API_MODE:
+        return st.session_state.asr.transcribe_audio(audio_bytes)
+    
+    from src.frontend.api_client import APIError
+    try:
+        text, timings = api_client().transcribe(audio_bytes, filename)
+    except APIError as e:
+        st.error(f"Transcription failed: {e}")
+        return ""
+    render_timings(timings)
+    return text
+
+def local_events(text: str, source_lang: str, target_culture: str) -> Iterator[Dict]:
+    """The event stream of POST /translate/stream, produced in this process"""
+    from src.core.model_registry import registry
+    
+    started = time.perf_counter()
+    elapsed = lambda: (time.perf_counter() - started) * 1000
+    adaptation = text
+    for event in st.session_state.translator.stream_with_culture(text, source_lang, target_culture):
+        if event["type"] == "adaptation":
+            adaptation = event["cultural_adaptation"]
+        yield {**event, "elapsed_ms": elapsed()}
+    
+    # The prompt carries the bounded session history rather than the whole conversation
+    sessions = registry.get("sessions")
+    context = sessions.conversation_context(st.session_state.session_id, text)
+    for index, resp in enumerate(st.session_state.response_gen.stream_responses(
+        f"{context}\nTranslation: {adaptation}", target_culture, query=text
+    ), 1):
+        yield {"type": "suggestion", "index": index, "suggestion": resp, "elapsed_ms": elapsed()}
+    sessions.add_turn(st.session_state.session_id, text, adaptation)
+    yield {"type": "done", "elapsed_ms": elapsed()}
+
 def process_translation(text: str, source_lang: str, target_culture: str):
-    """Process translation and generate cultural suggestions"""
-    with st.spinner("Translating and analyzing cultural context..."):
-        # Translation
-        translation_result = st.session_state.translator.translate_with_culture(
-            text, source_lang, target_culture
-        )
-        st.session_state.translation_result = translation_result
-        
-        # Response suggestions
-        response_suggestions = st.session_state.response_gen.generate_responses(
-            f"User said: {text}\nTranslation: {translation_result['cultural_adaptation']}", 
-            target_culture
-        )
-        st.session_state.response_suggestions = response_suggestions
-        
-        # Add to conversation history
-        import datetime
-        st.session_state.conversation_history.append({
-            'timestamp': datetime.datetime.now().strftime("%H:%M"),
-            'source': text,
-            'target': translation_result['cultural_adaptation']
-        })
+    """Process translation and generate cultural suggestions, rendering results as they stream in"""
+    st.subheader("Translation")
+    basic_slot = st.empty()
+    adaptation_slot = st.empty()
+    st.subheader("Cultural Notes")
+    notes_slot = st.empty()
+    st.subheader("Response Suggestions")
+    suggestions_slot = st.container()
+    timings_slot = st.empty()
+    
+    basic_slot.write("**Basic:** _translating..._")
+    
+    if API_MODE:
+        # Suggestions are generated alongside the translation on the server,
+        # which also records the turn in the session
+        events = api_client().stream_translation(text, source_lang, target_culture, st.session_state.session_id)
+    else:
+        events = local_events(text, source_lang, target_culture)
+    
+    # Basic translation first, then adaptation tokens and suggestions as they arrive
+    translation_result = {"timings": {}}
+    adaptation_parts = []
+    response_suggestions = []
+    try:
+        with suggestions_slot, st.spinner("Translating and generating culturally appropriate responses..."):
+            for event in events:
+                kind = event["type"]
+                if kind in STAGE_LABELS and kind not in translation_result["timings"]:
+                    translation_result["timings"][kind] = event["elapsed_ms"]
+                    with timings_slot.container():
+                        render_timings(translation_result["timings"])
+                if kind == "translation":
+                    translation_result["basic_translation"] = event["basic_translation"]
+                    translation_result["culture_notes"] = event["culture_notes"]
+                    basic_slot.write(f"**Basic:** {event['basic_translation']}")
+                    notes_slot.info(event["culture_notes"])
+                elif kind == "adaptation_delta":
+                    adaptation_parts.append(event["delta"])
+                    adaptation_slot.write(f"**Cultural Adaptation:** {''.join(adaptation_parts)}▌")
+                elif kind == "adaptation":
+                    translation_result["cultural_adaptation"] = event["cultural_adaptation"]
+                    adaptation_slot.write(f"**Cultural Adaptation:** {event['cultural_adaptation']}")
+                elif kind == "suggestion":
+                    response_suggestions.append(event["suggestion"])
+                    render_suggestion(len(response_suggestions), event["suggestion"])
+                elif kind == "error":
+                    st.warning(event.get("detail", "Part of the result is unavailable"))
+    except Exception as e:
+        st.error(f"Translation failed: {e}")
+        return
+    st.session_state.translation_result = translation_result
+    st.session_state.response_suggestions = response_suggestions
+    
+    # Add to conversation history
+    import datetime
+    st.session_state.conversation_history.append({
+        'timestamp': datetime.datetime.now().strftime("%H:%M"),
+        'source': text,
+        'target': translation_result.get('cultural_adaptation', '')
+    })
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,64 @@
+"""
+Tests for the frontend's API client
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import unittest
+import httpx
+from src.frontend.api_client import APIClient, APIError, parse_server_timing
+
+EVENTS = [
+    {"type": "translation", "basic_translation": "こんにちは", "culture_notes": "Be polite"},
+    {"type": "adaptation_delta", "delta": "こんにちは"},
+    {"type": "adaptation", "cultural_adaptation": "こんにちは", "confidence": 1.0},
+    {"type": "suggestion", "index": 1, "suggestion": {"text": "はい", "explanation": "Polite"}},
+    {"type": "done"},
+]
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/translate/stream":
+        body = json.loads(request.content)
+        if not body["text"]:
+            return httpx.Response(422, json={"detail": "text is required"})
+        lines = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in EVENTS)
+        return httpx.Response(200, content=lines.encode("utf-8"))
+    if request.url.path == "/transcribe":
+        return httpx.Response(
+            200, json={"transcription": "hello there", "segments": []},
+            headers={"Server-Timing": "audio_decode;dur=4.5, asr;dur=120.0, total;dur=130.2"}
+        )
+    return httpx.Response(503)
+
+class TestAPIClient(unittest.TestCase):
+    def setUp(self):
+        self.client = APIClient("http://api.test", transport=httpx.MockTransport(handler))
+        self.addCleanup(self.client.close)
+    
+    def test_streamed_events_arrive_in_order_with_timings(self):
+        events = list(self.client.stream_translation("hello", "en", "japanese", session_id="s1"))
+        self.assertEqual([event["type"] for event in events], [event["type"] for event in EVENTS])
+        self.assertEqual(events[2]["cultural_adaptation"], "こんにちは")
+        elapsed = [event["elapsed_ms"] for event in events]
+        self.assertEqual(elapsed, sorted(elapsed))
+    
+    def test_error_responses_raise(self):
+        with self.assertRaises(APIError) as raised:
+            list(self.client.stream_translation("", "en", "japanese"))
+        self.assertIn("text is required", str(raised.exception))
+        self.assertFalse(self.client.ready())
+    
+    def test_transcription_reports_server_timings(self):
+        text, timings = self.client.transcribe(b"RIFF", "clip.wav")
+        self.assertEqual(text, "hello there")
+        self.assertEqual(timings, {"audio_decode": 4.5, "asr": 120.0, "total": 130.2})
+    
+    def test_parse_server_timing_ignores_malformed_entries(self):
+        self.assertEqual(parse_server_timing("a;dur=1, b, c;dur=x, d;desc=y;dur=2"), {"a": 1.0, "d": 2.0})
+        self.assertEqual(parse_server_timing(None), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Tests for in-memory audio ingestion
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import io
+import subprocess
+import unittest
+import wave
+from unittest.mock import patch
+import numpy as np
+from src.core.audio import AudioDecodeError, SAMPLE_RATE, decode_audio, float32_to_pcm16, split_on_silence
+
+def tone(seconds: float, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+class TestAudioDecoding(unittest.TestCase):
+    def test_wav_decoded_in_memory(self):
+        """16 kHz PCM WAV is parsed without ffmpeg or temp files"""
+        samples = tone(0.5)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(float32_to_pcm16(samples))
+        
+        decoded = decode_audio(buffer.getvalue())
+        self.assertEqual(decoded.dtype, np.float32)
+        self.assertEqual(len(decoded), len(samples))
+        self.assertTrue(np.allclose(decoded, samples, atol=1e-3))
+
+    def test_raw_pcm_fallback_only_for_unrecognised_input(self):
+        unrecognised = subprocess.CalledProcessError(1, "ffmpeg", stderr=b"pipe:0: Invalid data found when processing input")
+        pcm = float32_to_pcm16(tone(0.1))
+        with patch("subprocess.run", side_effect=unrecognised):
+            self.assertEqual(len(decode_audio(pcm)), len(pcm) // 2)
+            # Corrupt MP3/OGG files keep their signature and are rejected
+            for corrupt in (b"ID3\x04\x00" + bytes(95), b"OggS" + bytes(96), b"\xff\xfb\x90\x00" + bytes(96)):
+                with self.assertRaises(AudioDecodeError):
+                    decode_audio(corrupt)
+        
+        with patch("subprocess.run", side_effect=FileNotFoundError("ffmpeg")):
+            with self.assertRaises(AudioDecodeError):
+                decode_audio(pcm)
+        rejected = subprocess.CalledProcessError(1, "ffmpeg", stderr=b"Error while decoding stream")
+        with patch("subprocess.run", side_effect=rejected):
+            with self.assertRaises(AudioDecodeError):
+                decode_audio(pcm)
+
+class TestSplitOnSilence(unittest.TestCase):
+    def test_short_audio_is_one_chunk(self):
+        audio = tone(2.0)
+        self.assertEqual(split_on_silence(audio), [(0, len(audio))])
+    
+    def test_long_audio_cut_in_silence(self):
+        """Chunks respect the maximum length and end inside pauses"""
+        audio = np.concatenate([tone(20), silence(1), tone(20), silence(1), tone(5)])
+        chunks = split_on_silence(audio, max_chunk_seconds=30)
+        
+        self.assertEqual(len(chunks), 2)
+        for start, end in chunks:
+            self.assertLessEqual(end - start, 30 * SAMPLE_RATE)
+        first_cut = chunks[0][1] / SAMPLE_RATE
+        self.assertTrue(20 <= first_cut <= 21, first_cut)
+    
+    def test_silence_only_chunks_dropped(self):
+        audio = np.concatenate([tone(10), silence(40)])
+        chunks = split_on_silence(audio, max_chunk_seconds=30)
+        self.assertEqual(len(chunks), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests for batch translation and resumable JSONL jobs
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import tempfile
+import unittest
+from unittest.mock import Mock
+from src.core.batch_runner import BatchProcessor, run_job
+
+def fake_translate_batch(texts, source_lang, target_culture):
+    return [
+        {"basic_translation": f"{target_culture}:{text}", "cultural_adaptation": text, "culture_notes": ""}
+        for text in texts
+    ]
+
+class TestBatchProcessor(unittest.TestCase):
+    def setUp(self):
+        self.translator = Mock()
+        self.translator.translate_batch.side_effect = fake_translate_batch
+        self.processor = BatchProcessor(self.translator, concurrency=2, group_size=2)
+    
+    def test_grouped_per_culture_and_ordered(self):
+        records = [
+            {"text": "a", "source_language": "en", "target_culture": "japanese"},
+            {"text": "b", "source_language": "en", "target_culture": "german"},
+            {"text": "c", "source_language": "en", "target_culture": "japanese"},
+        ]
+        results = self.processor.process(records)
+        
+        self.assertEqual([r["basic_translation"] for r in results], ["japanese:a", "german:b", "japanese:c"])
+        self.assertEqual(self.translator.translate_batch.call_count, 2)
+    
+    def test_suggestions_share_one_retrieval_per_group(self):
+        generator = Mock()
+        generator.cultural_rag.retrieve_cultural_context_batch.side_effect = \
+            lambda texts, culture: [[f"guidance for {t}"] for t in texts]
+        generator.generate_responses.return_value = [{"text": "reply"}]
+        processor = BatchProcessor(self.translator, generator, group_size=10, include_suggestions=True)
+        records = [{"text": t, "source_language": "en", "target_culture": "japanese"} for t in ("a", "b", "c")]
+        
+        results = processor.process(records)
+        self.assertEqual(results[2]["response_suggestions"], [{"text": "reply"}])
+        generator.cultural_rag.retrieve_cultural_context_batch.assert_called_once_with(["a", "b", "c"], "japanese")
+        self.assertEqual(generator.generate_responses.call_args.kwargs["cultural_context"], ["guidance for c"])
+    
+    def test_invalid_records_reported(self):
+        results = self.processor.process([{"text": "a"}])
+        self.assertIn("error", results[0])
+        self.translator.translate_batch.assert_not_called()
+
+class TestRunJob(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmpdir.name, "in.jsonl")
+        self.output_path = os.path.join(self.tmpdir.name, "out.jsonl")
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            for i in range(5):
+                f.write(json.dumps({"text": f"t{i}", "source_language": "en", "target_culture": "french"}) + "\n")
+        self.translator = Mock()
+        self.translator.translate_batch.side_effect = fake_translate_batch
+        self.processor = BatchProcessor(self.translator)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def read_output(self):
+        with open(self.output_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+    
+    def test_job_resumes_after_interruption(self):
+        """Completed lines are skipped and a torn last line is discarded"""
+        with open(self.output_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"line": 1, "basic_translation": "done"}) + "\n")
+            f.write('{"line": 2, "basic_tr')
+        
+        stats = run_job(self.input_path, self.output_path, self.processor, chunk_size=2, log=None)
+        
+        output = self.read_output()
+        self.assertEqual(sorted(r["line"] for r in output), [1, 2, 3, 4, 5])
+        self.assertEqual(stats["processed"], 4)
+        self.assertEqual(stats["skipped"], 1)
+
+    def test_failed_lines_retried_on_request(self):
+        with open(self.output_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"line": 1, "basic_translation": "done"}) + "\n")
+            f.write(json.dumps({"line": 2, "error": "upstream down"}) + "\n")
+        
+        stats = run_job(self.input_path, self.output_path, self.processor, log=None)
+        self.assertEqual(stats["skipped"], 2)
+        
+        stats = run_job(self.input_path, self.output_path, self.processor, log=None, retry_failed=True)
+        output = self.read_output()
+        self.assertEqual(stats["processed"], 1)
+        self.assertEqual(sorted(r["line"] for r in output), [1, 2, 3, 4, 5])
+        self.assertFalse(any("error" in r for r in output))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for dynamic micro-batching
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+import unittest
+from src.core.batching import MicroBatcher
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        
+        def process(key, items):
+            self.batches.append((key, list(items)))
+            return [f"{key}:{item}" for item in items]
+        
+        self.batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=50)
+    
+    def tearDown(self):
+        self.batcher.close()
+    
+    def test_concurrent_requests_share_a_batch(self):
+        """Items submitted within the wait window are processed together"""
+        futures = [self.batcher.submit("ja", i) for i in range(5)]
+        results = [f.result(timeout=5) for f in futures]
+        
+        self.assertEqual(results, [f"ja:{i}" for i in range(5)])
+        self.assertEqual(len(self.batches), 1)
+    
+    def test_items_grouped_by_key(self):
+        """Different keys never share a batch"""
+        futures = [self.batcher.submit(key, i) for i, key in enumerate(["ja", "de", "ja"])]
+        results = [f.result(timeout=5) for f in futures]
+        
+        self.assertEqual(results, ["ja:0", "de:1", "ja:2"])
+        self.assertEqual(sorted(key for key, _ in self.batches), ["de", "ja"])
+    
+    def test_errors_propagate_to_callers(self):
+        """A failing batch fails every future in it"""
+        def broken(key, items):
+            raise ValueError("model crashed")
+        
+        batcher = MicroBatcher(broken, max_wait_ms=1)
+        try:
+            with self.assertRaises(ValueError):
+                batcher.run("ja", "hello", timeout=5)
+        finally:
+            batcher.close()
+    
+    def test_run_from_many_threads(self):
+        """Blocking run() works from many caller threads"""
+        results = {}
+        
+        def call(i):
+            results[i] = self.batcher.run("fr", i, timeout=5)
+        
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(results, {i: f"fr:{i}" for i in range(20)})
+        self.assertTrue(all(len(items) <= 8 for _, items in self.batches))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests for the benchmark harness helpers and stand-ins
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import unittest
+from benchmarks.profiles import chrf, mean_cosine, word_error_rate
+from benchmarks.run import compare, run_async_load, summarize, synthetic_wav
+from benchmarks.standins import FakeChatCompletion, HashEmbeddings
+from src.core.audio import decode_audio
+from src.core.response_generator import ResponseSuggestionParser
+from src.core.translator import CulturalTranslator
+
+class TestBenchmarkHelpers(unittest.TestCase):
+    def test_summarize_percentiles(self):
+        summary = summarize([i / 1000 for i in range(1, 101)], elapsed=2.0, errors=1)
+        
+        self.assertEqual(summary["requests"], 101)
+        self.assertEqual(summary["throughput_rps"], 50.0)
+        self.assertAlmostEqual(summary["latency_ms"]["p50"], 50.5)
+        self.assertAlmostEqual(summary["latency_ms"]["p99"], 99.01)
+    
+    def test_async_load_counts_failures(self):
+        async def send(i):
+            return i % 4 != 0
+        
+        summary = asyncio.run(run_async_load(send, requests=20, concurrency=3))
+        self.assertEqual(summary["requests"], 20)
+        self.assertEqual(summary["errors"], 5)
+    
+    def test_compare_flags_regressions(self):
+        def run(p95, rps):
+            return {"results": [{"scenario": "translate", "concurrency": 8,
+                                 "throughput_rps": rps, "latency_ms": {"p95": p95}}]}
+        
+        self.assertEqual(compare(run(100, 50), run(105, 49), tolerance=0.1), [])
+        self.assertEqual(len(compare(run(100, 50), run(150, 30), tolerance=0.1)), 2)
+    
+    def test_synthetic_audio_decodes(self):
+        self.assertEqual(len(decode_audio(synthetic_wav(2.0))), 32000)
+
+class TestStandins(unittest.TestCase):
+    def test_replies_match_pipeline_parsers(self):
+        llm = FakeChatCompletion(base_latency=0, token_latency=0)
+        translator = CulturalTranslator.__new__(CulturalTranslator)
+        
+        packed_prompt = translator._build_packed_adaptation_prompt(["a", "b", "c"], "japanese", {})
+        packed = llm.create(messages=[{"role": "user", "content": packed_prompt}])
+        self.assertEqual(len(CulturalTranslator._parse_packed_adaptations(packed.choices[0].message.content, 3)), 3)
+        
+        parser = ResponseSuggestionParser()
+        for chunk in llm.create(messages=[{"role": "user", "content": "Response X: [text]"}], stream=True):
+            parser.feed(chunk.choices[0].delta.content)
+        self.assertEqual(len(parser.close()), 1)
+    
+    def test_hash_embeddings_are_deterministic(self):
+        embeddings = HashEmbeddings(dimensions=16)
+        self.assertEqual(embeddings.embed_query("Bowing matters"), embeddings.embed_documents(["bowing matters"])[0])
+    
+    def test_profile_accuracy_metrics(self):
+        self.assertEqual(chrf("konnichiwa", "konnichiwa"), 100.0)
+        self.assertLess(chrf("konbanwa", "konnichiwa"), 60.0)
+        self.assertAlmostEqual(word_error_rate("see you tomorrow", "see you tomorrow morning"), 0.25)
+        self.assertAlmostEqual(mean_cosine([[1.0, 0.0]], [[2.0, 0.0]]), 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for the translation/adaptation cache
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import tempfile
+import threading
+import time
+import unittest
+from src.core.cache import LRUCache, MISS, SQLiteCache, TieredCache, make_key
+
+class TestCacheKeys(unittest.TestCase):
+    def test_keys_use_normalised_text(self):
+        """Whitespace differences map to the same key; case only where the output ignores it"""
+        self.assertEqual(
+            make_key("adaptation", "Thank  you ", "en", "japanese", "gpt", "1"),
+            make_key("adaptation", "Thank you", "en", "japanese", "gpt", "1")
+        )
+        self.assertEqual(make_key("responses", "Thank  you"), make_key("responses", "thank you"))
+    
+    def test_translation_keys_keep_case(self):
+        self.assertNotEqual(make_key("translation", "Polish", "en", "fr"), make_key("translation", "polish", "en", "fr"))
+        self.assertNotEqual(make_key("adaptation", "US", target_culture="german"),
+                            make_key("adaptation", "us", target_culture="german"))
+    
+    def test_keys_differ_by_culture_and_prompt_version(self):
+        base = make_key("adaptation", "thank you", "en", "japanese", "gpt", "1")
+        self.assertNotEqual(base, make_key("adaptation", "thank you", "en", "german", "gpt", "1"))
+        self.assertNotEqual(base, make_key("adaptation", "thank you", "en", "japanese", "gpt", "2"))
+
+class TestTieredCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.disk = SQLiteCache(os.path.join(self.tmpdir.name, "cache.db"))
+        self.cache = TieredCache(LRUCache(max_entries=2, ttl_seconds=60), self.disk)
+    
+    def tearDown(self):
+        self.disk.close()
+        self.tmpdir.cleanup()
+    
+    def test_lru_eviction_and_ttl(self):
+        lru = LRUCache(max_entries=2, ttl_seconds=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertIs(lru.get("b"), MISS)
+        self.assertEqual(lru.get("a"), 1)
+        
+        lru.set("d", 4, ttl_seconds=-1)
+        self.assertIs(lru.get("d"), MISS)
+    
+    def test_disk_tier_backs_memory(self):
+        """Values evicted from memory are still served from SQLite"""
+        for i in range(3):
+            self.cache.set(f"k{i}", {"text": f"v{i}"})
+        
+        self.assertEqual(self.cache.get("k0"), {"text": "v0"})
+        stats = self.cache.stats()
+        self.assertEqual(stats["disk_hits"], 1)
+    
+    def test_single_flight(self):
+        """Concurrent identical misses run the computation once"""
+        calls = []
+        release = threading.Event()
+        
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return "adapted"
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.cache.get_or_compute("k", compute)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["adapted"] * 5)
+    
+    def test_failures_are_not_cached(self):
+        def broken():
+            raise RuntimeError("upstream down")
+        
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_compute("k", broken)
+        self.assertEqual(self.cache.get_or_compute("k", lambda: "ok"), "ok")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Tests for the CPU inference profile helpers
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+from unittest.mock import MagicMock, patch
+from config.settings import settings
+from src.core import inference_profile
+
+class TestInferenceProfile(unittest.TestCase):
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            inference_profile.load_whisper("fp8")
+    
+    def test_threads_are_set_per_model_and_restored(self):
+        torch = MagicMock()
+        torch.get_num_threads.return_value = 8
+        with patch.dict(sys.modules, {"torch": torch}), patch.object(settings, "M2M_THREADS", 2):
+            with inference_profile.inference_threads("m2m100"):
+                torch.set_num_threads.assert_called_with(2)
+            torch.set_num_threads.assert_called_with(8)
+            
+            torch.set_num_threads.reset_mock()
+            with inference_profile.inference_threads("whisper"):  # 0: torch default
+                pass
+            torch.set_num_threads.assert_not_called()
+    
+    def test_onnx_exports_are_reused(self):
+        with patch.object(settings, "ONNX_EXPORT_DIR", os.path.join(os.path.dirname(__file__), "_onnx")):
+            target = os.path.join(settings.ONNX_EXPORT_DIR, "org--model", "int8")
+            os.makedirs(target, exist_ok=True)
+            try:
+                open(os.path.join(target, "config.json"), "w").close()
+                self.assertEqual(inference_profile.export_onnx("org/model", "seq2seq", quantize=True), target)
+            finally:
+                import shutil
+                shutil.rmtree(settings.ONNX_EXPORT_DIR)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests for the shared multi-process inference pool
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import gc
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from src.core.inference_server import (
+    InferenceBusyError, InferenceClient, InferenceError, InferenceServer, RemoteEmbeddings, RemoteWhisper,
+    key_path
+)
+from src.core.model_registry import registry
+
+class FakeEmbeddings:
+    model_name = "fake-embeddings"
+    
+    def embed_documents(self, texts):
+        return [[float(len(text)), float(os.getpid())] for text in texts]
+
+class SlowWhisper:
+    def transcribe(self, audio, **options):
+        time.sleep(options.get("delay", 0))
+        return {"text": f"{len(audio)} samples", "segments": []}
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "fork-based pool")
+class TestInferenceServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.address = os.path.join(self.tmp.name, "inference.sock")
+        registry.set("embeddings", FakeEmbeddings())
+        registry.set("whisper", SlowWhisper())
+    
+    def tearDown(self):
+        for name in ("embeddings", "whisper"):
+            registry.unload(name)
+        gc.unfreeze()
+    
+    def serve(self, **kwargs):
+        server = InferenceServer(self.address, models=["embeddings", "whisper"], **kwargs)
+        server.start()
+        self.addCleanup(server.close)
+        return server
+    
+    def test_models_run_in_forked_workers(self):
+        server = self.serve(workers=2)
+        client = InferenceClient(self.address)
+        self.addCleanup(client.close)
+        
+        embeddings = RemoteEmbeddings(client)
+        self.assertEqual(embeddings.model_name, "fake-embeddings")
+        length, pid = embeddings.embed_query("hello")
+        self.assertEqual(length, 5.0)
+        self.assertIn(int(pid), server.worker_pids)
+        self.assertNotEqual(int(pid), os.getpid())
+        
+        whisper = RemoteWhisper(client)
+        self.assertEqual(whisper.transcribe([0.0] * 16)["text"], "16 samples")
+    
+    def test_errors_are_forwarded(self):
+        self.serve(workers=1)
+        client = InferenceClient(self.address)
+        self.addCleanup(client.close)
+        with self.assertRaises(InferenceError):
+            client.call("translate_batch", ["hi"], "en", "fr")  # no M2M100 model loaded
+    
+    def test_saturated_pool_rejects_requests(self):
+        server = self.serve(workers=1, max_pending=1, queue_timeout=0.05)
+        client = InferenceClient(self.address)
+        self.addCleanup(client.close)
+        
+        slow = threading.Thread(target=client.call, args=("whisper_transcribe", [0.0], {"delay": 0.5}))
+        slow.start()
+        time.sleep(0.1)
+        with self.assertRaises(InferenceBusyError):
+            client.call("whisper_transcribe", [0.0], {})
+        slow.join()
+        self.assertEqual(server.stats["rejected"], 1)
+    
+    def test_socket_and_generated_key_are_private(self):
+        self.serve(workers=1)
+        for path in (self.address, key_path(self.address)):
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        
+        with self.assertRaises(ConnectionError):
+            InferenceClient(self.address, authkey="cultitrans").call("ping")
+        client = InferenceClient(self.address)
+        self.addCleanup(client.close)
+        self.assertIsInstance(client.call("ping"), int)
+    
+    def test_unreachable_server(self):
+        with self.assertRaises(ConnectionError):
+            InferenceClient(self.address).call("ping")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for the cultural knowledge corpus loader
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import tempfile
+import unittest
+from src.core.knowledge_loader import BatchedIngestor, iter_documents
+
+class TestIterDocuments(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = self.tmpdir.name
+        with open(os.path.join(root, "etiquette.jsonl"), "w", encoding="utf-8") as f:
+            f.write(json.dumps({"culture": "Japanese", "category": "greetings", "content": "Bow when greeting."}) + "\n")
+            f.write(json.dumps({"culture": "german"}) + "\n")
+        with open(os.path.join(root, "business.csv"), "w", encoding="utf-8") as f:
+            f.write("id,culture,category,content\nde-1,german,business,Be punctual.\n")
+        os.makedirs(os.path.join(root, "french"))
+        with open(os.path.join(root, "french", "dining.md"), "w", encoding="utf-8") as f:
+            f.write("# Meals\nKeep hands on the table.\n\n## Wine\nLet the host pour.\n")
+        os.makedirs(os.path.join(root, "chroma_db"))
+        with open(os.path.join(root, "chroma_db", "ignored.jsonl"), "w", encoding="utf-8") as f:
+            f.write(json.dumps({"culture": "x", "category": "y", "content": "z"}) + "\n")
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_all_formats_share_one_schema(self):
+        docs = list(iter_documents(self.tmpdir.name))
+        
+        self.assertEqual([d["id"] for d in docs], [
+            "de-1", "etiquette.jsonl:1", "french/dining.md:1", "french/dining.md:2"
+        ])
+        self.assertEqual(docs[1]["culture"], "japanese")
+        self.assertEqual(docs[2]["category"], "dining")
+        self.assertTrue(docs[3]["content"].startswith("## Wine"))
+        for doc in docs:
+            self.assertEqual(set(doc), {"id", "culture", "category", "content"})
+    
+    def test_missing_directory(self):
+        self.assertEqual(list(iter_documents(os.path.join(self.tmpdir.name, "missing"))), [])
+
+class TestBatchedIngestor(unittest.TestCase):
+    def test_fixed_size_batches(self):
+        """Chunks are embedded and upserted in bulk, one batch at a time"""
+        embedded, written, deleted = [], [], []
+        ingestor = BatchedIngestor(
+            embed=lambda texts: embedded.append(len(texts)) or [[0.0]] * len(texts),
+            upsert=lambda **batch: written.append(batch["ids"]),
+            delete=lambda ids: deleted.append(list(ids)),
+            batch_size=2
+        )
+        for i in range(5):
+            ingestor.add(f"c{i}", f"text {i}", {"culture": "german", "category": "x"})
+        ingestor.remove(["old"])
+        ingestor.flush()
+        
+        self.assertEqual(embedded, [2, 2, 1])
+        self.assertEqual(written[-1], ["c4"])
+        self.assertEqual(deleted, [["old"]])
+        self.assertEqual(ingestor.summary()["chunks_written"], 5)
+
+if __name__ == "__main__":
+    unittest.main()
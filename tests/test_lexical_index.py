@@ -0,0 +1,53 @@
+"""
+Tests for the BM25 keyword index and rank fusion
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+from src.core.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+class TestBM25Index(unittest.TestCase):
+    def setUp(self):
+        self.index = BM25Index()
+        self.index.build(
+            documents=[
+                "Bowing is essential when greeting someone.",
+                "Use honorifics such as -san when addressing colleagues.",
+                "Gifts are wrapped and offered with both hands.",
+                "Avoid direct criticism to help others save face."
+            ],
+            metadatas=[
+                {"culture": "japanese"}, {"culture": "japanese"},
+                {"culture": "japanese"}, {"culture": "chinese"}
+            ]
+        )
+    
+    def test_tokenize_drops_stopwords(self):
+        self.assertEqual(tokenize("How do I greet my Boss?"), ["greet", "boss"])
+    
+    def test_exact_keyword_match(self):
+        """Exact etiquette terms rank their document first, within the culture"""
+        results = self.index.search("Should I be bowing?", "japanese", k=3)
+        
+        self.assertEqual(results[0][0], "Bowing is essential when greeting someone.")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(self.index.search("bowing", "chinese"), [])
+        self.assertEqual(self.index.count("japanese"), 3)
+    
+    def test_scores_are_normalised(self):
+        """Unmatched query terms lower the confidence of a keyword hit"""
+        focused = self.index.search("honorifics colleagues", "japanese")[0][1]
+        diluted = self.index.search("honorifics for the quarterly budget spreadsheet", "japanese")[0][1]
+        
+        self.assertTrue(0 < diluted < focused <= 1)
+
+class TestReciprocalRankFusion(unittest.TestCase):
+    def test_documents_in_both_lists_win(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d", "a"]], k=2)
+        self.assertEqual(fused, ["a", "c"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for the local confidence-routed adaptation tier
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+from unittest.mock import patch
+from config.settings import settings
+from src.core.local_adaptation import assess, is_formulaic, rule_penalty, similarity
+from src.core.translator import CulturalTranslator
+
+JAPANESE = settings.SUPPORTED_CULTURES["japanese"]
+AMERICAN = settings.SUPPORTED_CULTURES["american"]
+
+class TestLocalAdaptation(unittest.TestCase):
+    def test_formulaic_text_stays_local(self):
+        for text in ("Thank you very much!", "Good morning", "42", "$19.99", "https://example.com"):
+            self.assertTrue(is_formulaic(text), text)
+            self.assertTrue(assess(text, "x", "en", "ja", JAPANESE).local, text)
+        self.assertFalse(is_formulaic("Thank you for ruining my day"))
+    
+    def test_rules_follow_culture_traits(self):
+        blunt = "Give me the report, I disagree"
+        self.assertGreater(rule_penalty(blunt, JAPANESE), 0.5)
+        self.assertEqual(rule_penalty(blunt, AMERICAN), 0.0)
+        self.assertFalse(assess("Give me the report now", "報告書をください", "en", "ja", JAPANESE).local)
+        self.assertTrue(assess("The train leaves at noon", "電車は正午に出発します", "en", "ja", JAPANESE).local)
+    
+    def test_auto_detected_input_is_unchecked(self):
+        chinese = assess("马上把报告给我", "すぐに報告書をください", "auto", "ja", JAPANESE)
+        self.assertEqual(chinese.signals["rules"], settings.LOCAL_ADAPTATION_UNCHECKED_PENALTY)
+        self.assertFalse(chinese.local)
+        self.assertEqual(assess("Give me the report", "Gib mir den Bericht", "auto", "de", JAPANESE).signals["rules"],
+                         settings.LOCAL_ADAPTATION_UNCHECKED_PENALTY)
+    
+    def test_long_text_and_disagreement_lower_confidence(self):
+        short = assess("See you at the station", "駅で会いましょう", "en", "ja", JAPANESE)
+        long_text = " ".join(["We will discuss the new schedule for the project"] * 3)
+        self.assertGreater(short.confidence, assess(long_text, "...", "en", "ja", JAPANESE).confidence)
+        
+        agreeing = assess("See you at the station", "駅で会いましょう", "en", "ja", JAPANESE, "駅で会いましょう")
+        differing = assess("See you at the station", "駅で会いましょう", "en", "ja", JAPANESE, "またね")
+        self.assertEqual(agreeing.signals["agreement"], 1.0)
+        self.assertLess(differing.confidence, agreeing.confidence)
+        self.assertFalse(differing.local)
+    
+    def test_similarity(self):
+        self.assertEqual(similarity("Hello, world!", "hello world"), 1.0)
+        self.assertGreater(similarity("the train leaves at noon", "the train departs at noon"), 0.5)
+        self.assertEqual(similarity("abc", ""), 0.0)
+
+class TestConfidenceRouting(unittest.TestCase):
+    def setUp(self):
+        with patch('src.core.translator.Translator'):
+            self.translator = CulturalTranslator(backend="google")
+        self.translator._translate_text = lambda text, source, target: f"<{text}>"
+        self.translator._second_translation = lambda text, source, target: None
+    
+    def test_only_unsure_texts_reach_the_llm(self):
+        with patch.object(self.translator, "_adapt_culturally", return_value="adapted") as adapt:
+            results = self.translator.translate_batch(
+                ["Thanks!", "You are wrong, send it now"], "en", "japanese"
+            )
+        
+        self.assertEqual(adapt.call_count, 1)
+        self.assertEqual(results[0]["cultural_adaptation"], "<Thanks!>")
+        self.assertEqual(results[0]["confidence"], 1.0)
+        self.assertEqual(results[1]["cultural_adaptation"], "adapted")
+        self.assertLess(results[1]["confidence"], 1.0)
+    
+    def test_disabled_tier_always_escalates(self):
+        with patch.object(settings, "LOCAL_ADAPTATION_ENABLED", False), \
+                patch.object(self.translator, "_adapt_culturally", return_value="adapted") as adapt:
+            result = self.translator.translate_with_culture("Thanks!", "en", "japanese")
+        self.assertEqual(adapt.call_count, 1)
+        self.assertEqual(result["cultural_adaptation"], "adapted")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for stage timing spans and the metrics exposition
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import unittest
+from src.core.concurrency import run_blocking
+from src.core.metrics import (
+    FALLBACKS, MetricsRegistry, end_request_timings, record_fallback,
+    server_timing_header, span, start_request_timings
+)
+
+class TestSpans(unittest.TestCase):
+    def test_span_adds_to_request_timings(self):
+        timings, token = start_request_timings()
+        try:
+            with span("adaptation"):
+                pass
+            with span("adaptation"):
+                pass
+        finally:
+            end_request_timings(token)
+        
+        self.assertEqual(list(timings), ["adaptation"])
+        self.assertTrue(server_timing_header(timings, 0.25).endswith("total;dur=250.0"))
+    
+    def test_timings_follow_work_onto_the_worker_pool(self):
+        def timed():
+            with span("translation"):
+                return "done"
+        
+        async def handle_timed():
+            timings, token = start_request_timings()
+            try:
+                result = await run_blocking(timed)
+            finally:
+                end_request_timings(token)
+            return result, timings
+        
+        result, timings = asyncio.run(handle_timed())
+        self.assertEqual(result, "done")
+        self.assertIn("translation", timings)
+    
+    def test_fallbacks_are_counted(self):
+        before = FALLBACKS.value(stage="test_stage", reason="TimeoutError")
+        with self.assertLogs("cultitrans", level="WARNING"):
+            record_fallback("test_stage", TimeoutError("upstream timed out"))
+        self.assertEqual(FALLBACKS.value(stage="test_stage", reason="TimeoutError"), before + 1)
+    
+    def test_counter_total_sums_unspecified_labels(self):
+        counter = MetricsRegistry().counter("fallbacks_total", "Fallbacks", ["stage", "reason"])
+        counter.inc(stage="translation", reason="TimeoutError")
+        counter.inc(2, stage="translation", reason="ConnectionError")
+        counter.inc(stage="adaptation", reason="TimeoutError")
+        
+        self.assertEqual(counter.total(stage="translation"), 3)
+        self.assertEqual(counter.total(), 4)
+
+class TestExposition(unittest.TestCase):
+    def test_prometheus_text_format(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stage duration", ["stage"], buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage="asr")
+        histogram.observe(0.5, stage="asr")
+        registry.counter("tokens_total", "Tokens", ["kind"]).inc(12, kind="prompt")
+        registry.gauge_callback("cache", "Cache counters", lambda: {"hit_rate": 0.5, "enabled": True}, label="stat")
+        
+        text = registry.render()
+        
+        self.assertIn('stage_seconds_bucket{stage="asr",le="0.1"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="asr",le="+Inf"} 2', text)
+        self.assertIn('stage_seconds_count{stage="asr"} 2', text)
+        self.assertIn('tokens_total{kind="prompt"} 12', text)
+        self.assertIn('cache{stat="hit_rate"} 0.5', text)
+        self.assertNotIn("enabled", text)
+
+if __name__ == "__main__":
+    unittest.main()
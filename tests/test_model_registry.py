@@ -0,0 +1,96 @@
+"""
+Tests for the shared model registry
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+import unittest
+from src.core.metrics import FALLBACKS
+from src.core.model_registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ModelRegistry()
+        self.calls = 0
+        
+        def loader():
+            self.calls += 1
+            return object()
+        
+        self.registry.register("model", loader)
+    
+    def test_loads_lazily_and_once(self):
+        """Models are only built on first use and then shared"""
+        self.assertFalse(self.registry.is_loaded("model"))
+        first = self.registry.get("model")
+        second = self.registry.get("model")
+        
+        self.assertIs(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.registry.status()["model"]["status"], "ready")
+    
+    def test_concurrent_get_loads_once(self):
+        """Concurrent callers wait for a single load"""
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.registry.get("model")))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+    
+    def test_failed_load_is_reported(self):
+        """A failing loader surfaces its error and can be retried"""
+        def broken():
+            raise RuntimeError("no weights")
+        
+        self.registry.register("broken", broken)
+        with self.assertRaises(RuntimeError):
+            self.registry.get("broken")
+        self.assertEqual(self.registry.status()["broken"]["status"], "failed")
+    
+    def test_background_warmup(self):
+        """Warm-up loads models in a background thread"""
+        thread = self.registry.warmup(["model"])
+        thread.join()
+        self.assertTrue(self.registry.is_loaded("model"))
+    
+    def test_load_async_starts_one_load(self):
+        """Background loads are not duplicated while one is in progress"""
+        release = threading.Event()
+        def slow():
+            release.wait(5)
+            return object()
+        
+        self.registry.register("slow", slow)
+        self.assertTrue(self.registry.load_async("slow"))
+        self.assertFalse(self.registry.load_async("slow"))
+        self.assertEqual(self.registry.status()["slow"]["status"], "loading")
+        
+        release.set()
+        self.registry.get("slow")
+        self.assertFalse(self.registry.load_async("slow"))
+        self.assertIsNotNone(self.registry.status()["slow"]["load_seconds"])
+
+class TestWarmupFailures(unittest.TestCase):
+    def test_failed_warmup_is_logged_and_counted(self):
+        registry = ModelRegistry()
+        def broken():
+            raise OSError("weights missing")
+        registry.register("broken", broken)
+        before = FALLBACKS.value(stage="broken_load", reason="OSError")
+        
+        with self.assertLogs("cultitrans", "WARNING"):
+            registry.warmup(background=False)
+        self.assertEqual(FALLBACKS.value(stage="broken_load", reason="OSError"), before + 1)
+
+if __name__ == "__main__":
+    unittest.main()
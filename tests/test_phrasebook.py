@@ -0,0 +1,129 @@
+"""
+Tests for the memory-mapped phrasebook
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.core import phrasebook
+from config.settings import settings
+from src.core.metrics import record_fallback
+from src.core.model_registry import registry
+from src.core.phrasebook import Phrasebook, PhrasebookBuildError, build, get_phrasebook, load_phrasebook, make_phrase_key, normalize, write_phrasebook
+
+def entry(text, culture):
+    return {
+        "basic_translation": f"{text} ({culture})",
+        "cultural_adaptation": f"adapted {text}",
+        "culture_notes": "notes",
+        "confidence": 1.0,
+        "response_suggestions": [{"text": "reply", "explanation": "why"}]
+    }
+
+class FakeProcessor:
+    def process(self, records):
+        return [
+            {"error": "upstream down"} if r["text"] == "Broken" else entry(r["text"], r["target_culture"])
+            for r in records
+        ]
+
+class FailingUpstreamProcessor:
+    """The translation upstream is down: the pipeline answers with the input text"""
+    def process(self, records):
+        results = []
+        for r in records:
+            record_fallback("translation", ConnectionError("translate.googleapis.com unreachable"))
+            results.append({**entry(r["text"], r["target_culture"]), "basic_translation": r["text"]})
+        return results
+
+class TestPhrasebook(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "phrasebook.bin")
+    
+    def open(self, entries, metadata=None):
+        write_phrasebook(self.path, entries, metadata or {"source_languages": ["en"]})
+        book = Phrasebook(self.path)
+        self.addCleanup(book.close)
+        return book
+    
+    def test_normalised_lookup(self):
+        self.assertEqual(normalize("  Thank   YOU very much. "), "thank you very much")
+        self.assertEqual(normalize("Thank you very much!!"), "thank you very much!")
+        self.assertEqual(normalize("ＴＨＡＮＫＳ！"), "thanks!")
+        book = self.open([
+            (make_phrase_key("Thank you very much", "en", "japanese"), entry("thanks", "japanese")),
+            (make_phrase_key("No?", "en", "japanese"), entry("no?", "japanese")),
+        ])
+        
+        self.assertEqual(book.lookup("thank you very much.", "en", "japanese")["cultural_adaptation"], "adapted thanks")
+        self.assertEqual(book.lookup("no ?", "en", "japanese")["basic_translation"], "no? (japanese)")
+        self.assertIsNone(book.lookup("No.", "en", "japanese"))
+        self.assertEqual(book.lookup("Thank you very much", "auto", "japanese")["culture_notes"], "notes")
+        self.assertIsNone(book.lookup("Thank you very much", "en", "german"))
+        self.assertIsNone(book.lookup("Thank you very much", "fr", "japanese"))
+        self.assertIsNone(book.lookup("Thank you", "en", "japanese"))
+    
+    def test_every_entry_is_found_among_many(self):
+        entries = [(make_phrase_key(f"phrase {i}", "en", "french"), entry(str(i), "french")) for i in range(500)]
+        book = self.open(entries)
+        
+        self.assertEqual(len(book), 500)
+        for i in range(500):
+            self.assertEqual(book.lookup(f"Phrase {i}.", "en", "french")["basic_translation"], f"{i} (french)")
+        self.assertIsNone(book.lookup("phrase 500", "en", "french"))
+    
+    def test_build_skips_failed_phrases(self):
+        entries = build(["Hello", "Broken"], ["japanese", "german"], "en", FakeProcessor())
+        book = self.open(entries)
+        
+        self.assertEqual(len(book), 2)
+        self.assertEqual(book.lookup("hello", "en", "german")["basic_translation"], "Hello (german)")
+        self.assertIsNone(book.lookup("Broken", "en", "german"))
+    
+    def test_build_aborts_when_the_pipeline_falls_back(self):
+        with self.assertLogs("cultitrans", "WARNING"):
+            with self.assertRaises(PhrasebookBuildError):
+                build(["Hello"], ["japanese"], "en", FailingUpstreamProcessor())
+    
+    def test_built_and_rebuilt_files_are_picked_up(self):
+        versions = {"llm_model": "m", "adaptation_prompt": "1", "response_prompt": "1"}
+        metadata = {"source_languages": ["en"], "versions": versions}
+        patches = [
+            patch.object(phrasebook, "_versions", return_value=versions),
+            patch.object(phrasebook, "RELOAD_CHECK_SECONDS", 0.0),
+            patch.object(settings, "PHRASEBOOK_ENABLED", True),
+            patch.object(settings, "PHRASEBOOK_PATH", self.path),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(registry.unload, "phrasebook")
+        
+        self.assertIsNone(get_phrasebook())
+        write_phrasebook(self.path, [(make_phrase_key("Hello", "en", "german"), entry("Hello", "german"))], metadata)
+        self.assertEqual(get_phrasebook().lookup("hello", "en", "german")["basic_translation"], "Hello (german)")
+        write_phrasebook(self.path, [(make_phrase_key("Hello", "en", "german"), entry("Hallo", "german"))], metadata)
+        self.assertEqual(get_phrasebook().lookup("hello", "en", "german")["basic_translation"], "Hallo (german)")
+    
+    def test_stale_or_missing_files_are_not_served(self):
+        self.assertIsNone(load_phrasebook(self.path))
+        versions = {"llm_model": "m", "adaptation_prompt": "1", "response_prompt": "1"}
+        write_phrasebook(self.path, [], {"source_languages": ["en"], "versions": versions})
+        
+        with patch.object(phrasebook, "_versions", return_value=versions):
+            current = load_phrasebook(self.path)
+            self.assertIsNotNone(current)
+            current.close()
+        with patch.object(phrasebook, "_versions", return_value={**versions, "llm_model": "other"}):
+            self.assertIsNone(load_phrasebook(self.path))
+        with patch.object(phrasebook, "VERSION", phrasebook.VERSION + 1), self.assertLogs("cultitrans", "WARNING"):
+            self.assertIsNone(load_phrasebook(self.path))
+
+if __name__ == '__main__':
+    unittest.main()
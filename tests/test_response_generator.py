@@ -0,0 +1,102 @@
+"""
+Tests for response suggestion parsing and caching
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+from unittest import mock
+from src.core.cache import NullCache
+from src.core.response_generator import ResponseGenerator, ResponseSuggestionParser
+from src.core.semantic_cache import SemanticCache
+from src.core.sessions import format_message
+
+LLM_OUTPUT = (
+    "Response 1: Thank you very much for your time.\n"
+    "Explanation: Formal thanks suit a high-politeness culture.\n"
+    "Response 2: I appreciate your help.\n"
+    "Explanation: Polite but less formal."
+)
+
+class TestResponseSuggestionParser(unittest.TestCase):
+    def test_streamed_chunks_emit_completed_pairs(self):
+        """Suggestions are emitted as soon as their explanation line ends"""
+        parser = ResponseSuggestionParser()
+        emitted = []
+        for i in range(0, len(LLM_OUTPUT), 7):
+            emitted.append(parser.feed(LLM_OUTPUT[i:i + 7]))
+        tail = parser.close()
+        
+        flat = [s for chunk in emitted for s in chunk]
+        self.assertEqual(len(flat), 1)
+        self.assertEqual(flat[0]["text"], "Thank you very much for your time.")
+        self.assertEqual(len(tail), 1)
+        self.assertEqual(tail[0]["explanation"], "Polite but less formal.")
+    
+    def test_matches_batch_parser(self):
+        """Incremental and whole-output parsing agree"""
+        generator = ResponseGenerator()
+        parsed = generator._parse_response_suggestions(LLM_OUTPUT)
+        
+        self.assertEqual([r["text"] for r in parsed], [
+            "Thank you very much for your time.",
+            "I appreciate your help."
+        ])
+    
+    def test_response_without_explanation(self):
+        parser = ResponseSuggestionParser()
+        parsed = parser.feed("Response 1: Hello\nResponse 2: Hi\n") + parser.close()
+        self.assertEqual(parsed, [{"text": "Hello"}, {"text": "Hi"}])
+
+class TruncatingEmbeddings:
+    """Embeds only the first ``window`` characters, like a model with a short input limit"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self.axes = {}
+
+    def embed_documents(self, texts):
+        vectors = []
+        for text in texts:
+            axis = self.axes.setdefault(text[:self.window], len(self.axes))
+            vector = [0.0] * 64
+            vector[axis % 64] = 1.0
+            vectors.append(vector)
+        return vectors
+
+class TestSuggestionCaching(unittest.TestCase):
+    def setUp(self):
+        self.semantic = SemanticCache(TruncatingEmbeddings(), threshold=0.95)
+        patches = [
+            mock.patch("src.core.response_generator.get_semantic_cache", return_value=self.semantic),
+            mock.patch.object(ResponseGenerator, "cache", NullCache()),
+            mock.patch.object(ResponseGenerator, "_request_responses",
+                              side_effect=lambda context, culture, query, guidance: [{"text": f"reply to {query}"}]),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.generator = ResponseGenerator()
+
+    def test_turns_sharing_a_long_history_do_not_hit_each_other(self):
+        history = "Recent turns:\n" + "\n".join(f"User: message number {i} about the trip" for i in range(40))
+        first = self.generator.generate_responses(f"{history}\n{format_message('Where is the hotel?')}",
+                                                  "japanese", query="Where is the hotel?")
+        second = self.generator.generate_responses(f"{history}\n{format_message('How much is dinner?')}",
+                                                   "japanese", query="How much is dinner?")
+
+        self.assertEqual(first, [{"text": "reply to Where is the hotel?"}])
+        self.assertEqual(second, [{"text": "reply to How much is dinner?"}])
+        self.assertEqual(self.semantic.stats()["entries"], 0)
+
+    def test_messages_without_history_use_the_semantic_tier(self):
+        self.generator.generate_responses(format_message("Thank you"), "japanese", query="Thank you")
+        cached = self.generator.generate_responses(format_message("Thank you"), "japanese", query="Thank you")
+
+        self.assertEqual(cached, [{"text": "reply to Thank you"}])
+        self.assertEqual(self.semantic.stats()["hits"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Tests for upstream admission control and priority scheduling
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+import time
+import unittest
+from src.core.scheduler import (
+    BATCH, INTERACTIVE, INTERACTIVE_OPTIONAL, UpstreamOverloaded, UpstreamScheduler,
+    batch_work, current_priority
+)
+from src.core.upstream import CLOSED, CircuitBreaker, Upstream
+
+class TestUpstreamScheduler(unittest.TestCase):
+    def make(self, **kwargs):
+        options = dict(max_queue=10, shed_after=0.05, batch_max_wait=5.0, throttle_seconds=0.05)
+        options.update(kwargs)
+        return UpstreamScheduler("test", **options)
+    
+    def queue_behind(self, scheduler, priority, order):
+        """Start a thread that waits for admission and records when it gets in"""
+        def run():
+            with scheduler.admit(priority, timeout=5.0):
+                order.append(priority)
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+    
+    def wait_for_queue(self, scheduler, length):
+        deadline = time.monotonic() + 2.0
+        while len(scheduler._queue) < length and time.monotonic() < deadline:
+            time.sleep(0.005)
+    
+    def test_interactive_work_overtakes_queued_batch_work(self):
+        scheduler = self.make(max_concurrency=1)
+        held = scheduler.admit(INTERACTIVE)
+        order = []
+        batch = self.queue_behind(scheduler, BATCH, order)
+        self.wait_for_queue(scheduler, 1)
+        interactive = self.queue_behind(scheduler, INTERACTIVE, order)
+        self.wait_for_queue(scheduler, 2)
+        
+        self.assertEqual(scheduler.queue_depth()["batch"], 1)
+        self.assertEqual(scheduler.queue_depth()["in_flight"], 1)
+        held.release()
+        batch.join()
+        interactive.join()
+        self.assertEqual(order, [INTERACTIVE, BATCH])
+    
+    def test_request_budget_spaces_calls(self):
+        # 1200/min with a 50 ms burst: one call at once, then one every 50 ms
+        scheduler = self.make(requests_per_minute=1200, burst_seconds=0.05)
+        started = time.monotonic()
+        for _ in range(3):
+            scheduler.admit(INTERACTIVE).release()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+    
+    def test_optional_work_is_shed_under_pressure(self):
+        scheduler = self.make(max_concurrency=1)
+        with scheduler.admit(INTERACTIVE):
+            started = time.monotonic()
+            with self.assertRaises(UpstreamOverloaded):
+                scheduler.admit(INTERACTIVE_OPTIONAL, timeout=30.0)
+            self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(scheduler.queue_depth()["interactive_optional"], 0)
+    
+    def test_full_queue_sheds_the_lowest_priority(self):
+        scheduler = self.make(max_concurrency=1, max_queue=1)
+        held = scheduler.admit(INTERACTIVE)
+        errors = []
+        def queued_batch():
+            try:
+                scheduler.admit(BATCH)
+            except UpstreamOverloaded as e:
+                errors.append(e)
+        thread = threading.Thread(target=queued_batch)
+        thread.start()
+        self.wait_for_queue(scheduler, 1)
+        
+        order = []
+        interactive = self.queue_behind(scheduler, INTERACTIVE, order)
+        thread.join(2.0)
+        self.assertEqual(len(errors), 1)
+        with self.assertRaises(UpstreamOverloaded):
+            scheduler.admit(BATCH)
+        held.release()
+        interactive.join()
+        self.assertEqual(order, [INTERACTIVE])
+    
+    def test_batch_context_lowers_priority(self):
+        self.assertEqual(current_priority(), INTERACTIVE)
+        self.assertEqual(current_priority(optional=True), INTERACTIVE_OPTIONAL)
+        with batch_work():
+            self.assertEqual(current_priority(), BATCH)
+        self.assertEqual(current_priority(), INTERACTIVE)
+    
+    def test_rate_limit_errors_pause_admissions(self):
+        class RateLimited(Exception):
+            pass
+        attempts = []
+        def throttled():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RateLimited("slow down")
+            return "ok"
+        
+        scheduler = self.make(requests_per_minute=6000, throttle_seconds=0.1)
+        upstream = Upstream("test", timeout=1.0, retry_base_delay=0.001, timeout_kwarg=None,
+                            retry_on=(RateLimited,), throttle_on=(RateLimited,), scheduler=scheduler)
+        self.assertEqual(upstream.call(throttled), "ok")
+        started = time.monotonic()
+        scheduler.admit(INTERACTIVE).release()
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+    def test_shed_probe_does_not_wedge_the_circuit(self):
+        scheduler = self.make(max_concurrency=1)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+        upstream = Upstream("test", timeout=1.0, max_retries=0, timeout_kwarg=None,
+                            breaker=breaker, scheduler=scheduler)
+        def down():
+            raise ConnectionError("refused")
+        
+        with self.assertRaises(ConnectionError):
+            upstream.call(down)
+        with scheduler.admit(INTERACTIVE):
+            with self.assertRaises(UpstreamOverloaded):
+                upstream.call(lambda: "shed", optional=True)
+        self.assertEqual(upstream.call(lambda: "ok"), "ok")
+        self.assertEqual(breaker.state, CLOSED)
+
+if __name__ == '__main__':
+    unittest.main()
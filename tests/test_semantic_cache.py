@@ -0,0 +1,153 @@
+"""
+Tests for the semantic near-duplicate cache
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import unittest
+from unittest.mock import patch
+from config.settings import settings
+from src.core import semantic_cache
+from src.core.cache import MISS, NullCache
+from src.core.model_registry import registry
+from src.core.semantic_cache import SemanticCache, get_semantic_cache
+from src.core.translator import CulturalTranslator
+
+class FakeEmbeddings:
+    """Maps each text to a fixed vector; unknown texts get a fresh orthogonal axis"""
+
+    def __init__(self, vectors=None, fail=False):
+        self.vectors = dict(vectors or {})
+        self.fail = fail
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("embedding model unavailable")
+        for text in texts:
+            if text not in self.vectors:
+                vector = [0.0] * 64
+                vector[len(self.vectors) % 64] = 1.0
+                self.vectors[text] = vector
+        return [self.vectors[text] for text in texts]
+
+# "thank you very much" and "thanks so much" are near-duplicates (cosine ~0.99)
+PARAPHRASES = {
+    "thank you very much": [1.0, 0.1] + [0.0] * 62,
+    "thanks so much": [1.0, 0.12] + [0.0] * 62,
+    "where is the station": [0.0, 0.0, 1.0] + [0.0] * 61,
+}
+
+class TestSemanticCache(unittest.TestCase):
+    def test_paraphrase_reuses_result_above_threshold(self):
+        cache = SemanticCache(FakeEmbeddings(PARAPHRASES), threshold=0.95)
+        cache.store("adaptation", "japanese", "thank you very much", "domo arigatou")
+
+        self.assertEqual(cache.lookup("adaptation", "japanese", "thanks so much"), "domo arigatou")
+        self.assertIs(cache.lookup("adaptation", "japanese", "where is the station"), MISS)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_partitions_by_namespace_and_culture(self):
+        cache = SemanticCache(FakeEmbeddings(PARAPHRASES), threshold=0.95)
+        cache.store("adaptation", "japanese", "thank you very much", "domo arigatou")
+
+        self.assertIs(cache.lookup("adaptation", "chinese", "thank you very much"), MISS)
+        self.assertIs(cache.lookup("responses", "japanese", "thank you very much"), MISS)
+
+    def test_get_or_compute_calls_compute_once_for_paraphrases(self):
+        cache = SemanticCache(FakeEmbeddings(PARAPHRASES), threshold=0.95)
+        calls = []
+        compute = lambda: calls.append(1) or "domo arigatou"
+
+        cache.get_or_compute("adaptation", "japanese", "thank you very much", compute)
+        result = cache.get_or_compute("adaptation", "japanese", "thanks so much", compute)
+        self.assertEqual(result, "domo arigatou")
+        self.assertEqual(len(calls), 1)
+
+    def test_audited_hits_are_recomputed(self):
+        cache = SemanticCache(FakeEmbeddings(PARAPHRASES), threshold=0.95, audit_rate=1.0)
+        cache.store("adaptation", "japanese", "thank you very much", "stale")
+
+        result = cache.get_or_compute("adaptation", "japanese", "thanks so much", lambda: "fresh")
+        self.assertEqual(result, "fresh")
+
+    def test_lru_eviction_and_ttl(self):
+        cache = SemanticCache(FakeEmbeddings(), max_entries=2)
+        for text in ("a", "b"):
+            cache.store("ns", "japanese", text, text.upper())
+        cache.lookup("ns", "japanese", "a")  # "b" becomes least recently used
+        cache.store("ns", "japanese", "c", "C")
+
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.lookup("ns", "japanese", "a"), "A")
+        self.assertIs(cache.lookup("ns", "japanese", "b"), MISS)
+
+        expiring = SemanticCache(FakeEmbeddings(), ttl_seconds=0.01)
+        expiring.store("ns", "japanese", "a", "A")
+        time.sleep(0.02)
+        self.assertIs(expiring.lookup("ns", "japanese", "a"), MISS)
+        self.assertEqual(expiring.stats()["entries"], 0)
+
+    def test_embedding_failure_is_a_miss(self):
+        embeddings = FakeEmbeddings(PARAPHRASES)
+        cache = SemanticCache(embeddings)
+        cache.store("adaptation", "japanese", "thank you very much", "domo arigatou")
+        embeddings.fail = True
+
+        self.assertIs(cache.lookup("adaptation", "japanese", "thank you very much"), MISS)
+        self.assertEqual(cache.get_or_compute("adaptation", "japanese", "hi", lambda: "konnichiwa"), "konnichiwa")
+
+class TestAdaptationMatching(unittest.TestCase):
+    def setUp(self):
+        self.embeddings = FakeEmbeddings(PARAPHRASES)
+        patches = [
+            patch("src.core.translator.get_semantic_cache",
+                  return_value=SemanticCache(self.embeddings, threshold=0.95)),
+            patch.object(CulturalTranslator, "cache", NullCache()),
+            patch("src.core.translator.Translator"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.translator = CulturalTranslator(backend="google", adaptation_mode="single")
+        self.translator._request_adaptation = lambda text, culture, info: f"adapted {text}"
+        self.info = settings.SUPPORTED_CULTURES["japanese"]
+    
+    def test_matched_on_the_english_source_not_the_translation(self):
+        self.translator._adapt_culturally("ありがとうございます", "japanese", self.info, "thank you very much", "en")
+        reused = self.translator._adapt_culturally("どうもありがとう", "japanese", self.info, "thanks so much", "en")
+        self.assertEqual(reused, "adapted ありがとうございます")
+        
+        different = self.translator._adapt_culturally("駅はどこですか", "japanese", self.info, "where is the station", "en")
+        self.assertEqual(different, "adapted 駅はどこですか")
+    
+    def test_languages_the_embedding_model_lacks_are_skipped(self):
+        calls = self.embeddings.calls
+        for source in ("谢谢你", "非常感谢"):
+            self.translator._adapt_culturally(f"<{source}>", "japanese", self.info, source, "zh")
+            self.translator._adapt_culturally_batch([f"<{source}>"], "japanese", self.info, [source], "auto")
+        self.assertEqual(self.embeddings.calls, calls)
+
+class TestSemanticCacheLoading(unittest.TestCase):
+    def test_failed_load_is_not_retried_on_every_call(self):
+        loads = []
+        def broken():
+            loads.append(1)
+            raise OSError("embedding model unavailable")
+        original = registry._loaders["semantic_cache"]
+        registry.unload("semantic_cache")
+        registry.register("semantic_cache", broken)
+        self.addCleanup(registry.register, "semantic_cache", original)
+        self.addCleanup(setattr, semantic_cache, "_retry_load_at", 0.0)
+        
+        with patch.object(settings, "SEMANTIC_CACHE_ENABLED", True), self.assertLogs("cultitrans", "WARNING"):
+            self.assertIsNone(get_semantic_cache())
+            self.assertIsNone(get_semantic_cache())
+        self.assertEqual(len(loads), 1)
+
+if __name__ == '__main__':
+    unittest.main()
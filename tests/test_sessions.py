@@ -0,0 +1,67 @@
+"""
+Tests for the conversation session store
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import tempfile
+import time
+import unittest
+from src.core.sessions import SessionStore, estimate_tokens
+
+class TestSessionStore(unittest.TestCase):
+    def test_old_turns_fold_into_summary(self):
+        store = SessionStore(max_turns=3)
+        for i in range(5):
+            store.add_turn("s1", f"message number {i}")
+
+        session = store.get("s1")
+        self.assertEqual([t["text"] for t in session.turns],
+                         ["message number 2", "message number 3", "message number 4"])
+        self.assertIn("message number 0", session.summary)
+        self.assertIn("message number 1", session.summary)
+
+    def test_context_stays_within_budget(self):
+        store = SessionStore(max_turns=50, history_tokens=100, summary_tokens=40)
+        for i in range(200):
+            store.add_turn("long", f"turn {i} " + "word " * 30, translation="adapted text")
+
+        context = store.context("long")
+        self.assertLessEqual(estimate_tokens(context), 100 + 40 + 60)
+        self.assertIn("turn 199", context)
+
+    def test_conversation_context_without_history(self):
+        store = SessionStore()
+        self.assertEqual(store.conversation_context(None, "hi"), "User said: hi")
+        self.assertEqual(store.conversation_context("new", "hi"), "User said: hi")
+
+        store.add_turn("new", "hello", translation="good day")
+        context = store.conversation_context("new", "hi")
+        self.assertIn("User: hello (adapted as: good day)", context)
+        self.assertTrue(context.endswith("User said: hi"))
+
+    def test_sessions_persist_across_stores(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sessions.db")
+            SessionStore(path=path).add_turn("s1", "remember me")
+
+            reloaded = SessionStore(path=path)
+            self.assertEqual(reloaded.get("s1").turns[0]["text"], "remember me")
+            reloaded.delete("s1")
+            self.assertIsNone(SessionStore(path=path).get("s1"))
+
+    def test_idle_sessions_expire_and_memory_is_bounded(self):
+        store = SessionStore(ttl_seconds=60, max_sessions=2)
+        store.add_turn("old", "hello")
+        store.get("old").updated_at = time.time() - 120
+        self.assertIsNone(store.get("old"))
+
+        for name in ("a", "b", "c"):
+            store.add_turn(name, "hi")
+        self.assertEqual(store.stats()["active_sessions"], 2)
+        self.assertIsNone(store.get("a"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for fast startup: lazy heavy imports, liveness/readiness and 503 gating
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import subprocess
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+
+from config.settings import settings
+from src.backend import api
+from src.core.model_registry import registry
+
+HEAVY_MODULES = ["torch", "transformers", "whisper", "langchain_community", "chromadb"]
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.mode = settings.STARTUP_MODE
+        settings.STARTUP_MODE = "background"
+        self.release = threading.Event()
+        self.loaders = {name: registry._loaders[name] for name in api.TRANSLATE_MODELS + api.ASR_MODELS}
+        for name in self.loaders:
+            registry.unload(name)
+            registry.register(name, self.blocked_loader)
+
+    def blocked_loader(self):
+        # Stays "loading" until the test releases it, then fails
+        self.release.wait(30)
+        raise RuntimeError("released")
+
+    def tearDown(self):
+        settings.STARTUP_MODE = self.mode
+        self.release.set()
+        for name, loader in self.loaders.items():
+            try:
+                registry.get(name)  # wait for an in-flight background load
+            except Exception:
+                pass
+            registry.unload(name)
+            registry.register(name, loader)
+
+    def test_api_import_defers_heavy_libraries(self):
+        root = os.path.join(os.path.dirname(__file__), '..')
+        code = (
+            "import sys, src.backend.api; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+        )
+        self.assertEqual(output.returncode, 0, output.stderr)
+        self.assertEqual(output.stdout.strip(), "")
+
+    def test_not_ready_until_models_load(self):
+        # Entering the client runs the lifespan, which starts the background loads
+        with TestClient(api.app) as client:
+            self.assertEqual(client.get("/healthz").status_code, 200)
+
+            response = client.get("/readyz")
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json()["components"]["whisper"]["status"], "loading")
+
+            response = client.post("/translate", json={
+                "text": "hello", "source_language": "en", "target_culture": "japanese"
+            })
+            self.assertEqual(response.status_code, 503)
+            self.assertIn("Retry-After", response.headers)
+
+            for name in self.loaders:
+                registry.set(name, object())
+            self.assertEqual(client.get("/readyz").status_code, 200)
+
+    def test_phrasebook_answers_while_models_load(self):
+        phrasebook = Mock()
+        phrasebook.lookup.side_effect = lambda text, source, culture: {
+            "basic_translation": "ありがとう",
+            "cultural_adaptation": "ありがとうございます",
+            "culture_notes": "",
+            "response_suggestions": [],
+            "confidence": 1.0
+        } if text == "Thank you" else None
+        with patch.object(api, "get_phrasebook", return_value=phrasebook), TestClient(api.app) as client:
+            request = {"text": "Thank you", "source_language": "en", "target_culture": "japanese"}
+            response = client.post("/translate", json=request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["cultural_adaptation"], "ありがとうございます")
+            
+            response = client.post("/translate", json={**request, "text": "Where is the station?"})
+            self.assertEqual(response.status_code, 503)
+    
+    def test_lazy_mode_is_always_ready(self):
+        settings.STARTUP_MODE = "lazy"
+        self.assertEqual(TestClient(api.app).get("/readyz").status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Tests for incremental streaming transcription
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+import numpy as np
+from src.core.audio import SAMPLE_RATE
+from src.core.streaming_asr import StreamingTranscriber
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+class TestStreamingTranscriber(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        
+        def transcribe(audio, prompt):
+            self.calls.append((len(audio), prompt))
+            return f"speech {len(audio) // SAMPLE_RATE}s"
+        
+        self.transcriber = StreamingTranscriber(transcribe, partial_interval=1.0, min_silence_ms=600)
+    
+    def feed_in_frames(self, audio, frame_seconds=0.1):
+        events = []
+        step = int(frame_seconds * SAMPLE_RATE)
+        for i in range(0, len(audio), step):
+            events.extend(self.transcriber.feed(audio[i:i + step]))
+        return events
+    
+    def test_partials_then_final_on_pause(self):
+        """Speech yields partial transcripts and a pause finalises it"""
+        events = self.feed_in_frames(np.concatenate([silence(0.5), tone(2.5), silence(1.0)]))
+        types = [e["type"] for e in events]
+        
+        self.assertIn("partial", types)
+        self.assertEqual(types.count("final"), 1)
+        final = [e for e in events if e["type"] == "final"][0]
+        self.assertEqual(final["utterance"], 1)
+        self.assertAlmostEqual(final["start"], 0.2, delta=0.1)
+    
+    def test_silence_produces_nothing(self):
+        self.assertEqual(self.feed_in_frames(silence(3.0)), [])
+        self.assertEqual(self.calls, [])
+    
+    def test_flush_finalises_trailing_speech(self):
+        self.feed_in_frames(tone(0.5))
+        events = self.transcriber.flush()
+        self.assertEqual([e["type"] for e in events], ["final"])
+    
+    def test_previous_final_used_as_prompt(self):
+        """Each utterance is decoded with the previous one as context"""
+        self.feed_in_frames(np.concatenate([tone(1.0), silence(1.0), tone(1.0), silence(1.0)]))
+        prompts = [prompt for _, prompt in self.calls]
+        self.assertIsNone(prompts[0])
+        self.assertEqual(prompts[-1], "speech 1s")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import unittest
 from unittest.mock import Mock, patch
-from src.core.translator import CulturalTranslator
+from src.core.translator import AdaptationParseError, CulturalTranslator
 
 class TestCulturalTranslator(unittest.TestCase):
     def setUp(self):
@@ -42,5 +42,30 @@ class TestCulturalTranslator(unittest.TestCase):
         # Japanese adaptation should be more polite
         self.assertTrue(len(result["cultural_adaptation"]) > 0)
 
+    def test_parse_packed_adaptations(self):
+        """Numbered replies are mapped back to their inputs"""
+        output = '1. "Thank you very much."\n2) I would be grateful for your help.\n'
+        self.assertEqual(
+            CulturalTranslator._parse_packed_adaptations(output, 2),
+            ["Thank you very much.", "I would be grateful for your help."]
+        )
+        with self.assertRaises(AdaptationParseError):
+            CulturalTranslator._parse_packed_adaptations("1. Only one", 2)
+    
+    @patch('src.core.translator.chat_completion')
+    def test_packed_adaptation_splits_on_parse_failure(self, mock_chat_completion):
+        """An unparseable packed reply is retried as two halves"""
+        mock_chat_completion.side_effect = [
+            "Sorry, I cannot number these.",
+            "1. adapted a\n2. adapted b",
+            "1. adapted c\n2. adapted d",
+        ]
+        culture_info = {"politeness": "high", "directness": "low"}
+        
+        result = self.translator._request_adaptations(["a", "b", "c", "d"], "japanese", culture_info)
+        
+        self.assertEqual(result, ["adapted a", "adapted b", "adapted c", "adapted d"])
+        self.assertEqual(mock_chat_completion.call_count, 3)
+
 if __name__ == "__main__":
     unittest.main()
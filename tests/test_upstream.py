@@ -0,0 +1,112 @@
+"""
+Tests for the resilient outbound call layer
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+import time
+import unittest
+from src.core.upstream import (
+    CircuitBreaker, CircuitOpenError, OPEN, Upstream, UpstreamTimeout
+)
+
+class TestUpstream(unittest.TestCase):
+    def make(self, **kwargs):
+        options = dict(timeout=1.0, max_retries=2, retry_base_delay=0.001, timeout_kwarg=None)
+        options.update(kwargs)
+        return Upstream("test", **options)
+    
+    def test_transient_errors_are_retried(self):
+        attempts = []
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("reset")
+            return "ok"
+        
+        self.assertEqual(self.make().call(flaky), "ok")
+        self.assertEqual(len(attempts), 3)
+    
+    def test_other_errors_are_not_retried(self):
+        attempts = []
+        def bad_request():
+            attempts.append(1)
+            raise ValueError("invalid prompt")
+        
+        with self.assertRaises(ValueError):
+            self.make().call(bad_request)
+        self.assertEqual(len(attempts), 1)
+    
+    def test_deadline_bounds_the_wait(self):
+        release = threading.Event()
+        upstream = self.make(max_retries=0)
+        started = time.monotonic()
+        with self.assertRaises(UpstreamTimeout):
+            upstream.call(release.wait, deadline=0.05)
+        release.set()
+        self.assertLess(time.monotonic() - started, 0.5)
+    
+    def test_remaining_time_is_passed_to_the_call(self):
+        upstream = self.make(timeout_kwarg="timeout")
+        self.assertLessEqual(upstream.call(lambda timeout: timeout, deadline=0.5), 0.5)
+    
+    def test_hedged_request_wins(self):
+        calls = []
+        lock = threading.Lock()
+        def sometimes_slow():
+            with lock:
+                calls.append(1)
+                first = len(calls) == 1
+            time.sleep(1.0 if first else 0.0)
+            return "hedged" if not first else "primary"
+        
+        upstream = self.make(hedge_after=0.02)
+        started = time.monotonic()
+        self.assertEqual(upstream.call(sometimes_slow), "hedged")
+        self.assertLess(time.monotonic() - started, 0.5)
+    
+    def test_open_circuit_fails_fast(self):
+        upstream = self.make(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        def down():
+            raise ConnectionError("refused")
+        
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                upstream.call(down)
+        self.assertEqual(upstream.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            upstream.call(lambda: "never called")
+
+    def test_only_request_errors_keep_the_circuit_closed(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        upstream = self.make(breaker=breaker, rejected_on=(ValueError,))
+        def invalid():
+            raise ValueError("invalid prompt")
+        def scraping_broken():
+            raise AttributeError("'NoneType' object has no attribute 'group'")
+        
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                upstream.call(invalid)
+        self.assertNotEqual(breaker.state, OPEN)
+        for _ in range(2):
+            with self.assertRaises(AttributeError):
+                upstream.call(scraping_broken)
+        self.assertEqual(breaker.state, OPEN)
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_half_open_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        time.sleep(0.02)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # only one probe at a time
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+
+if __name__ == "__main__":
+    unittest.main()
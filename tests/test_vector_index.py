@@ -0,0 +1,54 @@
+"""
+Tests for the in-memory cultural vector index and query-embedding cache
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from src.core.embeddings import CachedEmbeddings
+from src.core.vector_index import CultureVectorIndex
+
+class TestCultureVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = CultureVectorIndex()
+        self.index.build(
+            embeddings=[[1, 0, 0], [0, 1, 0], [0.9, 0.1, 0], [1, 0, 0]],
+            documents=["bowing", "gift giving", "formal thanks", "handshake"],
+            metadatas=[
+                {"culture": "japanese"}, {"culture": "japanese"},
+                {"culture": "japanese"}, {"culture": "american"}
+            ]
+        )
+    
+    def test_top_k_filtered_by_culture(self):
+        """Results come from the requested culture only, best first"""
+        self.assertEqual(self.index.search([1, 0, 0], "japanese", k=2), ["bowing", "formal thanks"])
+        self.assertEqual(self.index.search([1, 0, 0], "american", k=3), ["handshake"])
+        self.assertEqual(self.index.search([1, 0, 0], "german", k=3), [])
+    
+    def test_batch_search(self):
+        results = self.index.search_batch(np.array([[0, 1, 0], [1, 0, 0]]), "japanese", k=1)
+        self.assertEqual(results, [["gift giving"], ["bowing"]])
+
+class TestCachedEmbeddings(unittest.TestCase):
+    def test_queries_embedded_once(self):
+        """Repeated queries hit the cache and misses share one model call"""
+        model = Mock()
+        model.embed_documents.side_effect = lambda texts: [[float(len(t)), 1.0] for t in texts]
+        embeddings = CachedEmbeddings(model)
+        
+        first = embeddings.embed_queries(["thank you", "hello", "Thank  you"])
+        second = embeddings.embed_query("hello")
+        
+        self.assertEqual(first.shape, (3, 2))
+        self.assertEqual(model.embed_documents.call_count, 1)
+        self.assertEqual(model.embed_documents.call_args[0][0], ["thank you", "hello"])
+        self.assertEqual(second, [5.0, 1.0])
+        self.assertEqual(embeddings.hits, 1)
+
+if __name__ == "__main__":
+    unittest.main()